@@ -0,0 +1,110 @@
+"""
+Compare compress_json with and without the columnar transform.
+
+Usage:
+    python benchmarks/bench_columnar.py [--rows N] [--quality Q ...] [--repeat R]
+
+Throughput is measured against the size of the compact JSON text, so the plain
+and columnar rows of the table are directly comparable.
+"""
+
+import argparse
+import functools
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import jsonbrotliminifyer
+
+
+def make_datasets(rows: int) -> Dict[str, Any]:
+    rng = random.Random(42)
+    countries = ["DE", "FR", "US", "JP", "BR", "IN", "GB", "NL"]
+    records = [
+        {
+            "id": 100000 + i,
+            "user": f"user{rng.randrange(rows)}",
+            "country": rng.choice(countries),
+            "amount": round(rng.uniform(1, 500), 2),
+            "currency": "EUR",
+            "paid": rng.random() < 0.9,
+            "created": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        }
+        for i in range(rows)
+    ]
+    nested = {
+        "orders": [
+            {
+                "order": i,
+                "customer": {"name": f"c{i % 97}", "tier": rng.choice("ABC")},
+                "lines": [
+                    {"sku": f"SKU{rng.randrange(500)}", "qty": rng.randint(1, 5)}
+                    for _ in range(rng.randint(4, 8))
+                ],
+            }
+            for i in range(rows // 5)
+        ]
+    }
+    heterogeneous = [
+        {f"k{j}": rng.random() for j in range(rng.randint(1, 6))} for _ in range(rows)
+    ]
+    return {"records": records, "nested": nested, "heterogeneous": heterogeneous}
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> Tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--quality", type=int, nargs="+", default=[5, 9])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    serializer = jsonbrotliminifyer.get_serializer()
+    print(f"serializer: {serializer.name}")
+    header = (
+        f"{'dataset':<14} {'q':>2} {'layout':<9} {'ratio':>7} "
+        f"{'comp MB/s':>10} {'decomp MB/s':>12}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, document in make_datasets(args.rows).items():
+        size = len(json.dumps(document, separators=(",", ":")).encode())
+        mb = size / (1024 * 1024)
+        for quality in args.quality:
+            rows: List[str] = []
+            for columnar in (False, True):
+                comp_time, compressed = best_of(
+                    args.repeat,
+                    functools.partial(
+                        jsonbrotliminifyer.compress_json,
+                        document,
+                        quality=quality,
+                        columnar=columnar,
+                    ),
+                )
+                decomp_time, decoded = best_of(
+                    args.repeat,
+                    functools.partial(jsonbrotliminifyer.decompress_json, compressed),
+                )
+                assert decoded == document
+                rows.append(
+                    f"{name:<14} {quality:>2} "
+                    f"{'columnar' if columnar else 'plain':<9} "
+                    f"{size / len(compressed):>7.2f} {mb / comp_time:>10.1f} "
+                    f"{mb / decomp_time:>12.1f}"
+                )
+            print("\n".join(rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Compare compress_json with and without pack_numbers on number-heavy documents.
+
+Usage:
+    python benchmarks/bench_packed.py [--points N] [--quality Q ...] [--repeat R]
+
+Throughput is measured against the size of the compact JSON text, so the plain
+and packed rows of the table are directly comparable.
+"""
+
+import argparse
+import functools
+import json
+import math
+import random
+import time
+from typing import Any, Callable, Dict, Tuple
+
+import jsonbrotliminifyer
+
+
+def make_datasets(points: int) -> Dict[str, Any]:
+    rng = random.Random(7)
+    start = 1700000000000
+    timestamps = [start + i * 1000 + rng.randint(-3, 3) for i in range(points)]
+    telemetry = {
+        "device": "sensor-17",
+        "timestamps": timestamps,
+        "temperature": [
+            round(21 + 4 * math.sin(i / 600) + rng.gauss(0, 0.2), 2)
+            for i in range(points)
+        ],
+        "counts": [rng.randint(0, 5000) for _ in range(points)],
+    }
+    measurements = {
+        "series": [
+            {"channel": c, "samples": [rng.gauss(0, 1) for _ in range(points // 8)]}
+            for c in range(8)
+        ]
+    }
+    return {"telemetry": telemetry, "measurements": measurements}
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> Tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=200000)
+    parser.add_argument("--quality", type=int, nargs="+", default=[5, 9])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    header = (
+        f"{'dataset':<13} {'serializer':<10} {'q':>2} {'layout':<7} {'ratio':>7} "
+        f"{'comp MB/s':>10} {'decomp MB/s':>12}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, document in make_datasets(args.points).items():
+        size = len(json.dumps(document, separators=(",", ":")).encode())
+        mb = size / (1024 * 1024)
+        for serializer in jsonbrotliminifyer.available_serializers():
+            for quality in args.quality:
+                for packed in (False, True):
+                    comp_time, compressed = best_of(
+                        args.repeat,
+                        functools.partial(
+                            jsonbrotliminifyer.compress_json,
+                            document,
+                            quality=quality,
+                            serializer=serializer,
+                            pack_numbers=packed,
+                        ),
+                    )
+                    decomp_time, decoded = best_of(
+                        args.repeat,
+                        functools.partial(
+                            jsonbrotliminifyer.decompress_json,
+                            compressed,
+                            serializer=serializer,
+                        ),
+                    )
+                    assert decoded == document
+                    print(
+                        f"{name:<13} {serializer:<10} {quality:>2} "
+                        f"{'packed' if packed else 'plain':<7} "
+                        f"{size / len(compressed):>7.2f} {mb / comp_time:>10.1f} "
+                        f"{mb / decomp_time:>12.1f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
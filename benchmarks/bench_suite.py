@@ -0,0 +1,498 @@
+"""
+Measure throughput, ratio, latency and peak memory across the whole API.
+
+Usage:
+    python benchmarks/bench_suite.py [--quality Q ...] [--workers N ...]
+        [--executor {thread,process} ...] [--scale S] [--large-mib M]
+        [--large-quality Q ...] [--batch-files N] [--only PATTERN ...]
+        [--workdir DIR] [--output results.json] [--list]
+    python benchmarks/compare.py baseline.json results.json
+
+Cases cover compress_json and decompress_json on each in-memory corpus, the
+file functions on the records corpus and on a large generated file, and the
+batch functions on a directory of small files at each worker count. Every
+case runs in a fresh interpreter: peak RSS is then per case, and one case's
+leftovers cannot slow down the next. Throughput is uncompressed MiB per
+second of median latency, in both directions, so compress and decompress
+rows are comparable.
+"""
+
+import argparse
+import fnmatch
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import brotli
+
+import jsonbrotliminifyer
+
+import corpora
+
+SCHEMA = 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of values."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _status_kib(field: str) -> Optional[int]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _maxrss_kib(children: bool = False) -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's peak RSS mark for this process (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return _status_kib("VmHWM") is not None
+
+
+def measure(
+    fn: Callable[[], Any], min_time: float, min_runs: int, max_runs: int
+) -> List[float]:
+    """
+    Time fn until it ran min_runs times and for min_time seconds in total.
+
+    The first call warms up imports, pools and the page cache and is dropped,
+    unless it alone took min_time: slow cases are not worth running twice.
+    """
+    start = time.perf_counter()
+    fn()
+    first = time.perf_counter() - start
+    latencies = [first] if first >= min_time else []
+    total = sum(latencies)
+    while len(latencies) < max_runs and (len(latencies) < min_runs or total < min_time):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        latencies.append(elapsed)
+        total += elapsed
+    return latencies
+
+
+def corpus_path(args: argparse.Namespace, workdir: Path, corpus: str) -> Path:
+    """Where a file corpus lives; the name pins what it was generated from."""
+    if corpus == "large":
+        return workdir / f"large-s{args.seed}-{args.large_mib}m.json"
+    if corpus == "batch":
+        return workdir / f"batch-s{args.seed}-n{args.batch_files}"
+    return workdir / f"{corpus}-s{args.seed}-x{args.scale:g}.json"
+
+
+def setup_case(
+    spec: Dict[str, Any], scratch: Path
+) -> Tuple[Callable[[], Any], int, int, str]:
+    """
+    Prepare one case outside the timed region.
+
+    Returns the function to time, its uncompressed and compressed sizes, and
+    a digest of its input (of the first MiB for files).
+    """
+    bench = spec["bench"]
+    quality = spec["quality"]
+
+    if bench in ("compress_json", "decompress_json"):
+        document = corpora.make(spec["corpus"], spec["seed"], spec["scale"])
+        data = jsonbrotliminifyer.get_serializer().dumps(document)
+        compressed = jsonbrotliminifyer.compress_json(document, quality)
+        if bench == "compress_json":
+            return (
+                lambda: jsonbrotliminifyer.compress_json(document, quality),
+                len(data),
+                len(compressed),
+                corpora.digest(data),
+            )
+        return (
+            lambda: jsonbrotliminifyer.decompress_json(compressed),
+            len(data),
+            len(compressed),
+            corpora.digest(data),
+        )
+
+    if bench in ("compress_json_file", "decompress_json_file"):
+        source = Path(spec["input"])
+        # The large file is always compressed in blocks, even to set up
+        streaming = spec["corpus"] == "large"
+        compressed_path = scratch / "input.br"
+        output = scratch / "output"
+        jsonbrotliminifyer.compress_json_file(
+            source, compressed_path, quality, streaming=streaming
+        )
+        size = source.stat().st_size
+        with open(source, "rb") as f:
+            head = f.read(1 << 20)
+        sizes = (size, compressed_path.stat().st_size, corpora.digest(head))
+        if bench == "compress_json_file":
+            return (
+                lambda: jsonbrotliminifyer.compress_json_file(
+                    source, output, quality, streaming=streaming
+                ),
+                *sizes,
+            )
+        raw = spec["variant"] == "raw"
+        return (
+            lambda: jsonbrotliminifyer.decompress_json_file(
+                compressed_path, output, raw=raw
+            ),
+            *sizes,
+        )
+
+    inputs = sorted(Path(spec["input"]).glob("*.json"))
+    sizes_listing = [f"{path.name}:{path.stat().st_size}" for path in inputs]
+    size = sum(path.stat().st_size for path in inputs)
+    batch_options = {"max_workers": spec["workers"], "executor": spec["executor"]}
+    compressed_dir = scratch / "compressed"
+    errors = jsonbrotliminifyer.compress_json_files(
+        inputs, compressed_dir, quality, **batch_options
+    )
+    if any(errors):
+        raise RuntimeError(f"batch setup failed: {errors}")
+    compressed_files = sorted(compressed_dir.glob("*.br"))
+    compressed_size = sum(path.stat().st_size for path in compressed_files)
+    batch_digest = corpora.digest("\n".join(sizes_listing).encode())
+
+    def checked(errors: List[Optional[Exception]]) -> None:
+        failed = [error for error in errors if error is not None]
+        if failed:
+            raise RuntimeError(f"{len(failed)} files failed, first: {failed[0]}")
+
+    if bench == "compress_json_files":
+        return (
+            lambda: checked(
+                jsonbrotliminifyer.compress_json_files(
+                    inputs, scratch / "output", quality, **batch_options
+                )
+            ),
+            size,
+            compressed_size,
+            batch_digest,
+        )
+    return (
+        lambda: checked(
+            jsonbrotliminifyer.decompress_json_files(
+                compressed_files, scratch / "output", **batch_options
+            )
+        ),
+        size,
+        compressed_size,
+        batch_digest,
+    )
+
+
+def run_case(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one case in this process and return its metrics."""
+    with tempfile.TemporaryDirectory(dir=spec["workdir"]) as scratch:
+        fn, input_bytes, output_bytes, digest = setup_case(spec, Path(scratch))
+        rss_before = _status_kib("VmRSS")
+        reset = reset_peak_rss()
+        latencies = measure(fn, spec["min_time"], spec["min_runs"], spec["max_runs"])
+        peak = _status_kib("VmHWM") if reset else _maxrss_kib()
+        # Process pool workers, once they have exited
+        workers_peak = _maxrss_kib(children=True)
+    median = statistics.median(latencies)
+    return {
+        "id": spec["id"],
+        "bench": spec["bench"],
+        "corpus": spec["corpus"],
+        "quality": spec["quality"],
+        "variant": spec["variant"],
+        "workers": spec["workers"],
+        "executor": spec["executor"],
+        "runs": len(latencies),
+        "input_bytes": input_bytes,
+        "output_bytes": output_bytes,
+        "ratio": input_bytes / output_bytes,
+        "mib_per_s": input_bytes / (1024 * 1024) / median,
+        "p50_ms": median * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "min_ms": min(latencies) * 1000,
+        "peak_rss_mib": peak / 1024 if peak is not None else None,
+        # Above the memory held after setup; None where the peak cannot be reset
+        "peak_rss_delta_mib": (
+            (peak - rss_before) / 1024
+            if reset and peak is not None and rss_before is not None
+            else None
+        ),
+        "worker_peak_rss_mib": workers_peak / 1024 if workers_peak else None,
+        "corpus_digest": digest,
+    }
+
+
+def build_cases(args: argparse.Namespace, workdir: Path) -> List[Dict[str, Any]]:
+    """Expand the command line into the list of case specs."""
+    common = {
+        "workdir": str(workdir),
+        "seed": args.seed,
+        "scale": args.scale,
+        "min_time": args.min_time,
+        "min_runs": args.min_runs,
+        "max_runs": args.max_runs,
+        "variant": "default",
+        "workers": None,
+        "executor": None,
+    }
+    cases: List[Dict[str, Any]] = []
+
+    def add(case_id: str, **fields: Any) -> None:
+        case = dict(common, id=case_id, **fields)
+        if case["bench"] not in ("compress_json", "decompress_json"):
+            case["input"] = str(corpus_path(args, workdir, case["corpus"]))
+        cases.append(case)
+
+    for bench in ("compress_json", "decompress_json"):
+        for corpus in corpora.CORPORA:
+            for quality in args.quality:
+                add(
+                    f"{bench}/{corpus}/q{quality}",
+                    bench=bench,
+                    corpus=corpus,
+                    quality=quality,
+                )
+    for quality in args.quality:
+        add(
+            f"compress_json_file/records/q{quality}",
+            bench="compress_json_file",
+            corpus="records",
+            quality=quality,
+        )
+        add(
+            f"decompress_json_file/records/q{quality}",
+            bench="decompress_json_file",
+            corpus="records",
+            quality=quality,
+        )
+    if args.large_mib:
+        # The constant-memory paths; the default ones would hold the whole file
+        for quality in args.large_quality:
+            add(
+                f"compress_json_file/large/q{quality}/streaming",
+                bench="compress_json_file",
+                corpus="large",
+                quality=quality,
+                variant="streaming",
+            )
+            add(
+                f"decompress_json_file/large/q{quality}/raw",
+                bench="decompress_json_file",
+                corpus="large",
+                quality=quality,
+                variant="raw",
+            )
+    if args.batch_files:
+        for bench in ("compress_json_files", "decompress_json_files"):
+            for quality in args.quality:
+                for executor in args.executor:
+                    for workers in args.workers:
+                        add(
+                            f"{bench}/batch/q{quality}/{executor}-w{workers}",
+                            bench=bench,
+                            corpus="batch",
+                            quality=quality,
+                            workers=workers,
+                            executor=executor,
+                        )
+    if args.only:
+        cases = [
+            case
+            for case in cases
+            if any(fnmatch.fnmatchcase(case["id"], pattern) for pattern in args.only)
+        ]
+    return cases
+
+
+def prepare_workdir(
+    args: argparse.Namespace, workdir: Path, cases: List[Dict[str, Any]]
+) -> None:
+    """Write the file corpora the selected cases need, reusing existing ones."""
+    for corpus in sorted({case["corpus"] for case in cases if "input" in case}):
+        path = corpus_path(args, workdir, corpus)
+        if path.exists():
+            continue
+        # Written under a temporary name, so an interrupted run is not reused
+        partial = path.with_name(path.name + ".partial")
+        if corpus == "large":
+            print(f"writing {args.large_mib} MiB corpus to {path}", file=sys.stderr)
+            corpora.write_large(partial, args.large_mib * 1024 * 1024, args.seed)
+        elif corpus == "batch":
+            corpora.write_batch(partial, args.batch_files, args.seed)
+        else:
+            document = corpora.make(corpus, args.seed, args.scale)
+            partial.write_bytes(json.dumps(document, indent=2).encode())
+        os.replace(partial, path)
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine and versions, to judge whether two runs compare."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    try:
+        from importlib.metadata import version
+
+        package_version = version("jsonbrotliminifyer")
+    except Exception:
+        package_version = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "package_version": package_version,
+        "brotli_version": getattr(brotli, "__version__", None),
+        "serializer": jsonbrotliminifyer.get_serializer().name,
+        "git_commit": commit or None,
+    }
+
+
+def format_row(result: Dict[str, Any]) -> str:
+    if "error" in result:
+        return f"{result['id']:<46} ERROR {result['error']}"
+    peak = result["peak_rss_delta_mib"]
+    if peak is None:
+        peak = result["peak_rss_mib"]
+    return (
+        f"{result['id']:<46} {result['ratio']:>7.2f} {result['mib_per_s']:>9.1f} "
+        f"{result['p50_ms']:>10.3f} {result['p99_ms']:>10.3f} "
+        f"{peak if peak is not None else float('nan'):>9.1f} {result['runs']:>5}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quality", type=int, nargs="+", default=[1, 5, 9, 11])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument(
+        "--executor", nargs="+", choices=["thread", "process"], default=["thread"]
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Size factor of the corpora"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--large-mib",
+        type=int,
+        default=64,
+        help="Size of the large file corpus, 0 to skip (default: 64)",
+    )
+    parser.add_argument(
+        "--large-quality",
+        type=int,
+        nargs="+",
+        default=[5],
+        help="Quality levels for the large file (default: 5)",
+    )
+    parser.add_argument(
+        "--batch-files",
+        type=int,
+        default=500,
+        help="Files in the batch corpus, 0 to skip (default: 500)",
+    )
+    parser.add_argument("--min-time", type=float, default=0.5)
+    parser.add_argument("--min-runs", type=int, default=5)
+    parser.add_argument("--max-runs", type=int, default=2000)
+    parser.add_argument(
+        "--only", nargs="+", help="Run the cases whose id matches one of these globs"
+    )
+    parser.add_argument(
+        "--workdir",
+        type=Path,
+        help="Keep generated corpora here between runs (default: a temporary dir)",
+    )
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    parser.add_argument("--list", action="store_true", help="List case ids and exit")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workdir = args.workdir or Path(temp_dir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        cases = build_cases(args, workdir.resolve())
+        if args.list:
+            print("\n".join(case["id"] for case in cases))
+            return
+        prepare_workdir(args, workdir, cases)
+
+        header = (
+            f"{'case':<46} {'ratio':>7} {'MiB/s':>9} {'p50 ms':>10} "
+            f"{'p99 ms':>10} {'peak MiB':>9} {'runs':>5}"
+        )
+        print(header)
+        print("-" * len(header))
+        results = []
+        for case in cases:
+            child = subprocess.run(
+                [sys.executable, __file__, "--run-case", json.dumps(case)],
+                capture_output=True,
+                text=True,
+            )
+            if child.returncode == 0:
+                result = json.loads(child.stdout.splitlines()[-1])
+            else:
+                lines = child.stderr.strip().splitlines() or ["no output"]
+                result = {"id": case["id"], "error": lines[-1]}
+            results.append(result)
+            print(format_row(result), flush=True)
+
+    if args.output:
+        config = {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "workdir", "list", "run_case")
+        }
+        report = {
+            "schema": SCHEMA,
+            "environment": environment(),
+            "config": config,
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"wrote {args.output}", file=sys.stderr)
+    if any("error" in result for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Compare two bench_suite.py result files and flag regressions.
+
+Usage:
+    python benchmarks/compare.py baseline.json current.json [--threshold 0.10]
+        [--p99-threshold 0.25] [--ratio-threshold 0.01] [--memory-threshold 0.20]
+
+A case regresses when its throughput drops, its p99 latency or peak memory
+grows, or its compression ratio drops by more than the given fraction. Memory
+changes under 1 MiB are ignored. Cases whose input differs between the runs,
+by corpus digest, are reported but not compared. Exits with status 1 if any
+case regressed, so the script can gate a CI job.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Environment fields that make timings incomparable when they differ
+ENVIRONMENT_KEYS = (
+    "machine",
+    "cpu_count",
+    "python",
+    "implementation",
+    "brotli_version",
+    "serializer",
+)
+
+MEMORY_FLOOR_MIB = 1.0
+
+
+def load(path: Path) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+    report = json.loads(path.read_text())
+    results = {result["id"]: result for result in report["results"]}
+    return report.get("environment", {}), results
+
+
+def peak_memory(result: Dict[str, Any]) -> Optional[float]:
+    """Peak memory of a case: the growth over setup where known, else the peak."""
+    delta = result.get("peak_rss_delta_mib")
+    return delta if delta is not None else result.get("peak_rss_mib")
+
+
+def change(old: float, new: float) -> float:
+    return (new - old) / old if old else 0.0
+
+
+def compare_case(
+    old: Dict[str, Any], new: Dict[str, Any], args: argparse.Namespace
+) -> Tuple[List[str], List[str]]:
+    """Return the formatted changes of one case and the metrics that regressed."""
+    cells = []
+    regressed = []
+    checks = (
+        ("MiB/s", old["mib_per_s"], new["mib_per_s"], -args.threshold),
+        ("p99", old["p99_ms"], new["p99_ms"], args.p99_threshold),
+        ("ratio", old["ratio"], new["ratio"], -args.ratio_threshold),
+    )
+    for name, before, after, limit in checks:
+        delta = change(before, after)
+        bad = delta < limit if limit < 0 else delta > limit
+        cells.append(f"{delta:>+8.1%}{'!' if bad else ' '}")
+        if bad:
+            regressed.append(name)
+    before_mem, after_mem = peak_memory(old), peak_memory(new)
+    if before_mem is None or after_mem is None:
+        cells.append(f"{'-':>8} ")
+    else:
+        delta = change(before_mem, after_mem)
+        bad = (
+            delta > args.memory_threshold and after_mem - before_mem > MEMORY_FLOOR_MIB
+        )
+        cells.append(f"{delta:>+8.1%}{'!' if bad else ' '}")
+        if bad:
+            regressed.append("memory")
+    return cells, regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("current", type=Path)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Largest tolerated throughput drop (default: 0.10)",
+    )
+    parser.add_argument(
+        "--p99-threshold",
+        type=float,
+        default=0.25,
+        help="Largest tolerated p99 latency growth (default: 0.25)",
+    )
+    parser.add_argument(
+        "--ratio-threshold",
+        type=float,
+        default=0.01,
+        help="Largest tolerated compression ratio drop (default: 0.01)",
+    )
+    parser.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=0.20,
+        help="Largest tolerated peak memory growth (default: 0.20)",
+    )
+    args = parser.parse_args()
+
+    old_env, old_results = load(args.baseline)
+    new_env, new_results = load(args.current)
+    for key in ENVIRONMENT_KEYS:
+        if old_env.get(key) != new_env.get(key):
+            print(
+                f"warning: {key} differs: {old_env.get(key)} -> {new_env.get(key)}",
+                file=sys.stderr,
+            )
+
+    header = f"{'case':<46} {'MiB/s':>9} {'p99':>9} {'ratio':>9} {'memory':>9}"
+    print(header)
+    print("-" * len(header))
+    regressions = []
+    for case_id, new in new_results.items():
+        old = old_results.get(case_id)
+        if old is None:
+            print(f"{case_id:<46} new case")
+            continue
+        if "error" in old or "error" in new:
+            print(f"{case_id:<46} error: {new.get('error') or old.get('error')}")
+            if "error" in new:
+                regressions.append((case_id, ["error"]))
+            continue
+        if old.get("corpus_digest") != new.get("corpus_digest"):
+            print(f"{case_id:<46} input differs, not compared")
+            continue
+        cells, regressed = compare_case(old, new, args)
+        print(f"{case_id:<46} {' '.join(cells)}")
+        if regressed:
+            regressions.append((case_id, regressed))
+    missing = len(old_results.keys() - new_results.keys())
+    if missing:
+        print(f"{missing} baseline cases not in {args.current}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regressed:")
+        for case_id, metrics in regressions:
+            print(f"  {case_id}: {', '.join(metrics)}")
+        sys.exit(1)
+    print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Deterministic synthetic corpora for the benchmark suite.
+
+Every generator takes a seed, so two runs with the same seed and scale produce
+byte-identical JSON and their results can be compared. Sizes below are for
+scale 1.0; the suite scales row and point counts linearly.
+"""
+
+import hashlib
+import json
+import math
+import random
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Union
+
+COUNTRIES = ["DE", "FR", "US", "JP", "BR", "IN", "GB", "NL"]
+STATUSES = ["active", "suspended", "pending", "closed"]
+
+
+def tiny(rng: random.Random, scale: float) -> Any:
+    """A ~350 byte API response: one user with a few nested fields."""
+    return {
+        "id": rng.randrange(10**9),
+        "login": f"user{rng.randrange(10**6)}",
+        "email": f"user{rng.randrange(10**6)}@example.com",
+        "status": rng.choice(STATUSES),
+        "country": rng.choice(COUNTRIES),
+        "created_at": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T"
+        f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z",
+        "profile": {
+            "display_name": f"User {rng.randrange(10**4)}",
+            "bio": " ".join(
+                rng.choice(["fast", "json", "data", "team", "lead", "ops"])
+                for _ in range(12)
+            ),
+            "followers": rng.randrange(10**5),
+        },
+        "roles": rng.sample(["admin", "editor", "viewer", "billing", "support"], 2),
+        "links": {"self": "/api/v1/users/1", "teams": "/api/v1/users/1/teams"},
+    }
+
+
+def records(rng: random.Random, scale: float) -> Any:
+    """~2 MiB array of same-shaped order records, the common export shape."""
+    rows = max(1, int(15000 * scale))
+    return [
+        {
+            "id": 100000 + i,
+            "user": f"user{rng.randrange(rows)}",
+            "country": rng.choice(COUNTRIES),
+            "amount": round(rng.uniform(1, 500), 2),
+            "currency": "EUR",
+            "paid": rng.random() < 0.9,
+            "status": rng.choice(STATUSES),
+            "created": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        }
+        for i in range(rows)
+    ]
+
+
+def nested(rng: random.Random, scale: float) -> Any:
+    """~350 KiB of configuration-like trees, each 48 levels deep."""
+
+    def branch(depth: int) -> Any:
+        node: Dict[str, Any] = {
+            "name": f"node{rng.randrange(1000)}",
+            "enabled": rng.random() < 0.5,
+            "weight": rng.randint(0, 100),
+        }
+        if depth:
+            node["child"] = branch(depth - 1)
+            node["tags"] = [f"t{rng.randrange(50)}" for _ in range(rng.randint(0, 3))]
+        return node
+
+    return {"trees": [branch(48) for _ in range(max(1, int(100 * scale)))]}
+
+
+def telemetry(rng: random.Random, scale: float) -> Any:
+    """~1.2 MiB of numeric time series: timestamps, floats and counters."""
+    points = max(1, int(50000 * scale))
+    start = 1700000000000
+    return {
+        "device": "sensor-17",
+        "timestamps": [start + i * 1000 + rng.randint(-3, 3) for i in range(points)],
+        "temperature": [
+            round(21 + 4 * math.sin(i / 600) + rng.gauss(0, 0.2), 2)
+            for i in range(points)
+        ],
+        "counts": [rng.randint(0, 5000) for _ in range(points)],
+    }
+
+
+# In-memory corpora by name
+CORPORA: Dict[str, Callable[[random.Random, float], Any]] = {
+    "tiny": tiny,
+    "records": records,
+    "nested": nested,
+    "telemetry": telemetry,
+}
+
+
+def make(name: str, seed: int, scale: float) -> Any:
+    """Build an in-memory corpus from its name, seed and scale."""
+    return CORPORA[name](random.Random(f"{name}-{seed}"), scale)
+
+
+def digest(data: bytes) -> str:
+    """Short content hash, stored with results so runs on different data are spotted."""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def _record_lines(rng: random.Random) -> Iterator[bytes]:
+    for i in range(10**12):
+        yield json.dumps(
+            {
+                "id": i,
+                "user": f"user{rng.randrange(10**6)}",
+                "country": rng.choice(COUNTRIES),
+                "amount": round(rng.uniform(1, 500), 2),
+                "status": rng.choice(STATUSES),
+                "note": " ".join(
+                    rng.choice(["late", "gift", "retry", "bulk", "vip"])
+                    for _ in range(rng.randint(0, 6))
+                ),
+            },
+            separators=(",", ":"),
+        ).encode()
+
+
+def write_large(path: Union[str, Path], size: int, seed: int) -> None:
+    """
+    Write a JSON array of records of about size bytes to path.
+
+    The file is generated in 1 MiB pieces, so multi-GB corpora need no more
+    memory than small ones.
+    """
+    rng = random.Random(f"large-{seed}")
+    written = 1
+    with open(path, "wb") as f:
+        f.write(b"[")
+        piece: List[bytes] = []
+        piece_size = 0
+        for line in _record_lines(rng):
+            if written > 1 or piece:
+                piece.append(b",")
+                piece_size += 1
+            piece.append(line)
+            piece_size += len(line)
+            if piece_size >= 1 << 20 or written + piece_size >= size:
+                f.write(b"".join(piece))
+                written += piece_size
+                piece = []
+                piece_size = 0
+                if written >= size:
+                    break
+        f.write(b"]")
+
+
+def write_batch(directory: Union[str, Path], count: int, seed: int) -> List[Path]:
+    """Write count JSON documents for the batch functions, mostly 3-10 KiB each."""
+    rng = random.Random(f"batch-{seed}")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        # Mostly small files with a long tail, as in a typical object store
+        rows = min(400, int(rng.paretovariate(1.2) * 8))
+        document = {
+            "page": i,
+            "items": [tiny(rng, 1.0) for _ in range(rows)],
+        }
+        path = directory / f"doc{i:06d}.json"
+        with open(path, "w") as f:
+            json.dump(document, f, separators=(",", ":"))
+        paths.append(path)
+    return paths
@@ -1,11 +1,227 @@
-import json
 import brotli
 import os
+import codecs
+import hashlib
 import logging
+import itertools
+import time
 import tempfile
+import contextlib
 import concurrent.futures
+import functools
+import io
+import mmap
+import queue
+import stat
 from pathlib import Path
-from typing import Any, Union, cast, List, Optional, Sequence, Tuple
+from typing import (
+    IO,
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    Union,
+    cast,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from . import _parallel, _transforms
+from ._pointer import parse_pointer, resolve_pointer
+from ._scanner import (
+    JsonCursor,
+    JsonReformatter,
+    JsonScanner,
+    JsonTokenizer,
+    JsonValidator,
+    find_value,
+)
+from ._transforms import COLUMNAR_MIN_ROWS, PACK_MIN_LENGTH
+from .cache import DEFAULT_CACHE_BYTES, CacheStats, CompressionCache
+from .serializers import Serializer, available_serializers, get_serializer
+from .stats import (
+    STAGES,
+    StageRecord,
+    StageStats,
+    StageTotals,
+    _replay,
+    _StageClock,
+    _StageLog,
+    _worker_name,
+)
+
+__all__ = [
+    "AUTO_BUDGET_MS_PER_MB",
+    "AUTO_QUALITY_LEVELS",
+    "AUTO_SAMPLE_SIZE",
+    "ArchiveMember",
+    "ArchiveReader",
+    "ArchiveWriter",
+    "BrotliJsonSession",
+    "COLUMNAR_MIN_ROWS",
+    "CacheStats",
+    "CompressionCache",
+    "ContainerReader",
+    "DEFAULT_ARCHIVE_BLOCK_SIZE",
+    "DEFAULT_BLOCK_SIZE",
+    "DEFAULT_CACHE_BYTES",
+    "DEFAULT_CHUNK_SIZE",
+    "DEFAULT_FLUSH_BYTES",
+    "DEFAULT_LGBLOCK",
+    "DEFAULT_LGWIN",
+    "DEFAULT_MODE",
+    "DecompressionLimitError",
+    "FileStats",
+    "JsonlReader",
+    "JsonlWriter",
+    "MANIFEST_NAME",
+    "PRESETS",
+    "PACK_MIN_LENGTH",
+    "PARALLEL_BLOCK_SIZE",
+    "PROCESS_POOL_MIN_BYTES",
+    "STAGES",
+    "Serializer",
+    "StageStats",
+    "StageTotals",
+    "VALIDATE_LEVELS",
+    "available_serializers",
+    "compress_json",
+    "compress_json_async",
+    "compress_json_bytes",
+    "compress_json_container",
+    "compress_json_file",
+    "compress_json_file_async",
+    "compress_json_files",
+    "compress_json_files_async",
+    "compress_json_stream",
+    "decompress_json",
+    "decompress_json_async",
+    "decompress_json_container",
+    "decompress_json_file",
+    "decompress_json_file_async",
+    "decompress_json_files",
+    "decompress_json_files_async",
+    "decompress_json_stream",
+    "get_serializer",
+    "iter_compress_json_files",
+    "iter_decompress_json_files",
+    "pack_json_files",
+    "preset_options",
+    "query_json",
+    "query_json_file",
+    "select_quality",
+    "unpack_json_archive",
+]
+
+# Size of the blocks read from and written to disk by the streaming file paths.
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# Decompressed block size used by query_json; small blocks let it stop soon after
+# the target value ends.
+_QUERY_BLOCK_SIZE = 64 * 1024
+
+# Uncompressed bytes per block when one payload is compressed on several threads
+# (workers > 1). Independent blocks of this size lose no ratio on JSON, since the
+# default 4 MiB window cannot reach further back anyway.
+PARALLEL_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Checks compress_json_bytes and raw compress_json_file can run on input bytes:
+# none, a structural scan in bounded memory (JsonScanner), or a full parse.
+VALIDATE_LEVELS = ("none", "scan", "parse")
+
+# Total input size from which executor="auto" switches the batch functions to a
+# process pool; below it, pool startup costs more than the GIL contention.
+PROCESS_POOL_MIN_BYTES = 16 * 1024 * 1024
+
+# Peak memory of compressing one file, as used by memory_limit: the parsed object,
+# its serialized copy and the input bytes take up to about this many times the
+# file size (measured on record lists; number arrays and text need less) ...
+_MEMORY_PER_INPUT_BYTE = 6
+# ... plus the Brotli encoder, by quality, at the default window. "auto" may pick 11.
+_ENCODER_MEMORY = ((1, 8 << 20), (4, 24 << 20), (9, 56 << 20), (11, 80 << 20))
+
+# Brotli encoder defaults. JSON is always UTF-8 text, so MODE_TEXT is the default.
+DEFAULT_MODE: int = brotli.MODE_TEXT
+DEFAULT_LGWIN = 22
+DEFAULT_LGBLOCK = 0
+
+# Named encoder presets: (quality for payloads up to the size, ...) pairs checked in
+# order, and the largest window the preset may use. The window is shrunk to fit
+# smaller payloads, which cuts the encoder's setup cost for tiny documents.
+PRESETS: Dict[str, Tuple[Tuple[Tuple[int, int], ...], int]] = {
+    "latency": (((64 * 1024, 5), (4 * 1024 * 1024, 4), (2**63, 2)), 20),
+    "balanced": (((64 * 1024, 9), (4 * 1024 * 1024, 7), (2**63, 5)), 22),
+    "archive": (((2**63, 11),), 24),
+}
+
+# quality="auto" trial-compresses a sample of the payload at these levels and keeps
+# the best ratio whose measured cost fits the budget.
+AUTO_QUALITY_LEVELS = (2, 4, 5, 6, 7, 9, 11)
+AUTO_BUDGET_MS_PER_MB = 50.0
+AUTO_SAMPLE_SIZE = 128 * 1024
+
+# Conservative slowdown of each level over the previous one in AUTO_QUALITY_LEVELS;
+# a level whose predicted cost is already over budget is not tried. Quality 10 and
+# 11 switch to a much slower block splitter.
+_AUTO_SLOWDOWN = {4: 2.0, 5: 2.0, 6: 2.0, 7: 2.0, 9: 3.0, 11: 20.0}
+
+# Number of evenly spaced slices the sample is cut from, so that a payload whose
+# head differs from its body (an envelope around a record array) is judged fairly
+_AUTO_SAMPLE_SLICES = 4
+
+# Share of a batch deadline given to the Brotli step; the rest is left for reading,
+# parsing, serializing and writing the files.
+_AUTO_DEADLINE_SHARE = 0.5
+
+# Compression quality: 0-11, or "auto" to choose one per payload
+QualityOption = Union[int, str]
+
+# A serializer backend name or instance, see serializers.get_serializer
+SerializerOption = Union[str, Serializer]
+
+# Serialized JSON given to compress_json_bytes, or a view of a mapped input file
+BytesLike = Union[bytes, memoryview]
+
+# Pool for the batch functions: "thread", "process", "auto" or a running Executor
+ExecutorOption = Union[str, concurrent.futures.Executor]
+
+# (input path, output path, keyword arguments for the per-file function)
+BatchTask = Tuple[Union[str, Path], Union[str, Path], Dict[str, Any]]
+
+# A BatchTask plus the manifest entry recorded for the output by an earlier run
+IncrementalTask = Tuple[
+    Union[str, Path], Union[str, Path], Dict[str, Any], Optional[Dict[str, Any]]
+]
+
+
+class FileStats(NamedTuple):
+    """Figures for one file, yielded by iter_compress_json_files and friends."""
+
+    input_bytes: int
+    output_bytes: int
+    seconds: float
+    # Peak memory the scheduler budgeted for the file, see compress_json_files
+    memory_estimate: int = 0
+
+
+# (input path, output path, None or the exception raised for that file, stats)
+FileResult = Tuple[Union[str, Path], Path, Optional[Exception], FileStats]
+
+_Task = TypeVar("_Task")
+_Result = TypeVar("_Result")
+_Key = TypeVar("_Key")
+
+# File kept in the output directory by compress_json_files(incremental=True)
+MANIFEST_NAME = ".jsonbrotliminifyer-manifest.json"
+_MANIFEST_VERSION = 1
 
 
 def _validate_path(path: Union[str, Path], base_dir: Optional[str] = None) -> None:
@@ -22,52 +238,865 @@ def _validate_path(path: Union[str, Path], base_dir: Optional[str] = None) -> No
         raise ValueError(f"Potentially dangerous path: {path_str}")
 
 
-def compress_json(json_obj: Any, quality: int = 11) -> bytes:
+def _validate_chunk_size(chunk_size: int) -> None:
+    """Validate the block size used by the streaming file paths."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+
+def _remove_temp_file(temp_path: str) -> None:
+    """Best-effort removal of a temporary output file."""
+    if os.path.exists(temp_path):
+        try:
+            os.remove(temp_path)
+        except Exception as cleanup_error:
+            logging.warning(f"Failed to remove temp file {temp_path}: {cleanup_error}")
+
+
+@contextlib.contextmanager
+def _atomic_output(
+    output_path: Union[str, Path],
+    mode: str = "wb",
+    stats: Optional[StageStats] = None,
+    stage: str = "write",
+    bytes_in: int = 0,
+) -> Iterator[IO[Any]]:
+    """
+    Open a temporary file next to output_path and move it into place on success.
+
+    The temporary file is removed if the body raises or the final os.replace fails,
+    so a partially written output never becomes visible under output_path. With
+    stats, the body is recorded as stage, with the bytes written as its output,
+    and the os.replace as "replace".
+    """
+    output_path_str = str(output_path)
+    start = time.perf_counter() if stats is not None else 0.0
+    temp_fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(output_path_str), suffix=".tmp"
+    )
+    try:
+        encoding = None if "b" in mode else "utf-8"
+        with os.fdopen(temp_fd, mode, encoding=encoding) as temp_f:
+            yield temp_f
+        if stats is not None:
+            written = os.path.getsize(temp_path)
+            start = stats.lap(stage, start, bytes_in, written)
+        os.replace(temp_path, output_path_str)
+        if stats is not None:
+            stats.lap("replace", start)
+    except PermissionError:
+        _remove_temp_file(temp_path)
+        raise ValueError(f"Permission denied writing to output file: {output_path}")
+    except OSError as e:
+        _remove_temp_file(temp_path)
+        raise ValueError(f"Error writing to output file: {output_path} - {e}")
+    except BaseException:
+        _remove_temp_file(temp_path)
+        raise
+
+
+def _open_input(input_path: Union[str, Path]) -> BinaryIO:
+    """Open an input file for binary reading, mapping OS errors to ValueError."""
+    try:
+        return open(input_path, "rb")
+    except FileNotFoundError:
+        raise ValueError(f"Input file does not exist: {input_path}")
+    except PermissionError:
+        raise ValueError(f"Permission denied reading input file: {input_path}")
+    except OSError as e:
+        raise ValueError(f"Error reading input file: {input_path} - {e}")
+
+
+@contextlib.contextmanager
+def _map_input(f: BinaryIO, input_path: Union[str, Path]) -> Iterator[BytesLike]:
+    """
+    Map an open input file read-only and yield a view of its bytes.
+
+    Empty files, which cannot be mapped, and non-regular files such as pipes are
+    read into memory instead.
+    """
+    mapped = None
+    try:
+        st = os.fstat(f.fileno())
+        if stat.S_ISREG(st.st_mode) and st.st_size:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+    except OSError as e:
+        raise ValueError(f"Error reading input file: {input_path} - {e}")
+    if mapped is None:
+        yield data
+        return
+    with mapped, memoryview(mapped) as view:
+        yield view
+
+
+def _read_chunks(
+    f: BinaryIO, input_path: Union[str, Path], chunk_size: int
+) -> Iterator[bytes]:
+    """Yield successive blocks of at most chunk_size bytes from f."""
+    while True:
+        try:
+            chunk = f.read(chunk_size)
+        except OSError as e:
+            raise ValueError(f"Error reading input file: {input_path} - {e}")
+        if not chunk:
+            return
+        yield chunk
+
+
+class DecompressionLimitError(ValueError):
+    """Decompressed data exceeded max_output_size or max_ratio."""
+
+
+class _OutputLimit:
+    """
+    Count decompressed bytes against max_output_size and max_ratio.
+
+    The ratio is taken against compressed_size when the input size is known up
+    front, else against the compressed bytes consumed so far.
+    """
+
+    def __init__(
+        self,
+        max_output_size: Optional[int],
+        max_ratio: Optional[float],
+        compressed_size: int = 0,
+    ) -> None:
+        self.max_output_size = max_output_size
+        self.max_ratio = max_ratio
+        self.compressed_size = compressed_size
+        self.consumed = 0
+        self.output = 0
+
+    def consume(self, size: int) -> None:
+        self.consumed += size
+
+    def add(self, size: int) -> None:
+        """Count size more output bytes, raising once a limit is exceeded."""
+        self.output += size
+        if self.max_output_size is not None and self.output > self.max_output_size:
+            raise DecompressionLimitError(
+                f"Decompressed data exceeds max_output_size of {self.max_output_size} bytes"
+            )
+        compressed = max(self.compressed_size, self.consumed)
+        if self.max_ratio is not None and self.output > self.max_ratio * compressed:
+            raise DecompressionLimitError(
+                f"Decompressed data exceeds max_ratio of {self.max_ratio:g} "
+                f"({self.output} bytes from {compressed} compressed)"
+            )
+
+
+def _validate_limits(
+    max_output_size: Optional[int], max_ratio: Optional[float]
+) -> None:
+    if max_output_size is not None and max_output_size <= 0:
+        raise ValueError("max_output_size must be positive")
+    if max_ratio is not None and max_ratio <= 0:
+        raise ValueError("max_ratio must be positive")
+
+
+def _output_limit(
+    max_output_size: Optional[int],
+    max_ratio: Optional[float],
+    compressed_size: int = 0,
+) -> Optional[_OutputLimit]:
+    """Return an _OutputLimit for the options given, or None if neither is set."""
+    _validate_limits(max_output_size, max_ratio)
+    if max_output_size is None and max_ratio is None:
+        return None
+    return _OutputLimit(max_output_size, max_ratio, compressed_size)
+
+
+def _iter_decompress(
+    chunks: Iterable[BytesLike], block_size: int, limit: Optional[_OutputLimit] = None
+) -> Iterator[bytes]:
+    """
+    Decompress a Brotli stream given as a sequence of input chunks.
+
+    Each output block is roughly limited to block_size bytes, so a highly
+    compressible input never expands into one large buffer. Every block is
+    counted against limit, if given, before it is yielded.
+
+    Raises:
+        ValueError: If the data is not a complete, valid Brotli stream
+        DecompressionLimitError: If the output exceeds limit
+    """
+    decompressor = brotli.Decompressor()
+
+    def step(chunk: BytesLike) -> bytes:
+        block: bytes = decompressor.process(chunk, output_buffer_limit=block_size)
+        if limit is not None:
+            limit.add(len(block))
+        return block
+
+    try:
+        for chunk in chunks:
+            if limit is not None:
+                limit.consume(len(chunk))
+            block = step(chunk)
+            if block:
+                yield block
+            while not decompressor.can_accept_more_data():
+                block = step(b"")
+                if block:
+                    yield block
+        # Output may still be pending after the last input chunk
+        while not decompressor.is_finished():
+            block = step(b"")
+            if not block:
+                break
+            yield block
+    except brotli.error as e:
+        raise ValueError("Invalid Brotli-compressed data") from e
+    if not decompressor.is_finished():
+        raise ValueError("Invalid Brotli-compressed data")
+
+
+def _iter_file_blocks(
+    f: BinaryIO,
+    input_path: Union[str, Path],
+    chunk_size: int,
+    block_size: int,
+    limit: Optional[_OutputLimit] = None,
+) -> Iterator[bytes]:
+    """Decompress an open file in blocks, whether it holds one stream or frames."""
+    magic = f.read(len(_parallel.MAGIC))
+    f.seek(0)
+    if not _parallel.is_parallel(magic):
+        chunks = _read_chunks(f, input_path, chunk_size)
+        return _iter_decompress(chunks, block_size, limit)
+
+    def read(size: int) -> bytes:
+        try:
+            return f.read(size)
+        except OSError as e:
+            raise ValueError(f"Error reading input file: {input_path} - {e}")
+
+    return _parallel.iter_frames(read, limit.add if limit is not None else None)
+
+
+def _peek_head(blocks: Iterator[bytes]) -> Tuple[bytes, Iterator[bytes]]:
+    """Read enough decompressed blocks to detect a transform envelope."""
+    head = b""
+    for block in blocks:
+        head += block
+        if len(head) >= len(_transforms.ENVELOPE_MAGIC):
+            break
+    return head, blocks
+
+
+def _validate_block(
+    validator: JsonValidator,
+    decoder: codecs.IncrementalDecoder,
+    block: bytes,
+    final: bool = False,
+) -> None:
+    """Feed a block of UTF-8 JSON to an incremental validator."""
+    try:
+        validator.feed(decoder.decode(block, final))
+        if final:
+            validator.close()
+    except ValueError as e:
+        raise ValueError(f"Decompressed data is not valid JSON - {e}") from e
+
+
+def preset_options(preset: str, size: int) -> Dict[str, int]:
+    """
+    Return the Brotli quality, lgwin and lgblock a preset uses for a payload size.
+
+    Args:
+        preset: "latency", "balanced" or "archive"
+        size: Size of the uncompressed payload in bytes
+
+    Raises:
+        ValueError: If the preset name is unknown
+    """
+    if preset not in PRESETS:
+        raise ValueError(
+            f"Unknown preset: {preset!r}; expected one of {', '.join(PRESETS)}"
+        )
+    qualities, max_lgwin = PRESETS[preset]
+    quality = next(q for limit, q in qualities if size <= limit)
+    # Smallest window (2**lgwin - 16 bytes) that holds the whole payload
+    lgwin = max(10, min(max_lgwin, (size + 15).bit_length()))
+    return {"quality": quality, "lgwin": lgwin, "lgblock": DEFAULT_LGBLOCK}
+
+
+def _encoder_options(
+    quality: QualityOption,
+    mode: int,
+    lgwin: int,
+    lgblock: int,
+    preset: Optional[str],
+    size: int,
+) -> Dict[str, Any]:
+    """
+    Validate Brotli encoder parameters, applying a preset if one is given.
+
+    quality stays "auto" in the result; _compress_bytes resolves it per payload.
+    """
+    if preset is not None:
+        options = preset_options(preset, size)
+        quality, lgwin, lgblock = (
+            options["quality"],
+            options["lgwin"],
+            options["lgblock"],
+        )
+    if quality != "auto" and (not isinstance(quality, int) or not (0 <= quality <= 11)):
+        raise ValueError('Quality must be between 0 and 11 or "auto"')
+    if mode not in (brotli.MODE_GENERIC, brotli.MODE_TEXT, brotli.MODE_FONT):
+        raise ValueError("mode must be brotli.MODE_GENERIC, MODE_TEXT or MODE_FONT")
+    if not (10 <= lgwin <= 24):
+        raise ValueError("lgwin must be between 10 and 24")
+    if lgblock != 0 and not (16 <= lgblock <= 24):
+        raise ValueError("lgblock must be 0 or between 16 and 24")
+    return {"mode": mode, "quality": quality, "lgwin": lgwin, "lgblock": lgblock}
+
+
+def _validate_budget(quality: QualityOption, budget_ms_per_mb: Optional[float]) -> None:
+    if budget_ms_per_mb is None:
+        return
+    if quality != "auto":
+        raise ValueError('budget_ms_per_mb requires quality="auto"')
+    if budget_ms_per_mb <= 0:
+        raise ValueError("budget_ms_per_mb must be positive")
+
+
+def _quality_sample(data: BytesLike) -> BytesLike:
+    """Return data itself if it is small, else evenly spaced slices of it."""
+    if len(data) <= AUTO_SAMPLE_SIZE:
+        return data
+    piece = AUTO_SAMPLE_SIZE // _AUTO_SAMPLE_SLICES
+    step = (len(data) - piece) // (_AUTO_SAMPLE_SLICES - 1)
+    return b"".join(
+        data[i * step : i * step + piece] for i in range(_AUTO_SAMPLE_SLICES)
+    )
+
+
+def _select_quality(
+    data: BytesLike, budget_ms_per_mb: float, options: Dict[str, Any]
+) -> Tuple[int, Optional[bytes]]:
+    """
+    Pick a quality for data, see select_quality.
+
+    Returns the quality and, if the sample was the whole payload, its compressed
+    form at that quality so the caller does not compress it twice.
+    """
+    sample = _quality_sample(data)
+    sample_mb = max(len(sample), 1) / (1024 * 1024)
+    trial_options = dict(options)
+    best = AUTO_QUALITY_LEVELS[0]
+    best_size = None
+    best_output = None
+    cost = 0.0
+    for level in AUTO_QUALITY_LEVELS:
+        if best_size is not None and cost * _AUTO_SLOWDOWN[level] > budget_ms_per_mb:
+            break
+        trial_options["quality"] = level
+        start = time.perf_counter()
+        output = brotli.compress(sample, **trial_options)
+        cost = (time.perf_counter() - start) * 1000 / sample_mb
+        if best_size is not None and cost > budget_ms_per_mb:
+            break
+        # The fastest level is kept even when over budget; nothing is cheaper
+        if best_size is None or len(output) < best_size:
+            best, best_size, best_output = level, len(output), output
+    return best, (best_output if sample is data else None)
+
+
+def select_quality(
+    data: bytes,
+    budget_ms_per_mb: float = AUTO_BUDGET_MS_PER_MB,
+    mode: int = DEFAULT_MODE,
+    lgwin: int = DEFAULT_LGWIN,
+    lgblock: int = DEFAULT_LGBLOCK,
+) -> int:
+    """
+    Choose the Brotli quality giving the best ratio within a time budget.
+
+    A sample of at most AUTO_SAMPLE_SIZE bytes is compressed at each level in
+    AUTO_QUALITY_LEVELS, fastest first, until a level exceeds the budget. The
+    trials cost roughly twice the budget applied to the sample.
+
+    Args:
+        data: The serialized payload
+        budget_ms_per_mb: Compression time allowed per MiB of input, in ms
+        mode, lgwin, lgblock: Brotli encoder parameters, see compress_json
+
+    Returns:
+        int: The chosen quality; the lowest level in AUTO_QUALITY_LEVELS if even
+             that one exceeds the budget
+
+    Raises:
+        ValueError: If the budget or an encoder parameter is invalid
+    """
+    _validate_budget("auto", budget_ms_per_mb)
+    options = _encoder_options(0, mode, lgwin, lgblock, None, len(data))
+    return _select_quality(data, budget_ms_per_mb, options)[0]
+
+
+def _compress_bytes(
+    data: BytesLike,
+    options: Dict[str, Any],
+    budget_ms_per_mb: Optional[float],
+) -> bytes:
+    """Compress serialized JSON with validated options, resolving quality="auto"."""
+    if options["quality"] == "auto":
+        budget = AUTO_BUDGET_MS_PER_MB if budget_ms_per_mb is None else budget_ms_per_mb
+        options = dict(options)
+        options["quality"], compressed = _select_quality(data, budget, options)
+        if compressed is not None:
+            return compressed
+    return cast(bytes, brotli.compress(data, **options))
+
+
+def _validate_workers(workers: Optional[int], block_size: int) -> None:
+    """Validate the parallel compression parameters."""
+    if workers is not None and workers <= 0:
+        raise ValueError("workers must be positive")
+    if not (0 < block_size <= _parallel.MAX_BLOCK_SIZE):
+        raise ValueError("block_size must be positive and below 4 GiB")
+
+
+def _compress_payload(
+    data: BytesLike,
+    options: Dict[str, Any],
+    budget_ms_per_mb: Optional[float],
+    workers: Optional[int],
+    block_size: int,
+) -> bytes:
+    """Compress serialized JSON as one stream, or as frames on several threads."""
+    if workers is None or workers == 1 or len(data) <= block_size:
+        return _compress_bytes(data, options, budget_ms_per_mb)
+    if options["quality"] == "auto":
+        budget = AUTO_BUDGET_MS_PER_MB if budget_ms_per_mb is None else budget_ms_per_mb
+        options = dict(options)
+        options["quality"] = _select_quality(data, budget, options)[0]
+    view = memoryview(data)
+    blocks = (view[i : i + block_size] for i in range(0, len(data), block_size))
+    compress = functools.partial(brotli.compress, **options)
+    return b"".join(_parallel.compress_frames(blocks, compress, workers))
+
+
+def compress_json(
+    json_obj: Any,
+    quality: QualityOption = 11,
+    serializer: SerializerOption = "auto",
+    mode: int = DEFAULT_MODE,
+    lgwin: int = DEFAULT_LGWIN,
+    lgblock: int = DEFAULT_LGBLOCK,
+    preset: Optional[str] = None,
+    budget_ms_per_mb: Optional[float] = None,
+    columnar: bool = False,
+    pack_numbers: bool = False,
+    cache: Optional[CompressionCache] = None,
+    workers: Optional[int] = None,
+    block_size: int = PARALLEL_BLOCK_SIZE,
+    stats: Optional[StageStats] = None,
+) -> bytes:
     """
     Compress a JSON object using Brotli compression.
 
     Args:
         json_obj: A JSON-serializable Python object (dict, list, etc.)
-        quality: Compression quality level (0-11), default 11 (best compression)
+        quality: Compression quality level (0-11), default 11 (best compression),
+                 or "auto" to pick the best ratio within budget_ms_per_mb by
+                 trial-compressing a sample of the payload (see select_quality)
+        serializer: Serializer backend name ("auto", "json", "orjson", "ujson",
+                    "rapidjson") or a Serializer instance. The object is always
+                    written as compact JSON.
+        mode: Brotli encoder mode, default brotli.MODE_TEXT
+        lgwin: Base-2 logarithm of the sliding window size (10-24), default 22
+        lgblock: Base-2 logarithm of the maximum input block size (16-24), or 0 to
+                 let the encoder choose (default)
+        preset: "latency", "balanced" or "archive" to pick quality, lgwin and lgblock
+                from the payload size (see PRESETS); overrides those arguments
+        budget_ms_per_mb: Compression time allowed per MiB of JSON when quality is
+                          "auto", default AUTO_BUDGET_MS_PER_MB
+        columnar: Store lists of at least COLUMNAR_MIN_ROWS dicts with the same keys
+                  as one key list plus one array per column. The output is no
+                  longer plain JSON once decompressed; decompress_json detects it
+                  and restores the original structure.
+        pack_numbers: Store lists of at least PACK_MIN_LENGTH ints, or of floats,
+                      as packed little-endian binary next to the JSON text instead
+                      of decimal digits. Decimal floats such as 21.5 are stored as
+                      scaled integers, other floats as IEEE doubles; both restore
+                      every value bit for bit, including NaN and -0.0. Integers
+                      beyond 64 bits stay in the JSON text. Like columnar, the
+                      output needs this version of decompress_json to read.
+        cache: A CompressionCache; when the serialized payload and encoder
+               parameters match an earlier call, the stored result is returned
+               without compressing again
+        workers: Number of threads; above 1, payloads larger than block_size are
+                 cut into blocks that are compressed concurrently and written as
+                 a framed stream, like pigz. decompress_json reads it back, other
+                 Brotli decoders do not. Default None (one stream, one thread).
+        block_size: Uncompressed bytes per block when workers is above 1, default
+                    PARALLEL_BLOCK_SIZE
+        stats: A StageStats to record the time and bytes of each stage in
+               (serialize, compress). Off by default, which skips all timing.
 
     Returns:
         bytes: The compressed data as bytes
     """
-    if not (0 <= quality <= 11):
-        raise ValueError("Quality must be between 0 and 11")
-    json_str = json.dumps(json_obj)
-    json_bytes = json_str.encode("utf-8")
-    compressed = brotli.compress(json_bytes, quality=quality)
-    return cast(bytes, compressed)
+    _validate_budget(quality, budget_ms_per_mb)
+    _validate_workers(workers, block_size)
+    backend = get_serializer(serializer)
+    start = time.perf_counter() if stats is not None else 0.0
+    if columnar or pack_numbers:
+        json_bytes = _transforms.dumps(
+            json_obj, backend.dumps, columnar=columnar, pack_numbers=pack_numbers
+        )
+    else:
+        json_bytes = backend.dumps(json_obj)
+    if stats is not None:
+        stats.lap("serialize", start, 0, len(json_bytes))
+    options = _encoder_options(quality, mode, lgwin, lgblock, preset, len(json_bytes))
+    return _compress_cached(
+        json_bytes, options, budget_ms_per_mb, workers, block_size, cache, stats
+    )
+
+
+def _compress_cached(
+    data: BytesLike,
+    options: Dict[str, Any],
+    budget_ms_per_mb: Optional[float],
+    workers: Optional[int],
+    block_size: int,
+    cache: Optional[CompressionCache],
+    stats: Optional[StageStats] = None,
+) -> bytes:
+    """Compress serialized JSON through _compress_payload, consulting cache first."""
+    if stats is not None:
+        start = time.perf_counter()
+        result = _compress_cached(
+            data, options, budget_ms_per_mb, workers, block_size, cache
+        )
+        stats.lap("compress", start, len(data), len(result))
+        return result
+    compress_args = (options, budget_ms_per_mb, workers, block_size)
+    if cache is None:
+        return _compress_payload(data, *compress_args)
+    framed = workers is not None and workers > 1 and len(data) > block_size
+    key = cache.make_key(
+        data,
+        {
+            **options,
+            "budget": budget_ms_per_mb,
+            "block_size": block_size if framed else None,
+        },
+    )
+    compressed = cache.get(key)
+    if compressed is None:
+        compressed = _compress_payload(data, *compress_args)
+        cache.put(key, compressed)
+    return compressed
+
+
+def _check_validate(validate: str) -> None:
+    """Validate the validate option of the raw compression paths."""
+    if validate not in VALIDATE_LEVELS:
+        raise ValueError(f"validate must be one of {', '.join(VALIDATE_LEVELS)}")
+
+
+def _check_stream_validate(validate: str) -> None:
+    """Validate the validate option of paths that never hold the whole document."""
+    _check_validate(validate)
+    if validate == "parse":
+        raise ValueError('validate="parse" needs the whole document and cannot stream')
+
+
+def _decompress_validate(validate: Union[str, bool]) -> str:
+    """
+    Resolve the validate option of the decompression paths to a level.
+
+    They took a bool before VALIDATE_LEVELS; True still means "scan" and
+    False "none".
+    """
+    if isinstance(validate, bool):
+        validate = "scan" if validate else "none"
+    _check_stream_validate(validate)
+    return validate
+
+
+def _validate_json_bytes(data: BytesLike, validate: str, backend: Serializer) -> None:
+    """
+    Check serialized JSON at a level from VALIDATE_LEVELS.
+
+    Raises:
+        ValueError: If the check fails
+    """
+    if validate == "parse":
+        backend.loads(data)
+    elif validate == "scan":
+        scanner = JsonScanner()
+        with memoryview(data) as view:
+            for start in range(0, len(view), DEFAULT_CHUNK_SIZE):
+                scanner.feed(view[start : start + DEFAULT_CHUNK_SIZE].tobytes())
+        scanner.close()
 
 
-def decompress_json(compressed_bytes: bytes) -> Any:
+def _scan_chunks(
+    chunks: Iterable[bytes], input_path: Union[str, Path]
+) -> Iterator[bytes]:
+    """Pass chunks through, checking with JsonScanner that they form one document."""
+    scanner = JsonScanner()
+    try:
+        for chunk in chunks:
+            scanner.feed(chunk)
+            yield chunk
+        scanner.close()
+    except ValueError as e:
+        raise ValueError(f"Input file contains invalid JSON: {input_path} - {e}")
+
+
+def compress_json_bytes(
+    data: BytesLike,
+    quality: QualityOption = 11,
+    validate: str = "none",
+    serializer: SerializerOption = "auto",
+    mode: int = DEFAULT_MODE,
+    lgwin: int = DEFAULT_LGWIN,
+    lgblock: int = DEFAULT_LGBLOCK,
+    preset: Optional[str] = None,
+    budget_ms_per_mb: Optional[float] = None,
+    cache: Optional[CompressionCache] = None,
+    workers: Optional[int] = None,
+    block_size: int = PARALLEL_BLOCK_SIZE,
+    stats: Optional[StageStats] = None,
+) -> bytes:
+    """
+    Compress already serialized JSON without parsing and re-serializing it.
+
+    The bytes are stored as given, whitespace included, so decompress_json returns
+    the same document that json.loads(data) would.
+
+    Args:
+        data: UTF-8 JSON text as bytes or a memoryview (e.g. of an mmap)
+        quality: Compression quality level (0-11) or "auto", see compress_json
+        validate: How to check that data is JSON before compressing it: "none"
+                  (default), "scan" for a structural check with JsonScanner in
+                  bounded memory, or "parse" for a full parse with serializer
+        serializer: Serializer backend used when validate is "parse", see
+                    compress_json
+        mode, lgwin, lgblock, preset: Brotli encoder tuning, see compress_json
+        budget_ms_per_mb: Time budget for quality="auto", see compress_json
+        cache: A CompressionCache, see compress_json
+        workers, block_size: Compress blocks of the payload on several threads,
+                    see compress_json
+        stats: StageStats to record the validate and compress stages in, see
+               compress_json
+
+    Returns:
+        bytes: The compressed data as bytes
+
+    Raises:
+        ValueError: If an option is invalid or data fails the requested check
+    """
+    _check_validate(validate)
+    _validate_budget(quality, budget_ms_per_mb)
+    _validate_workers(workers, block_size)
+    start = time.perf_counter() if stats is not None else 0.0
+    try:
+        _validate_json_bytes(data, validate, get_serializer(serializer))
+    except ValueError as e:
+        raise ValueError(f"Input is not valid JSON - {e}") from e
+    if stats is not None and validate != "none":
+        stats.lap("validate", start, len(data))
+    options = _encoder_options(quality, mode, lgwin, lgblock, preset, len(data))
+    return _compress_cached(
+        data, options, budget_ms_per_mb, workers, block_size, cache, stats
+    )
+
+
+def _loads_payload(data: bytes, backend: Serializer) -> Any:
+    """Parse decompressed bytes, undoing any pre-transforms compress_json applied."""
+
+    def parse(text: Union[bytes, memoryview]) -> Any:
+        try:
+            return backend.loads(text)
+        except ValueError as e:
+            raise ValueError("Decompressed data is not valid JSON") from e
+
+    if _transforms.is_envelope(data):
+        return _transforms.loads(data, parse)
+    return parse(data)
+
+
+def decompress_json(
+    compressed_bytes: bytes,
+    serializer: SerializerOption = "auto",
+    max_output_size: Optional[int] = None,
+    max_ratio: Optional[float] = None,
+    stats: Optional[StageStats] = None,
+) -> Any:
     """
     Decompress Brotli-compressed data back to a JSON object.
 
+    Containers written by compress_json_container and framed output from
+    compress_json(workers=...) are recognised as well.
+
     Args:
         compressed_bytes: The compressed data as bytes
+        serializer: Serializer backend used to parse the JSON, see compress_json
+        max_output_size: Largest number of decompressed bytes to accept. With
+                         a limit set, data is decompressed in blocks of at
+                         most about 1 MiB and decompression stops at the first
+                         block past it, so untrusted input cannot expand
+                         without bound. Default None, no limit.
+        max_ratio: Largest accepted ratio of decompressed to compressed size,
+                   enforced the same way. Default None, no limit.
+        stats: StageStats to record the decompress and parse stages in, see
+               compress_json
 
     Returns:
         The original JSON object
 
     Raises:
         ValueError: If the data is not valid Brotli-compressed data or does not decode to valid JSON
+        DecompressionLimitError: A ValueError, if the decompressed data exceeds
+                                 max_output_size or max_ratio
     """
+    start = time.perf_counter() if stats is not None else 0.0
+    limit = _output_limit(max_output_size, max_ratio, len(compressed_bytes))
+    if is_container(compressed_bytes):
+        # Blocks are decompressed and parsed together; counted as one stage
+        with ContainerReader(
+            compressed_bytes,
+            serializer=serializer,
+            max_output_size=max_output_size,
+            max_ratio=max_ratio,
+        ) as reader:
+            json_obj = reader.read()
+        if stats is not None:
+            stats.lap("decompress", start, len(compressed_bytes))
+        return json_obj
+    if _parallel.is_parallel(compressed_bytes):
+        frames = _parallel.iter_frames(
+            io.BytesIO(compressed_bytes).read,
+            limit.add if limit is not None else None,
+        )
+        decompressed_bytes = b"".join(frames)
+    elif limit is not None:
+        blocks = _iter_decompress((compressed_bytes,), DEFAULT_CHUNK_SIZE, limit)
+        decompressed_bytes = b"".join(blocks)
+    else:
+        try:
+            decompressed_bytes = brotli.decompress(compressed_bytes)
+        except brotli.error as e:
+            raise ValueError("Invalid Brotli-compressed data") from e
+    if stats is None:
+        return _loads_payload(decompressed_bytes, get_serializer(serializer))
+    start = stats.lap(
+        "decompress", start, len(compressed_bytes), len(decompressed_bytes)
+    )
+    json_obj = _loads_payload(decompressed_bytes, get_serializer(serializer))
+    stats.lap("parse", start, len(decompressed_bytes))
+    return json_obj
+
+
+def _query_blocks(blocks: Iterator[bytes], pointer: str, backend: Serializer) -> Any:
+    """Extract the value at pointer from a stream of decompressed blocks."""
+    path = parse_pointer(pointer)
+    head, blocks = _peek_head(blocks)
+    if _transforms.is_envelope(head):
+        # Transformed payloads are not plain JSON text; decode them whole
+        json_obj = _loads_payload(head + b"".join(blocks), backend)
+        return resolve_pointer(json_obj, path)
+    text = find_value(JsonCursor(itertools.chain((head,), blocks)), path)
+    if text is None:
+        raise ValueError(f"JSON Pointer not found: {pointer!r}")
     try:
-        decompressed_bytes = brotli.decompress(compressed_bytes)
-    except brotli.error as e:
-        raise ValueError("Invalid Brotli-compressed data") from e
-    try:
-        json_str = decompressed_bytes.decode("utf-8")
-        json_obj = json.loads(json_str)
-    except json.JSONDecodeError as e:
+        return backend.loads(text)
+    except ValueError as e:
         raise ValueError("Decompressed data is not valid JSON") from e
-    return json_obj
+
+
+def query_json(
+    compressed_bytes: bytes, pointer: str, serializer: SerializerOption = "auto"
+) -> Any:
+    """
+    Extract one value from Brotli-compressed JSON without decoding the rest.
+
+    The data is decompressed in small blocks and scanned as it arrives. Members
+    and elements off the path are skipped by counting brackets, without building
+    Python objects, and decompression stops as soon as the target value is
+    complete, so a value near the start of a large document costs little. Payloads written
+    with columnar or pack_numbers are decoded whole; containers decode only the
+    blocks that hold the value.
+
+    Args:
+        compressed_bytes: The compressed data as bytes
+        pointer: JSON Pointer (RFC 6901) of the value, e.g. "/meta/version";
+                 "" selects the whole document
+        serializer: Serializer backend used to parse the value, see compress_json
+
+    Returns:
+        The value at pointer
+
+    Raises:
+        ValueError: If the pointer is malformed or does not exist, or the data is
+                    not valid Brotli-compressed JSON
+    """
+    backend = get_serializer(serializer)
+    if is_container(compressed_bytes):
+        with ContainerReader(compressed_bytes, serializer=backend) as reader:
+            return reader.get(pointer)
+    if _parallel.is_parallel(compressed_bytes):
+        blocks = _parallel.iter_frames(io.BytesIO(compressed_bytes).read)
+    else:
+        blocks = _iter_decompress((compressed_bytes,), _QUERY_BLOCK_SIZE)
+    return _query_blocks(blocks, pointer, backend)
+
+
+def query_json_file(
+    input_path: Union[str, Path],
+    pointer: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    serializer: SerializerOption = "auto",
+) -> Any:
+    """
+    Extract one value from a compressed JSON file, see query_json.
+
+    The file is read in blocks of chunk_size bytes and reading stops once the
+    value is complete.
+
+    Raises:
+        ValueError: If the input file cannot be read, the pointer is malformed or
+                    does not exist, or the data is not valid Brotli-compressed JSON
+    """
+    _validate_path(input_path)
+    _validate_chunk_size(chunk_size)
+    backend = get_serializer(serializer)
+    with _open_input(input_path) as f:
+        if is_container(f.read(len(CONTAINER_MAGIC))):
+            with ContainerReader(input_path, serializer=backend) as reader:
+                return reader.get(pointer)
+        f.seek(0)
+        blocks = _iter_file_blocks(f, input_path, chunk_size, _QUERY_BLOCK_SIZE)
+        return _query_blocks(blocks, pointer, backend)
 
 
 def compress_json_file(
-    input_path: Union[str, Path], output_path: Union[str, Path], quality: int = 11
+    input_path: Union[str, Path],
+    output_path: Union[str, Path],
+    quality: QualityOption = 11,
+    streaming: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    serializer: SerializerOption = "auto",
+    mode: int = DEFAULT_MODE,
+    lgwin: int = DEFAULT_LGWIN,
+    lgblock: int = DEFAULT_LGBLOCK,
+    preset: Optional[str] = None,
+    budget_ms_per_mb: Optional[float] = None,
+    columnar: bool = False,
+    pack_numbers: bool = False,
+    workers: Optional[int] = None,
+    block_size: int = PARALLEL_BLOCK_SIZE,
+    raw: bool = False,
+    validate: str = "none",
+    stats: Optional[StageStats] = None,
 ) -> None:
     """
     Compress a JSON file using Brotli compression.
@@ -75,7 +1104,36 @@ def compress_json_file(
     Args:
         input_path: Path to the input JSON file (str or Path)
         output_path: Path to the output compressed file (str or Path)
-        quality: Compression quality level (0-11), default 11 (best compression)
+        quality: Compression quality level (0-11), default 11 (best compression),
+                 or "auto", see compress_json. When streaming, the quality is chosen
+                 from the first chunk.
+        streaming: If True, feed the input to the compressor in blocks of chunk_size
+                   bytes instead of parsing it, so peak memory stays bounded by
+                   chunk_size and the Brotli window. The input bytes are stored
+                   as-is and are not checked for JSON validity.
+        chunk_size: Block size in bytes used when streaming, default 1 MiB
+        serializer: Serializer backend used to parse and re-serialize the document
+                    (ignored when streaming), see compress_json
+        mode, lgwin, lgblock, preset: Brotli encoder tuning, see compress_json.
+                    When streaming, presets are resolved from the input file size.
+        budget_ms_per_mb: Time budget for quality="auto", see compress_json
+        columnar: Store record lists column by column, see compress_json. Requires
+                  the document to be parsed, so it cannot be combined with streaming.
+        pack_numbers: Pack numeric arrays, see compress_json; not with streaming
+        workers, block_size: Compress blocks of the payload on several threads, see
+                    compress_json. When streaming, the file is read in blocks of
+                    block_size bytes instead of chunk_size and at most two blocks
+                    per worker are held in memory.
+        raw: If True, compress the input bytes as-is in one piece, like
+             compress_json_bytes, instead of parsing and re-serializing them. The
+             file is memory-mapped rather than read, so it is not copied into
+             the process.
+        validate: Check applied to the input bytes when raw or streaming, one of
+                  VALIDATE_LEVELS, see compress_json_bytes. Streaming supports
+                  "none" and "scan", which checks each chunk as it is read.
+        stats: A StageStats to record each stage in: read, parse, serialize,
+               compress, write and replace, or validate for raw input. When
+               streaming, reading and writing are counted in compress.
 
     Raises:
         ValueError: If the input file does not exist, is not readable, contains invalid JSON,
@@ -83,41 +1141,141 @@ def compress_json_file(
     """
     _validate_path(input_path)
     _validate_path(output_path)
+    _encoder_options(quality, mode, lgwin, lgblock, preset, 0)
+    _validate_budget(quality, budget_ms_per_mb)
+    _validate_workers(workers, block_size)
+    _check_validate(validate)
+    if raw and streaming:
+        raise ValueError("raw and streaming cannot be combined")
+    if (raw or streaming) and (columnar or pack_numbers):
+        raise ValueError(
+            "columnar and pack_numbers cannot be combined with raw or streaming"
+        )
+    if validate != "none" and not (raw or streaming):
+        raise ValueError("validate requires raw or streaming")
+    if raw:
+        backend = get_serializer(serializer)
+        start = time.perf_counter() if stats is not None else 0.0
+        with _open_input(input_path) as f, _map_input(f, input_path) as data:
+            if stats is not None:
+                start = stats.lap("read", start, len(data), len(data))
+            try:
+                _validate_json_bytes(data, validate, backend)
+            except ValueError as e:
+                raise ValueError(
+                    f"Input file contains invalid JSON: {input_path} - {e}"
+                )
+            if stats is not None and validate != "none":
+                stats.lap("validate", start, len(data))
+            compressed = compress_json_bytes(
+                data,
+                quality=quality,
+                mode=mode,
+                lgwin=lgwin,
+                lgblock=lgblock,
+                preset=preset,
+                budget_ms_per_mb=budget_ms_per_mb,
+                workers=workers,
+                block_size=block_size,
+                stats=stats,
+            )
+        with _atomic_output(output_path, stats=stats) as temp_f:
+            temp_f.write(compressed)
+        return
+    if streaming:
+        if validate == "parse":
+            raise ValueError('validate="parse" cannot be combined with streaming')
+        _validate_chunk_size(chunk_size)
+        with _open_input(input_path) as f:
+            size = os.fstat(f.fileno()).st_size
+            options = _encoder_options(quality, mode, lgwin, lgblock, preset, size)
+            parallel = workers is not None and workers > 1 and size > block_size
+            chunks = _read_chunks(f, input_path, block_size if parallel else chunk_size)
+            if validate == "scan":
+                chunks = _scan_chunks(chunks, input_path)
+            if options["quality"] == "auto":
+                first = next(chunks, b"")
+                budget = (
+                    AUTO_BUDGET_MS_PER_MB
+                    if budget_ms_per_mb is None
+                    else budget_ms_per_mb
+                )
+                options["quality"] = _select_quality(first, budget, options)[0]
+                chunks = itertools.chain((first,), chunks)
+            # Reading, compressing and writing interleave; one stage covers them
+            output = functools.partial(
+                _atomic_output,
+                output_path,
+                stats=stats,
+                stage="compress",
+                bytes_in=size,
+            )
+            if parallel:
+                compress = functools.partial(brotli.compress, **options)
+                with output() as temp_f:
+                    for piece in _parallel.compress_frames(
+                        chunks, compress, cast(int, workers)
+                    ):
+                        temp_f.write(piece)
+                return
+            compressor = brotli.Compressor(**options)
+            with output() as temp_f:
+                for chunk in chunks:
+                    block = compressor.process(chunk)
+                    if block:
+                        temp_f.write(block)
+                temp_f.write(compressor.finish())
+        return
+
+    backend = get_serializer(serializer)
+    start = time.perf_counter() if stats is not None else 0.0
     try:
-        with open(input_path, "r", encoding="utf-8") as f:
-            json_obj = json.load(f)
+        with open(input_path, "rb") as f:
+            data = f.read()
+        if stats is not None:
+            start = stats.lap("read", start, len(data), len(data))
+        json_obj = backend.loads(data)
+        if stats is not None:
+            stats.lap("parse", start, len(data))
     except FileNotFoundError:
         raise ValueError(f"Input file does not exist: {input_path}")
     except PermissionError:
         raise ValueError(f"Permission denied reading input file: {input_path}")
     except OSError as e:
         raise ValueError(f"Error reading input file: {input_path} - {e}")
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         raise ValueError(f"Input file contains invalid JSON: {input_path} - {e}")
 
-    compressed = compress_json(json_obj, quality=quality)
-
-    output_path_str = str(output_path)
-    temp_fd, temp_path = tempfile.mkstemp(
-        dir=os.path.dirname(output_path_str), suffix=".tmp"
+    compressed = compress_json(
+        json_obj,
+        quality=quality,
+        serializer=backend,
+        mode=mode,
+        lgwin=lgwin,
+        lgblock=lgblock,
+        preset=preset,
+        budget_ms_per_mb=budget_ms_per_mb,
+        columnar=columnar,
+        pack_numbers=pack_numbers,
+        workers=workers,
+        block_size=block_size,
+        stats=stats,
     )
-    try:
-        with os.fdopen(temp_fd, "wb") as temp_f:
-            temp_f.write(compressed)
-        os.replace(temp_path, output_path_str)
-    except PermissionError:
-        raise ValueError(f"Permission denied writing to output file: {output_path}")
-    except OSError as e:
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except Exception:
-                pass
-        raise ValueError(f"Error writing to output file: {output_path} - {e}")
+
+    with _atomic_output(output_path, stats=stats) as temp_f:
+        temp_f.write(compressed)
 
 
 def decompress_json_file(
-    input_path: Union[str, Path], output_path: Union[str, Path]
+    input_path: Union[str, Path],
+    output_path: Union[str, Path],
+    raw: bool = False,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    validate: Union[str, bool] = "none",
+    serializer: SerializerOption = "auto",
+    max_output_size: Optional[int] = None,
+    max_ratio: Optional[float] = None,
+    stats: Optional[StageStats] = None,
 ) -> None:
     """
     Decompress a Brotli-compressed file back to a JSON file.
@@ -125,12 +1283,77 @@ def decompress_json_file(
     Args:
         input_path: Path to the input compressed file (str or Path)
         output_path: Path to the output JSON file (str or Path)
+        raw: If True, stream the decompressed bytes straight to the output file in
+             blocks of about chunk_size bytes instead of parsing and re-emitting the
+             document with indentation. Memory use is bounded by chunk_size, or by
+             the block size for output of compress_json(workers=...).
+             Payloads written with columnar or pack_numbers, and containers, cannot
+             be streamed; they are decoded in memory and written as compact JSON.
+        chunk_size: Block size in bytes used when raw is True, default 1 MiB
+        validate: When raw is True, "scan" checks incrementally that the output
+                  is a single well-formed JSON document without building Python
+                  objects. "none" (default) skips the check; "parse" needs the
+                  whole document and is not supported. True and False are
+                  accepted for "scan" and "none".
+        serializer: Serializer backend used to parse and re-emit the document
+                    (ignored when raw is True), see compress_json
+        max_output_size, max_ratio: Limits on the decompressed size, see
+                    decompress_json. The ratio is taken against the input file
+                    size. The output file is not written if one is exceeded.
+        stats: A StageStats to record each stage in: read, decompress, parse,
+               serialize, write and replace. When raw is True, reading and
+               writing are counted in decompress.
 
     Raises:
         ValueError: If the input file does not exist, is not readable, or if writing to the output file fails
+        DecompressionLimitError: If max_output_size or max_ratio is exceeded
     """
     _validate_path(input_path)
     _validate_path(output_path)
+    _validate_limits(max_output_size, max_ratio)
+    validate = _decompress_validate(validate)
+    if raw:
+        _validate_chunk_size(chunk_size)
+        with _open_input(input_path) as f:
+            size = os.fstat(f.fileno()).st_size
+            # Reading, decompressing and writing interleave; one stage covers them
+            output = functools.partial(
+                _atomic_output,
+                output_path,
+                stats=stats,
+                stage="decompress",
+                bytes_in=size,
+            )
+            if is_container(f.read(len(CONTAINER_MAGIC))):
+                backend = get_serializer(serializer)
+                json_obj = decompress_json_container(
+                    input_path, backend, max_output_size, max_ratio
+                )
+                with output() as temp_f:
+                    temp_f.write(backend.dumps(json_obj))
+                return
+            f.seek(0)
+            validator = JsonValidator() if validate == "scan" else None
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            limit = _output_limit(max_output_size, max_ratio, size)
+            blocks = _iter_file_blocks(f, input_path, chunk_size, chunk_size, limit)
+            head, blocks = _peek_head(blocks)
+            if _transforms.is_envelope(head):
+                backend = get_serializer(serializer)
+                json_obj = _loads_payload(head + b"".join(blocks), backend)
+                with output() as temp_f:
+                    temp_f.write(backend.dumps(json_obj))
+                return
+            with output() as temp_f:
+                for block in itertools.chain((head,), blocks):
+                    if validator is not None:
+                        _validate_block(validator, decoder, block)
+                    temp_f.write(block)
+                if validator is not None:
+                    _validate_block(validator, decoder, b"", final=True)
+        return
+
+    start = time.perf_counter() if stats is not None else 0.0
     try:
         with open(input_path, "rb") as f:
             compressed_bytes = f.read()
@@ -141,51 +1364,338 @@ def decompress_json_file(
     except OSError as e:
         raise ValueError(f"Error reading input file: {input_path} - {e}")
 
-    json_obj = decompress_json(compressed_bytes)
+    if stats is not None:
+        size = len(compressed_bytes)
+        stats.lap("read", start, size, size)
 
-    output_path_str = str(output_path)
-    temp_fd, temp_path = tempfile.mkstemp(
-        dir=os.path.dirname(output_path_str), suffix=".tmp"
+    backend = get_serializer(serializer)
+    json_obj = decompress_json(
+        compressed_bytes, backend, max_output_size, max_ratio, stats=stats
     )
+
+    start = time.perf_counter() if stats is not None else 0.0
+    json_bytes = backend.dumps(json_obj, pretty=True)
+    if stats is not None:
+        stats.lap("serialize", start, 0, len(json_bytes))
+    with _atomic_output(output_path, stats=stats) as temp_f:
+        temp_f.write(json_bytes)
+
+
+def _write_stream(target: IO[bytes], data: bytes) -> None:
+    """Write to a stream and flush it, so a reader at the other end sees it now."""
     try:
-        with os.fdopen(temp_fd, "w", encoding="utf-8") as temp_f:
-            json.dump(json_obj, temp_f, indent=2)
-        os.replace(temp_path, output_path_str)
-    except PermissionError:
-        raise ValueError(f"Permission denied writing to output file: {output_path}")
+        target.write(data)
+        target.flush()
     except OSError as e:
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except Exception as cleanup_error:
-                logging.warning(
-                    f"Failed to remove temp file {temp_path}: {cleanup_error}"
-                )
-        raise ValueError(f"Error writing to output file: {output_path} - {e}")
+        raise ValueError(f"Error writing output - {e}")
 
 
-def compress_json_files(
-    input_files: Sequence[Union[str, Path]],
-    output_dir: Union[str, Path],
-    quality: int = 11,
-    max_workers: Optional[int] = None,
-) -> List[Optional[Exception]]:
+def _read_stream(read: Callable[[int], bytes], size: int) -> bytes:
+    try:
+        return read(size)
+    except OSError as e:
+        raise ValueError(f"Error reading input - {e}")
+
+
+def compress_json_stream(
+    source: BinaryIO,
+    target: Union[str, Path, BinaryIO],
+    quality: QualityOption = 11,
+    minify: bool = True,
+    validate: str = "none",
+    mode: int = DEFAULT_MODE,
+    lgwin: int = DEFAULT_LGWIN,
+    lgblock: int = DEFAULT_LGBLOCK,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stats: Optional[StageStats] = None,
+) -> int:
     """
-    Compress multiple JSON files to an output directory concurrently.
+    Compress JSON text from a binary stream chunk by chunk, in constant memory.
 
-    Output files will have the same name as input files but with .br extension.
+    Each chunk is compressed as it arrives and whatever output the encoder has
+    ready is written and flushed at once, so this works as a filter between
+    pipes. source is read with read1() where it has one, which returns the data
+    available instead of waiting for a whole chunk.
 
     Args:
-        input_files: List of input JSON file paths
-        output_dir: Directory to save compressed files
-        quality: Compression quality level (0-11), default 11
-        max_workers: Maximum number of worker threads. If None, uses a reasonable default.
+        source: Binary file-like object with JSON text, such as sys.stdin.buffer
+        target: Binary file-like object, or a path that is written atomically
+        quality: Compression quality level (0-11), default 11. "auto" and presets
+                 need the input size up front and are not supported.
+        minify: Drop the whitespace between tokens, as compress_json would.
+                Strings and numbers are kept exactly as written, and the input
+                is always checked with JsonScanner, since the minifier does not
+                validate tokens. If False, the input bytes are compressed as
+                they are.
+        validate: "none" (default) or "scan" for a structural check with
+                  JsonScanner. "parse" needs the whole document and is not
+                  supported.
+        mode, lgwin, lgblock: Brotli encoder tuning, see compress_json
+        chunk_size: Largest read from source in bytes, default 1 MiB
+        stats: A StageStats to record the time and bytes of each stage in: read,
+               validate, parse and serialize (when minifying), compress and
+               write, summed over all chunks
 
     Returns:
-        List of exceptions for each file. None if successful, Exception if failed.
+        Number of compressed bytes written
+
+    Raises:
+        ValueError: If an option is invalid, the input is not valid JSON (with
+                    validate="scan" or when minifying), or reading
+                    or writing fails. A target path is then left untouched.
     """
-    if max_workers is not None and max_workers <= 0:
-        raise ValueError("max_workers must be positive")
+    if quality == "auto":
+        raise ValueError('quality="auto" needs the input size and cannot stream')
+    _check_stream_validate(validate)
+    _validate_chunk_size(chunk_size)
+    options = _encoder_options(quality, mode, lgwin, lgblock, None, 0)
+    if isinstance(target, (str, Path)):
+        _validate_path(target)
+        with _atomic_output(target) as temp_f:
+            return _compress_stream(
+                source, temp_f, options, minify, validate, chunk_size, stats
+            )
+    return _compress_stream(
+        source, target, options, minify, validate, chunk_size, stats
+    )
+
+
+def _compress_stream(
+    source: BinaryIO,
+    target: IO[bytes],
+    options: Dict[str, int],
+    minify: bool,
+    validate: str,
+    chunk_size: int,
+    stats: Optional[StageStats],
+) -> int:
+    read = getattr(source, "read1", source.read)
+    compressor = brotli.Compressor(**options)
+    # The reformatter copies whatever the tokenizer splits off, so minified
+    # output is only valid JSON if the input is
+    scanner = JsonScanner() if validate == "scan" or minify else None
+    tokenizer = JsonTokenizer()
+    reformatter = JsonReformatter()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    clock = _StageClock()
+    written = 0
+    start = time.perf_counter()
+    while True:
+        chunk = _read_stream(read, chunk_size)
+        final = not chunk
+        start = clock.lap("read", start, len(chunk), len(chunk))
+        if scanner is not None:
+            try:
+                scanner.feed(chunk)
+                if final:
+                    scanner.close()
+            except ValueError as e:
+                raise ValueError(f"Input is not valid JSON - {e}") from e
+            start = clock.lap("validate", start, len(chunk))
+        data = chunk
+        if minify:
+            try:
+                tokens = tokenizer.feed(decoder.decode(chunk, final), final)
+            except (UnicodeDecodeError, ValueError) as e:
+                raise ValueError(f"Input is not valid JSON - {e}") from e
+            start = clock.lap("parse", start, len(chunk))
+            data = reformatter.format(tokens, final).encode("utf-8")
+            start = clock.lap("serialize", start, 0, len(data))
+        compressed = compressor.process(data)
+        if final:
+            compressed += compressor.finish()
+        start = clock.lap("compress", start, len(data), len(compressed))
+        if compressed:
+            _write_stream(target, compressed)
+            written += len(compressed)
+            start = clock.lap("write", start, len(compressed), len(compressed))
+        if final:
+            break
+    clock.flush(stats)
+    return written
+
+
+def decompress_json_stream(
+    source: BinaryIO,
+    target: Union[str, Path, BinaryIO],
+    pretty: bool = False,
+    raw: bool = False,
+    validate: Union[str, bool] = "none",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    serializer: SerializerOption = "auto",
+    max_output_size: Optional[int] = None,
+    max_ratio: Optional[float] = None,
+    stats: Optional[StageStats] = None,
+) -> None:
+    """
+    Decompress Brotli-compressed JSON from a binary stream chunk by chunk.
+
+    Decompressed blocks of at most chunk_size bytes are written and flushed as
+    they come, so output starts as soon as the first block is decoded and memory
+    use does not grow with the document. Output of compress_json(workers=...)
+    streams one block at a time. Payloads written with columnar or pack_numbers,
+    and containers, are decoded in memory instead.
+
+    Args:
+        source: Binary file-like object to read from, such as sys.stdin.buffer
+        target: Binary file-like object, or a path that is written atomically
+        pretty: Indent the output by two spaces, like decompress_json_file; the
+                default is compact JSON
+        raw: Write the decompressed bytes as they are, ignoring pretty
+        validate: "none" (default) or "scan" to check with JsonScanner that the
+                  output is a single well-formed JSON document. "parse" needs
+                  the whole document and is not supported. True and False are
+                  accepted for "scan" and "none".
+        chunk_size: Largest read from source and decompressed block, in bytes
+        serializer: Serializer backend for payloads decoded in memory
+        max_output_size, max_ratio: Limits on the decompressed size, see
+                    decompress_json. As the input size is not known, the ratio
+                    is taken against the compressed bytes read so far. Output
+                    already written to a stream stays there when a limit is
+                    exceeded; a target path is left untouched.
+        stats: A StageStats to record the time and bytes of each stage in:
+               decompress (including reads), validate, parse, serialize and
+               write, summed over all blocks
+
+    Raises:
+        ValueError: If the data is not valid Brotli-compressed data, validation
+                    fails, or reading or writing fails
+        DecompressionLimitError: If max_output_size or max_ratio is exceeded
+    """
+    _validate_chunk_size(chunk_size)
+    _validate_limits(max_output_size, max_ratio)
+    validate = _decompress_validate(validate)
+    args = (
+        pretty,
+        raw,
+        validate,
+        chunk_size,
+        serializer,
+        max_output_size,
+        max_ratio,
+        stats,
+    )
+    if isinstance(target, (str, Path)):
+        _validate_path(target)
+        with _atomic_output(target) as temp_f:
+            _decompress_stream(source, temp_f, *args)
+        return
+    _decompress_stream(source, target, *args)
+
+
+def _write_document(
+    target: IO[bytes],
+    json_obj: Any,
+    backend: Serializer,
+    pretty: bool,
+    clock: _StageClock,
+    start: float,
+) -> None:
+    """Serialize a document decoded in memory and write it to a stream."""
+    data = backend.dumps(json_obj, pretty=pretty)
+    start = clock.lap("serialize", start, 0, len(data))
+    _write_stream(target, data)
+    clock.lap("write", start, len(data), len(data))
+
+
+def _decompress_stream(
+    source: BinaryIO,
+    target: IO[bytes],
+    pretty: bool,
+    raw: bool,
+    validate: str,
+    chunk_size: int,
+    serializer: SerializerOption,
+    max_output_size: Optional[int],
+    max_ratio: Optional[float],
+    stats: Optional[StageStats],
+) -> None:
+    limit = _output_limit(max_output_size, max_ratio)
+    clock = _StageClock()
+    start = time.perf_counter()
+    head = _read_stream(source.read, max(len(CONTAINER_MAGIC), len(_parallel.MAGIC)))
+    if is_container(head):
+        # Containers need the whole file; blocks are decoded and parsed together
+        backend = get_serializer(serializer)
+        compressed = head + _read_stream(source.read, -1)
+        with ContainerReader(
+            compressed,
+            serializer=backend,
+            max_output_size=max_output_size,
+            max_ratio=max_ratio,
+        ) as reader:
+            json_obj = reader.read()
+        start = clock.lap("decompress", start, len(compressed))
+        _write_document(target, json_obj, backend, pretty and not raw, clock, start)
+        clock.flush(stats)
+        return
+    blocks: Iterator[bytes]
+    if _parallel.is_parallel(head):
+        pending = [head]
+
+        def read(size: int) -> bytes:
+            data = pending.pop() if pending else b""
+            data += _read_stream(source.read, size - len(data))
+            if limit is not None:
+                limit.consume(len(data))
+            return data
+
+        blocks = _parallel.iter_frames(read, limit.add if limit is not None else None)
+    else:
+        read1 = getattr(source, "read1", source.read)
+        chunks = itertools.chain(
+            (head,), iter(lambda: _read_stream(read1, chunk_size), b"")
+        )
+        blocks = _iter_decompress(chunks, chunk_size, limit)
+    first, blocks = _peek_head(blocks)
+    if _transforms.is_envelope(first):
+        # Transformed payloads are not plain JSON text; decode them whole
+        backend = get_serializer(serializer)
+        payload = first + b"".join(blocks)
+        start = clock.lap("decompress", start, 0, len(payload))
+        json_obj = _loads_payload(payload, backend)
+        start = clock.lap("parse", start, len(payload))
+        _write_document(target, json_obj, backend, pretty and not raw, clock, start)
+        clock.flush(stats)
+        return
+    start = clock.lap("decompress", start, 0, len(first))
+    scanner = JsonScanner() if validate == "scan" else None
+    tokenizer = JsonTokenizer()
+    reformatter = JsonReformatter(2 if pretty else None)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for block in itertools.chain((first,), blocks, (b"",)):
+        final = not block
+        if block:
+            start = clock.lap("decompress", start, 0, len(block))
+        if scanner is not None:
+            try:
+                scanner.feed(block)
+                if final:
+                    scanner.close()
+            except ValueError as e:
+                raise ValueError(f"Decompressed data is not valid JSON - {e}") from e
+            start = clock.lap("validate", start, len(block))
+        data = block
+        if not raw:
+            try:
+                tokens = tokenizer.feed(decoder.decode(block, final), final)
+            except (UnicodeDecodeError, ValueError) as e:
+                raise ValueError(f"Decompressed data is not valid JSON - {e}") from e
+            start = clock.lap("parse", start, len(block))
+            data = reformatter.format(tokens, final).encode("utf-8")
+            start = clock.lap("serialize", start, 0, len(data))
+        if data:
+            _write_stream(target, data)
+            start = clock.lap("write", start, len(data), len(data))
+    clock.flush(stats)
+
+
+def _plan_batch(
+    input_files: Sequence[Union[str, Path]],
+    output_dir: Union[str, Path],
+    suffix: str,
+) -> List[Tuple[Union[str, Path], Path]]:
+    """Pair each input file with its output path, rejecting duplicates."""
     # Validate input files are unique
     input_paths = [str(p) for p in input_files]
     if len(input_paths) != len(set(input_paths)):
@@ -199,33 +1709,662 @@ def compress_json_files(
     tasks = []
     for input_file in input_files:
         input_path = Path(input_file)
-        output_path = output_dir_path / (input_path.stem + ".br")
+        output_path = output_dir_path / (input_path.stem + suffix)
         output_paths.append(str(output_path))
         tasks.append((input_file, output_path))
 
     if len(output_paths) != len(set(output_paths)):
         raise ValueError("Duplicate output paths are not allowed")
+    return tasks
+
 
-    def compress_task(
-        task: Tuple[Union[str, Path], Union[str, Path]],
-    ) -> Optional[Exception]:
-        input_file, output_path = task
+def _check_executor(executor: ExecutorOption) -> None:
+    if isinstance(executor, concurrent.futures.Executor):
+        return
+    if executor not in ("thread", "process", "auto"):
+        raise ValueError(
+            'executor must be "thread", "process", "auto" or an Executor instance'
+        )
+
+
+def _resolve_executor(
+    executor: ExecutorOption, input_files: Sequence[Union[str, Path]]
+) -> ExecutorOption:
+    """Turn the executor option into "thread", "process" or the given Executor."""
+    _check_executor(executor)
+    if executor != "auto":
+        return executor
+    if len(input_files) < 2 or (os.cpu_count() or 1) < 2:
+        return "thread"
+    total_size = 0
+    for input_file in input_files:
+        try:
+            total_size += os.path.getsize(input_file)
+        except OSError:
+            # Missing files fail in the worker; they add no work here
+            continue
+        if total_size >= PROCESS_POOL_MIN_BYTES:
+            return "process"
+    return "thread"
+
+
+def _deadline_budget(
+    deadline: float,
+    input_files: Sequence[Union[str, Path]],
+    max_workers: Optional[int],
+) -> float:
+    """Turn a batch deadline in seconds into a per-file budget in ms per MiB."""
+    total_size = 0
+    for input_file in input_files:
         try:
-            compress_json_file(input_file, output_path, quality)
-            return None
-        except Exception as e:
-            logging.error(f"Failed to compress {input_file} to {output_path}: {e}")
-            return e
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        results = list(executor.map(compress_task, tasks))
+            total_size += os.path.getsize(input_file)
+        except OSError:
+            continue
+    workers = min(len(input_files), max_workers or os.cpu_count() or 1)
+    workers = max(1, min(workers, os.cpu_count() or 1))
+    total_mb = max(total_size, 1) / (1024 * 1024)
+    return deadline * 1000 * _AUTO_DEADLINE_SHARE * workers / total_mb
+
+
+def _estimate_memory(size: int, quality: QualityOption) -> int:
+    """Estimate the peak memory of compressing a file of size bytes."""
+    level = 11 if quality == "auto" else cast(int, quality)
+    encoder = next(memory for limit, memory in _ENCODER_MEMORY if level <= limit)
+    return size * _MEMORY_PER_INPUT_BYTE + encoder
+
+
+def _memory_estimates(
+    input_files: Sequence[Union[str, Path]],
+    quality: QualityOption,
+    stats: Optional[StageStats],
+) -> List[int]:
+    """Estimate the peak memory of each file of a batch, reporting every figure."""
+    return [_report_estimate(input_file, quality, stats) for input_file in input_files]
+
+
+def _report_estimate(
+    input_file: Union[str, Path], quality: QualityOption, stats: Optional[StageStats]
+) -> int:
+    """Estimate one file's peak memory, logging it and adding it to stats."""
+    estimate = _estimate_memory(_file_size(input_file), quality)
+    logging.info("Memory estimate for %s: %s bytes", input_file, estimate)
+    if stats is not None:
+        stats.record_estimate(str(input_file), estimate)
+    return estimate
+
+
+def _validate_memory_limit(memory_limit: Optional[int]) -> None:
+    if memory_limit is not None and memory_limit <= 0:
+        raise ValueError("memory_limit must be positive")
+
+
+def _make_pool(
+    executor: ExecutorOption, max_workers: Optional[int]
+) -> concurrent.futures.Executor:
+    """Return the Executor given, or a new pool of the kind named."""
+    if isinstance(executor, concurrent.futures.Executor):
+        return executor
+    if executor == "process":
+        return concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+    return concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+
+def _schedule(
+    pool: concurrent.futures.Executor,
+    run: Callable[[_Task], _Result],
+    items: Iterable[Tuple[_Key, Optional[_Task], int]],
+    max_in_flight: int,
+    memory_limit: Optional[int],
+) -> Generator[Tuple[_Key, int, Optional[_Result]], None, None]:
+    """
+    Submit (key, task, memory estimate) items as slots free up; yield completions.
+
+    Items are read only when there is room: fewer than max_in_flight tasks are
+    queued or running, and the estimates in flight plus the next one stay within
+    memory_limit. A task over the limit on its own runs when nothing else does.
+    Results come as (key, estimate, result) in completion order; an item without
+    a task is passed through with result None. Closing the generator cancels the
+    tasks that have not started.
+    """
+    # Futures land here as they finish; cheaper per task than wait() on the lot
+    finished: "queue.SimpleQueue[concurrent.futures.Future[_Result]]"
+    finished = queue.SimpleQueue()
+    running: Dict["concurrent.futures.Future[_Result]", Tuple[_Key, int]] = {}
+    in_use = 0
+    held: Optional[Tuple[_Key, _Task, int]] = None
+    queued = iter(items)
+    try:
+        while True:
+            while len(running) < max_in_flight:
+                if held is None:
+                    item = next(queued, None)
+                    if item is None:
+                        break
+                    key, task, estimate = item
+                    if task is None:
+                        yield key, estimate, None
+                        continue
+                    held = (key, task, estimate)
+                key, task, estimate = held
+                if (
+                    memory_limit is not None
+                    and running
+                    and in_use + estimate > memory_limit
+                ):
+                    break
+                held = None
+                future = pool.submit(run, task)
+                running[future] = (key, estimate)
+                in_use += estimate
+                future.add_done_callback(finished.put)
+            if not running:
+                return
+            future = finished.get()
+            key, estimate = running.pop(future)
+            in_use -= estimate
+            yield key, estimate, future.result()
+    finally:
+        for future in running:
+            future.cancel()
+
+
+def _run_batch(
+    task_fn: Callable[[_Task], _Result],
+    tasks: Sequence[_Task],
+    max_workers: Optional[int],
+    executor: ExecutorOption,
+    estimates: Optional[Sequence[int]] = None,
+    memory_limit: Optional[int] = None,
+) -> List[_Result]:
+    """
+    Run batch tasks on a thread or process pool, preserving input order.
+
+    With a memory_limit, tasks start largest estimate first and the estimates of
+    the tasks running at once stay within the limit, see _schedule.
+    """
+    pool = _make_pool(executor, max_workers)
+    try:
+        if memory_limit is None or estimates is None:
+            return list(pool.map(task_fn, tasks))
+        order = sorted(range(len(tasks)), key=lambda i: estimates[i], reverse=True)
+        results: List[Any] = [None] * len(tasks)
+        items = ((i, tasks[i], estimates[i]) for i in order)
+        workers = max_workers or os.cpu_count() or 1
+        for index, _, result in _schedule(pool, task_fn, items, workers, memory_limit):
+            results[index] = result
+        return results
+    finally:
+        # A pool owned by the caller is reused and left running
+        if pool is not executor:
+            pool.shutdown(wait=True)
+
+
+def _profiled_task(
+    task_fn: Callable[[Any], _Result], task: Tuple[Any, ...]
+) -> Tuple[_Result, List[StageRecord], str, float]:
+    """
+    Run a batch task with its own StageStats; module level so process pools can pickle it.
+
+    Returns the task's result, its stage records, the worker name and busy time.
+    """
+    log = _StageLog()
+    options = dict(task[2], stats=log)
+    start = time.perf_counter()
+    result = task_fn(task[:2] + (options,) + task[3:])
+    return result, log.records, _worker_name(), time.perf_counter() - start
+
+
+def _run_profiled(
+    task_fn: Callable[[Any], _Result],
+    tasks: Sequence[Any],
+    max_workers: Optional[int],
+    executor: ExecutorOption,
+    estimates: Optional[Sequence[int]],
+    memory_limit: Optional[int],
+    stats: Optional[StageStats],
+) -> List[_Result]:
+    """_run_batch, adding each task's stages and the batch's worker usage to stats."""
+    if stats is None:
+        return _run_batch(
+            task_fn, tasks, max_workers, executor, estimates, memory_limit
+        )
+    start = time.perf_counter()
+    outcomes = _run_batch(
+        functools.partial(_profiled_task, task_fn),
+        tasks,
+        max_workers,
+        executor,
+        estimates,
+        memory_limit,
+    )
+    wall = time.perf_counter() - start
+    busy: Dict[str, float] = {}
+    for _, records, worker, seconds in outcomes:
+        _replay(stats, records)
+        busy[worker] = busy.get(worker, 0.0) + seconds
+    stats.record_batch(wall, busy, len(tasks))
+    return [outcome[0] for outcome in outcomes]
+
+
+def _compress_task(task: BatchTask) -> Optional[Exception]:
+    """Compress one file of a batch; module level so process pools can pickle it."""
+    input_file, output_path, options = task
+    try:
+        compress_json_file(input_file, output_path, **options)
+        return None
+    except Exception as e:
+        logging.error(f"Failed to compress {input_file} to {output_path}: {e}")
+        return e
+
+
+def _decompress_task(task: BatchTask) -> Optional[Exception]:
+    """Decompress one file of a batch; module level so process pools can pickle it."""
+    input_file, output_path, options = task
+    try:
+        decompress_json_file(input_file, output_path, **options)
+        return None
+    except Exception as e:
+        logging.error(f"Failed to decompress {input_file} to {output_path}: {e}")
+        return e
+
+
+def _file_size(path: Union[str, Path]) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _timed_task(
+    task_fn: Callable[[BatchTask], Optional[Exception]], task: BatchTask
+) -> Tuple[Optional[Exception], FileStats]:
+    """Run one batch task and measure it; module level so process pools can pickle it."""
+    input_file, output_path, _ = task
+    start = time.perf_counter()
+    error = task_fn(task)
+    seconds = time.perf_counter() - start
+    output_bytes = _file_size(output_path) if error is None else 0
+    return error, FileStats(_file_size(input_file), output_bytes, seconds)
+
+
+def _iter_batch(
+    task_fn: Callable[[BatchTask], Optional[Exception]],
+    input_files: Iterable[Union[str, Path]],
+    output_dir: Path,
+    suffix: str,
+    options: Dict[str, Any],
+    max_workers: Optional[int],
+    executor: ExecutorOption,
+    max_in_flight: int,
+    memory_limit: Optional[int] = None,
+    estimate_memory: bool = False,
+    stats: Optional[StageStats] = None,
+) -> Generator[FileResult, None, None]:
+    """Feed files to a pool as slots free up and yield results as they complete."""
+    # Only output names are kept per file, to catch inputs that would collide
+    seen: Set[str] = set()
+
+    def items() -> Iterator[Tuple[Tuple[Union[str, Path], Path], Any, int]]:
+        for input_file in input_files:
+            output_path = output_dir / (Path(input_file).stem + suffix)
+            if str(output_path) in seen:
+                # No task: _schedule hands it straight back as a duplicate
+                yield (input_file, output_path), None, 0
+                continue
+            seen.add(str(output_path))
+            estimate = 0
+            if estimate_memory:
+                estimate = _report_estimate(input_file, options["quality"], stats)
+            yield (
+                (input_file, output_path),
+                (input_file, output_path, options),
+                estimate,
+            )
+
+    pool = _make_pool(executor, max_workers)
+    run: Callable[[Any], Any] = functools.partial(_timed_task, task_fn)
+    if stats is not None:
+        run = functools.partial(_profiled_task, run)
+    busy: Dict[str, float] = {}
+    files = 0
+    start = time.perf_counter()
+    results = _schedule(pool, run, items(), max_in_flight, memory_limit)
+    try:
+        for key, estimate, result in results:
+            input_file, output_path = key
+            if result is None:
+                duplicate = ValueError(f"Duplicate output path: {output_path}")
+                yield input_file, output_path, duplicate, FileStats(0, 0, 0.0)
+                continue
+            if stats is not None:
+                # Replayed as each file completes, so hooks see progress live
+                result, records, worker, seconds = result
+                _replay(stats, records)
+                busy[worker] = busy.get(worker, 0.0) + seconds
+                files += 1
+            error, file_stats = result
+            yield (
+                input_file,
+                output_path,
+                error,
+                file_stats._replace(memory_estimate=estimate),
+            )
+    finally:
+        # Stopped early or failed: cancel the queued files, and let running ones
+        # finish before an owned pool goes
+        results.close()
+        if pool is not executor:
+            pool.shutdown(wait=True)
+        if stats is not None:
+            stats.record_batch(time.perf_counter() - start, busy, files)
+
+
+def _iter_batch_options(
+    input_files: Iterable[Union[str, Path]],
+    output_dir: Union[str, Path],
+    max_workers: Optional[int],
+    executor: ExecutorOption,
+    max_in_flight: Optional[int],
+) -> Tuple[Path, int]:
+    """Check the shared options of the iter_* batch functions."""
+    if isinstance(input_files, (str, Path)):
+        raise ValueError("input_files must be an iterable of paths, not a single path")
+    if max_workers is not None and max_workers <= 0:
+        raise ValueError("max_workers must be positive")
+    if max_in_flight is not None and max_in_flight <= 0:
+        raise ValueError("max_in_flight must be positive")
+    if executor == "auto":
+        raise ValueError(
+            'executor="auto" needs the total input size; use "thread" or "process"'
+        )
+    _check_executor(executor)
+    if max_in_flight is None:
+        max_in_flight = 2 * (max_workers or os.cpu_count() or 1)
+    output_dir_path = Path(output_dir)
+    output_dir_path.mkdir(parents=True, exist_ok=True)
+    return output_dir_path, max_in_flight
+
+
+def _file_digest(path: Union[str, Path]) -> str:
+    """Return the BLAKE2b digest of a file's content as hex."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DEFAULT_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _manifest_entry(
+    input_file: Union[str, Path], options: Dict[str, Any], digest: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    """
+    Describe an input that has just been compressed or verified.
+
+    The file is stat'ed around the hashing; if it changed meanwhile, no entry is
+    returned so the next run compresses it again.
+    """
+    before = os.stat(input_file)
+    if digest is None:
+        digest = _file_digest(input_file)
+    after = os.stat(input_file)
+    if (before.st_size, before.st_mtime_ns) != (after.st_size, after.st_mtime_ns):
+        return None
+    return {
+        "input": os.path.abspath(input_file),
+        "size": after.st_size,
+        "mtime_ns": after.st_mtime_ns,
+        "blake2b": digest,
+        "options": _manifest_options(options),
+    }
+
+
+def _manifest_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """The options that determine an output file, in a JSON-serializable form."""
+    fingerprint = {
+        key: value
+        for key, value in options.items()
+        if key not in ("budget_ms_per_mb", "stats")
+    }
+    fingerprint["serializer"] = get_serializer(options["serializer"]).name
+    return fingerprint
+
+
+def _load_manifest(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Read the entries of a batch manifest; a missing or corrupt one is empty."""
+    try:
+        with open(path, "rb") as f:
+            manifest = get_serializer().loads(f.read())
+        if manifest.get("version") == _MANIFEST_VERSION:
+            return cast(Dict[str, Dict[str, Any]], manifest["files"])
+        logging.warning(f"Ignoring manifest with unknown version: {path}")
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, AttributeError, KeyError) as e:
+        logging.warning(f"Ignoring unreadable manifest {path}: {e}")
+    return {}
+
+
+def _compress_incremental_task(
+    task: IncrementalTask,
+) -> Tuple[Optional[Exception], Optional[Dict[str, Any]]]:
+    """
+    Compress one file of an incremental batch unless its content is unchanged.
+
+    Returns the error, if any, and the manifest entry to record for the output.
+    """
+    input_file, output_path, options, previous = task
+    try:
+        if previous is not None:
+            # Size or mtime changed; the content may not have
+            digest = _file_digest(input_file)
+            if digest == previous["blake2b"]:
+                return None, _manifest_entry(input_file, options, digest)
+        compress_json_file(input_file, output_path, **options)
+        return None, _manifest_entry(input_file, options, None)
+    except Exception as e:
+        logging.error(f"Failed to compress {input_file} to {output_path}: {e}")
+        return e, None
+
+
+def _compress_incremental(
+    plan: Sequence[Tuple[Union[str, Path], Path]],
+    output_dir: Union[str, Path],
+    options: Dict[str, Any],
+    max_workers: Optional[int],
+    executor: ExecutorOption,
+    memory_limit: Optional[int] = None,
+    stats: Optional[StageStats] = None,
+) -> List[Optional[Exception]]:
+    """Run an incremental batch, skipping outputs whose manifest entry matches."""
+    manifest_path = Path(output_dir) / MANIFEST_NAME
+    manifest = _load_manifest(manifest_path)
+    fingerprint = _manifest_options(options)
+    results: List[Optional[Exception]] = [None] * len(plan)
+    pending: List[int] = []
+    tasks: List[IncrementalTask] = []
+    for index, (input_file, output_path) in enumerate(plan):
+        entry = manifest.get(output_path.name)
+        previous = None
+        if (
+            entry is not None
+            and entry.get("input") == os.path.abspath(input_file)
+            and entry.get("options") == fingerprint
+            and output_path.exists()
+        ):
+            try:
+                stat = os.stat(input_file)
+            except OSError:
+                stat = None
+            if stat is not None:
+                if (stat.st_size, stat.st_mtime_ns) == (
+                    entry.get("size"),
+                    entry.get("mtime_ns"),
+                ):
+                    continue
+                previous = entry
+        pending.append(index)
+        tasks.append((input_file, output_path, options, previous))
+
+    logging.info(
+        f"Incremental batch: {len(plan) - len(tasks)} unchanged, {len(tasks)} to do"
+    )
+    executor = _resolve_executor(executor, [task[0] for task in tasks])
+    estimates = None
+    if memory_limit is not None:
+        estimates = _memory_estimates(
+            [task[0] for task in tasks], options["quality"], stats
+        )
+    outcomes = _run_profiled(
+        _compress_incremental_task,
+        tasks,
+        max_workers,
+        executor,
+        estimates,
+        memory_limit,
+        stats,
+    )
+    for index, (error, entry) in zip(pending, outcomes):
+        name = plan[index][1].name
+        results[index] = error
+        if entry is None:
+            manifest.pop(name, None)
+        else:
+            manifest[name] = entry
+
+    if tasks:
+        manifest_bytes = get_serializer().dumps(
+            {"version": _MANIFEST_VERSION, "files": manifest}
+        )
+        with _atomic_output(manifest_path) as temp_f:
+            temp_f.write(manifest_bytes)
     return results
 
 
+def compress_json_files(
+    input_files: Sequence[Union[str, Path]],
+    output_dir: Union[str, Path],
+    quality: QualityOption = 11,
+    max_workers: Optional[int] = None,
+    executor: ExecutorOption = "thread",
+    serializer: SerializerOption = "auto",
+    mode: int = DEFAULT_MODE,
+    lgwin: int = DEFAULT_LGWIN,
+    lgblock: int = DEFAULT_LGBLOCK,
+    preset: Optional[str] = None,
+    budget_ms_per_mb: Optional[float] = None,
+    deadline: Optional[float] = None,
+    columnar: bool = False,
+    pack_numbers: bool = False,
+    incremental: bool = False,
+    memory_limit: Optional[int] = None,
+    stats: Optional[StageStats] = None,
+) -> List[Optional[Exception]]:
+    """
+    Compress multiple JSON files to an output directory concurrently.
+
+    Output files will have the same name as input files but with .br extension.
+
+    Args:
+        input_files: List of input JSON file paths
+        output_dir: Directory to save compressed files
+        quality: Compression quality level (0-11), default 11, or "auto" to choose
+                 one per file, see compress_json
+        max_workers: Maximum number of workers. If None, uses a reasonable default.
+        executor: "thread" (default), "process" to run each file in a worker process
+                  so JSON parsing and serialization use all cores, or "auto" to pick
+                  processes when the inputs add up to PROCESS_POOL_MIN_BYTES or more.
+                  Process workers read and write the files themselves; only paths
+                  and results cross process boundaries. An Executor instance is
+                  used as is and left running; max_workers then only informs
+                  deadline. BrotliJsonSession keeps such a pool for many batches.
+        serializer: Serializer backend used for every file, see compress_json
+        mode, lgwin, lgblock, preset: Brotli encoder tuning, see compress_json.
+                    Presets are resolved per file from its size.
+        budget_ms_per_mb: Time budget per MiB for quality="auto", see compress_json
+        deadline: Target wall-clock time in seconds for the whole batch when quality
+                  is "auto". It is turned into a per-MiB budget from the total input
+                  size and the number of workers, keeping half of it for parsing and
+                  I/O; the batch is not cancelled if it runs over. When combined
+                  with budget_ms_per_mb, the tighter of the two applies.
+        columnar: Store record lists column by column, see compress_json
+        pack_numbers: Pack numeric arrays as binary, see compress_json
+        incremental: Keep a manifest (MANIFEST_NAME) in output_dir recording each
+                     input's path, size, mtime, content hash and the options used,
+                     and skip files whose entry still matches and whose output
+                     exists. A file whose size or mtime changed is hashed and only
+                     recompressed if its content differs. The manifest is replaced
+                     atomically after the batch; a run that is interrupted only
+                     loses the skips for files it processed.
+        memory_limit: Budget in bytes for the peak memory of the files being
+                      compressed at once. Each input is stat'ed up front and its
+                      peak estimated from its size and quality; files then start
+                      largest first, as long as the estimates in flight fit the
+                      budget. A file estimated above the budget runs alone.
+                      Each estimate is logged at INFO level and, with stats,
+                      recorded in StageStats.memory_estimates().
+        stats: A StageStats to add the stages of every file to, see
+               compress_json_file, along with the batch's wall time and each
+               worker's busy time. Process workers send their records back
+               with the results; hooks run in the calling thread once the
+               batch is done.
+
+    Returns:
+        List of exceptions for each file. None if successful, Exception if failed.
+    """
+    if max_workers is not None and max_workers <= 0:
+        raise ValueError("max_workers must be positive")
+    _encoder_options(quality, mode, lgwin, lgblock, preset, 0)
+    _validate_budget(quality, budget_ms_per_mb)
+    _validate_memory_limit(memory_limit)
+    if deadline is not None:
+        if quality != "auto":
+            raise ValueError('deadline requires quality="auto"')
+        if deadline <= 0:
+            raise ValueError("deadline must be positive")
+        budget = _deadline_budget(deadline, input_files, max_workers)
+        if budget_ms_per_mb is not None:
+            budget = min(budget, budget_ms_per_mb)
+        budget_ms_per_mb = budget
+    _check_executor(executor)
+    options = {
+        "quality": quality,
+        "serializer": serializer,
+        "mode": mode,
+        "lgwin": lgwin,
+        "lgblock": lgblock,
+        "preset": preset,
+        "budget_ms_per_mb": budget_ms_per_mb,
+        "columnar": columnar,
+        "pack_numbers": pack_numbers,
+    }
+    plan = _plan_batch(input_files, output_dir, ".br")
+    if incremental:
+        return _compress_incremental(
+            plan, output_dir, options, max_workers, executor, memory_limit, stats
+        )
+    executor = _resolve_executor(executor, input_files)
+    tasks: List[BatchTask] = [
+        (input_file, output_path, options) for input_file, output_path in plan
+    ]
+    estimates = None
+    if memory_limit is not None:
+        estimates = _memory_estimates(
+            [input_file for input_file, _ in plan], quality, stats
+        )
+    return _run_profiled(
+        _compress_task, tasks, max_workers, executor, estimates, memory_limit, stats
+    )
+
+
 def decompress_json_files(
     input_files: Sequence[Union[str, Path]],
     output_dir: Union[str, Path],
     max_workers: Optional[int] = None,
+    executor: ExecutorOption = "thread",
+    serializer: SerializerOption = "auto",
+    max_output_size: Optional[int] = None,
+    max_ratio: Optional[float] = None,
+    stats: Optional[StageStats] = None,
 ) -> List[Optional[Exception]]:
     """
     Decompress multiple Brotli-compressed files to an output directory concurrently.
@@ -235,44 +2374,201 @@ def decompress_json_files(
     Args:
         input_files: List of input compressed file paths
         output_dir: Directory to save decompressed JSON files
-        max_workers: Maximum number of worker threads. If None, uses a reasonable default.
+        max_workers: Maximum number of workers. If None, uses a reasonable default.
+        executor: "thread" (default), "process", "auto" or an Executor instance;
+                  see compress_json_files
+        serializer: Serializer backend used for every file, see compress_json
+        max_output_size, max_ratio: Limits on the decompressed size of each
+                    file, see decompress_json_file. A file over a limit fails
+                    with DecompressionLimitError; the others are unaffected.
+        stats: A StageStats to add every file's stages to, see compress_json_files
 
     Returns:
         List of exceptions for each file. None if successful, Exception if failed.
     """
     if max_workers is not None and max_workers <= 0:
         raise ValueError("max_workers must be positive")
-    # Validate input files are unique
-    input_paths = [str(p) for p in input_files]
-    if len(input_paths) != len(set(input_paths)):
-        raise ValueError("Duplicate input paths are not allowed")
+    _validate_limits(max_output_size, max_ratio)
+    executor = _resolve_executor(executor, input_files)
+    options = {
+        "serializer": serializer,
+        "max_output_size": max_output_size,
+        "max_ratio": max_ratio,
+    }
+    tasks: List[BatchTask] = [
+        (input_file, output_path, options)
+        for input_file, output_path in _plan_batch(input_files, output_dir, ".json")
+    ]
+    return _run_profiled(
+        _decompress_task, tasks, max_workers, executor, None, None, stats
+    )
 
-    output_dir_path = Path(output_dir)
-    output_dir_path.mkdir(parents=True, exist_ok=True)
 
-    # Validate unique output paths
-    output_paths = []
-    tasks = []
-    for input_file in input_files:
-        input_path = Path(input_file)
-        output_path = output_dir_path / (input_path.stem + ".json")
-        output_paths.append(str(output_path))
-        tasks.append((input_file, output_path))
+def iter_compress_json_files(
+    input_files: Iterable[Union[str, Path]],
+    output_dir: Union[str, Path],
+    quality: QualityOption = 11,
+    max_workers: Optional[int] = None,
+    executor: ExecutorOption = "thread",
+    serializer: SerializerOption = "auto",
+    mode: int = DEFAULT_MODE,
+    lgwin: int = DEFAULT_LGWIN,
+    lgblock: int = DEFAULT_LGBLOCK,
+    preset: Optional[str] = None,
+    budget_ms_per_mb: Optional[float] = None,
+    columnar: bool = False,
+    pack_numbers: bool = False,
+    max_in_flight: Optional[int] = None,
+    memory_limit: Optional[int] = None,
+    stats: Optional[StageStats] = None,
+) -> Generator[FileResult, None, None]:
+    """
+    Compress files to output_dir, yielding (input, output, error, stats) as each finishes.
 
-    if len(output_paths) != len(set(output_paths)):
-        raise ValueError("Duplicate output paths are not allowed")
+    Unlike compress_json_files, input_files may be any iterable, such as a lazy
+    directory walk. It is consumed only as slots free up, so at most max_in_flight
+    files are queued or running at once. Results come in completion order; error
+    is None on success, else the exception raised for that file, and stats is a
+    FileStats. An input whose output name was already used in this run yields a
+    ValueError instead of being compressed.
 
-    def decompress_task(
-        task: Tuple[Union[str, Path], Union[str, Path]],
-    ) -> Optional[Exception]:
-        input_file, output_path = task
-        try:
-            decompress_json_file(input_file, output_path)
-            return None
-        except Exception as e:
-            logging.error(f"Failed to decompress {input_file} to {output_path}: {e}")
-            return e
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        results = list(executor.map(decompress_task, tasks))
-    return results
+    Leaving the loop early or closing the iterator cancels the files that have
+    not started; those already running finish first.
+
+    Args:
+        input_files: Iterable of input JSON file paths
+        output_dir: Directory to save compressed files, as compress_json_files
+        quality, serializer, mode, lgwin, lgblock, preset, budget_ms_per_mb,
+        columnar, pack_numbers: See compress_json_files
+        max_workers: Maximum number of workers. If None, uses a reasonable default.
+        executor: "thread" (default), "process" or a running Executor to reuse.
+                  "auto" is not accepted, as it needs the total input size.
+        max_in_flight: Most files queued or running at once; default twice the
+                       number of workers
+        memory_limit: Budget in bytes for the estimated peak memory of the files
+                      in flight, admitted as in compress_json_files. Files
+                      start in the order given rather than largest first:
+                      sorting would read the whole iterable up front, which
+                      this function avoids. Pass sorted(paths,
+                      key=os.path.getsize, reverse=True) for that order. Each
+                      file's estimate is in its FileStats.memory_estimate, and
+                      is logged and recorded in stats as in
+                      compress_json_files.
+        stats: A StageStats to add every file's stages to as it completes, see
+               compress_json_files. The batch is recorded once the iterator
+               is exhausted or closed.
+
+    Raises:
+        ValueError: If an option is invalid. This is raised on the call, before
+                    any file is read.
+    """
+    output_dir_path, limit = _iter_batch_options(
+        input_files, output_dir, max_workers, executor, max_in_flight
+    )
+    _encoder_options(quality, mode, lgwin, lgblock, preset, 0)
+    _validate_budget(quality, budget_ms_per_mb)
+    _validate_memory_limit(memory_limit)
+    options = {
+        "quality": quality,
+        "serializer": serializer,
+        "mode": mode,
+        "lgwin": lgwin,
+        "lgblock": lgblock,
+        "preset": preset,
+        "budget_ms_per_mb": budget_ms_per_mb,
+        "columnar": columnar,
+        "pack_numbers": pack_numbers,
+    }
+    return _iter_batch(
+        _compress_task,
+        input_files,
+        output_dir_path,
+        ".br",
+        options,
+        max_workers,
+        executor,
+        limit,
+        memory_limit,
+        estimate_memory=True,
+        stats=stats,
+    )
+
+
+def iter_decompress_json_files(
+    input_files: Iterable[Union[str, Path]],
+    output_dir: Union[str, Path],
+    max_workers: Optional[int] = None,
+    executor: ExecutorOption = "thread",
+    serializer: SerializerOption = "auto",
+    max_in_flight: Optional[int] = None,
+    max_output_size: Optional[int] = None,
+    max_ratio: Optional[float] = None,
+    stats: Optional[StageStats] = None,
+) -> Generator[FileResult, None, None]:
+    """
+    Decompress files to output_dir, yielding (input, output, error, stats) as each finishes.
+
+    Output names and max_output_size and max_ratio follow decompress_json_files;
+    see iter_compress_json_files.
+    """
+    output_dir_path, limit = _iter_batch_options(
+        input_files, output_dir, max_workers, executor, max_in_flight
+    )
+    _validate_limits(max_output_size, max_ratio)
+    options = {
+        "serializer": serializer,
+        "max_output_size": max_output_size,
+        "max_ratio": max_ratio,
+    }
+    return _iter_batch(
+        _decompress_task,
+        input_files,
+        output_dir_path,
+        ".json",
+        options,
+        max_workers,
+        executor,
+        limit,
+        stats=stats,
+    )
+
+
+# The container, archive and JSON Lines formats and sessions build on the helpers
+# above
+from .archive import (
+    DEFAULT_ARCHIVE_BLOCK_SIZE,
+    ArchiveMember,
+    ArchiveReader,
+    ArchiveWriter,
+    pack_json_files,
+    unpack_json_archive,
+)
+from .container import (
+    DEFAULT_BLOCK_SIZE,
+    MAGIC as CONTAINER_MAGIC,
+    ContainerReader,
+    compress_json_container,
+    decompress_json_container,
+    is_container,
+)
+from .jsonl import DEFAULT_FLUSH_BYTES, JsonlReader, JsonlWriter
+from .session import BrotliJsonSession
+
+# The asyncio front end is loaded on first use: importing asyncio alone takes
+# longer than importing this package.
+_ASYNC_NAMES = (
+    "compress_json_async",
+    "compress_json_file_async",
+    "compress_json_files_async",
+    "decompress_json_async",
+    "decompress_json_file_async",
+    "decompress_json_files_async",
+)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _ASYNC_NAMES:
+        from . import aio
+
+        return getattr(aio, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,246 @@
 import sys
 import json
 import argparse
+import concurrent.futures
+import contextlib
+import fnmatch
 import jsonbrotliminifyer
 import os
-import tempfile
+import time
+from typing import Callable
+import brotli
+
+MODES = {
+    "generic": brotli.MODE_GENERIC,
+    "text": brotli.MODE_TEXT,
+    "font": brotli.MODE_FONT,
+}
+
+
+def quality_type(value: str) -> object:
+    """Parse -q/--quality: an integer level or "auto"."""
+    if value == "auto":
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid quality: {value!r}")
+
+
+SIZE_SUFFIXES = {"K": 1024, "M": 1024**2, "G": 1024**3}
+
+
+def size_type(value: str) -> int:
+    """Parse a byte count, with an optional K, M or G suffix (powers of 1024)."""
+    factor = SIZE_SUFFIXES.get(value[-1:].upper(), 1)
+    digits = value[:-1] if factor > 1 else value
+    try:
+        size = int(digits) * factor
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}")
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"size must be positive: {value!r}")
+    return size
+
+
+def archive_members(inputs: "list[str]") -> "list[tuple[str, str]]":
+    """
+    Expand pack inputs into (path, member name) pairs.
+
+    A file is stored under its base name; a directory contributes its .json
+    files, recursively, named by their path relative to it.
+    """
+    members = []
+    for input_path in inputs:
+        if not os.path.isdir(input_path):
+            members.append((input_path, os.path.basename(input_path)))
+            continue
+        for root, dirs, files in os.walk(input_path):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    relative = os.path.relpath(path, input_path)
+                    members.append((path, relative.replace(os.sep, "/")))
+    return members
+
+
+def add_batch_arguments(subparser: argparse.ArgumentParser, pattern: str) -> None:
+    """Add the options of batch mode, which several inputs switch to."""
+    subparser.add_argument(
+        "inputs",
+        nargs="*",
+        help="Input files or directories; several inputs need --output-dir",
+    )
+    subparser.add_argument(
+        "--output-dir", type=str, help="Output directory for several inputs"
+    )
+    subparser.add_argument(
+        "-r",
+        "--recursive",
+        action="store_true",
+        help="Include files in subdirectories of input directories",
+    )
+    subparser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help=f"File name pattern to take from input directories (default: {pattern})",
+    )
+    subparser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help="File name pattern to skip in input directories",
+    )
+    subparser.add_argument(
+        "--jobs-from",
+        type=str,
+        metavar="FILE",
+        help='Read more inputs from FILE, one per line ("-" for stdin)',
+    )
+    subparser.add_argument(
+        "--executor",
+        choices=("thread", "process", "auto"),
+        default="thread",
+        help="Kind of worker pool for several inputs (default: thread)",
+    )
+    subparser.set_defaults(pattern=pattern)
+
+
+def batch_inputs(args: argparse.Namespace) -> "list[tuple[str, str]]":
+    """
+    Expand batch inputs into (path, output subdirectory) pairs.
+
+    Files are taken as given. A directory contributes the files matching
+    --include and not --exclude, with subdirectories under --recursive; their
+    outputs keep the layout below the directory.
+    """
+    inputs = list(args.inputs)
+    if args.jobs_from:
+        try:
+            if args.jobs_from == "-":
+                lines = sys.stdin.read().splitlines()
+            else:
+                with open(args.jobs_from, encoding="utf-8") as f:
+                    lines = f.read().splitlines()
+        except OSError as e:
+            raise ValueError(f"Error reading job list: {args.jobs_from} - {e}")
+        inputs.extend(line.strip() for line in lines if line.strip())
+    include = args.include or [args.pattern]
+    jobs = []
+    for input_path in inputs:
+        if not os.path.isdir(input_path):
+            jobs.append((input_path, ""))
+            continue
+        for root, dirs, files in os.walk(input_path):
+            if args.recursive:
+                dirs.sort()
+            else:
+                dirs.clear()
+            relative = os.path.relpath(root, input_path)
+            for name in sorted(files):
+                if any(fnmatch.fnmatch(name, glob) for glob in include) and not any(
+                    fnmatch.fnmatch(name, glob) for glob in args.exclude
+                ):
+                    jobs.append(
+                        (os.path.join(root, name), "" if relative == "." else relative)
+                    )
+    return jobs
+
+
+def run_batch(
+    args: argparse.Namespace,
+    function: Callable[..., "list[Exception | None]"],
+    suffix: str,
+    options: "dict[str, object]",
+    stats: "jsonbrotliminifyer.StageStats | None",
+) -> None:
+    """
+    Run a batch function over the inputs, print a summary and exit.
+
+    One worker pool serves every output directory. Each failed file is reported
+    on stderr and makes the exit status 1; the other files are still written.
+    """
+    if not args.output_dir:
+        print("Error: --output-dir is required with several inputs", file=sys.stderr)
+        sys.exit(1)
+    if args.input_file or args.output_file:
+        print(
+            "Error: use --output-dir, not --input-file/--output-file, with several inputs",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    try:
+        jobs = batch_inputs(args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not jobs:
+        print("Error: no input files found", file=sys.stderr)
+        sys.exit(1)
+    groups: "dict[str, list[str]]" = {}
+    for path, relative in jobs:
+        groups.setdefault(relative, []).append(path)
+    sizes = {path: os.path.getsize(path) for path, _ in jobs if os.path.isfile(path)}
+    executor = args.executor
+    if executor == "auto":
+        total = sum(sizes.values())
+        large = total >= jsonbrotliminifyer.PROCESS_POOL_MIN_BYTES
+        executor = "process" if large else "thread"
+    if executor == "process":
+        pool: concurrent.futures.Executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=args.workers
+        )
+    else:
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=args.workers)
+
+    start = time.perf_counter()
+    failed = 0
+    bytes_in = bytes_out = 0
+    with pool:
+        for relative, paths in groups.items():
+            output_dir = os.path.join(args.output_dir, relative)
+            try:
+                results = function(
+                    paths,
+                    output_dir,
+                    executor=pool,
+                    max_workers=args.workers,
+                    stats=stats,
+                    **options,
+                )
+            except ValueError as e:
+                results = [e] * len(paths)
+            for path, error in zip(paths, results):
+                if error is not None:
+                    failed += 1
+                    print(f"Error: {path}: {error}", file=sys.stderr)
+                    continue
+                output_path = os.path.join(
+                    output_dir, os.path.splitext(os.path.basename(path))[0] + suffix
+                )
+                bytes_in += sizes.get(path, 0)
+                bytes_out += os.path.getsize(output_path)
+    seconds = time.perf_counter() - start
+
+    verb = "Compressed" if suffix == ".br" else "Decompressed"
+    # Throughput is measured on the JSON side in both directions
+    json_bytes = bytes_in if suffix == ".br" else bytes_out
+    print(
+        f"{verb} {len(jobs) - failed} of {len(jobs)} files, "
+        f"{bytes_in / 2**20:.2f} MiB -> {bytes_out / 2**20:.2f} MiB "
+        f"in {seconds:.2f} s ({json_bytes / 2**20 / max(seconds, 1e-9):.1f} MiB/s)"
+    )
+    print_stats(stats)
+    sys.exit(1 if failed else 0)
+
+
+def print_stats(stats: "jsonbrotliminifyer.StageStats | None") -> None:
+    """Print the --stats breakdown to stderr, keeping stdout for the data."""
+    if stats is not None:
+        print(stats.format(), file=sys.stderr)
 
 
 def main() -> None:
@@ -21,8 +258,71 @@ def main() -> None:
         "-o", "--output-file", type=str, help="Output compressed file"
     )
     compress_parser.add_argument(
-        "-q", "--quality", type=int, default=11, help="Compression quality (0-11)"
+        "-q",
+        "--quality",
+        type=quality_type,
+        default=11,
+        help='Compression quality (0-11), or "auto" to fit --budget',
+    )
+    compress_parser.add_argument(
+        "--budget",
+        type=float,
+        help="Compression time budget in ms per MiB for -q auto "
+        f"(default: {jsonbrotliminifyer.AUTO_BUDGET_MS_PER_MB:g})",
+    )
+    compress_parser.add_argument(
+        "--mode",
+        choices=sorted(MODES),
+        default="text",
+        help="Brotli encoder mode (default: text)",
+    )
+    compress_parser.add_argument(
+        "--lgwin",
+        type=int,
+        default=jsonbrotliminifyer.DEFAULT_LGWIN,
+        help="Brotli window size as a power of two (10-24)",
+    )
+    compress_parser.add_argument(
+        "--lgblock",
+        type=int,
+        default=jsonbrotliminifyer.DEFAULT_LGBLOCK,
+        help="Brotli input block size as a power of two (16-24, 0 = automatic)",
     )
+    compress_parser.add_argument(
+        "--preset",
+        choices=sorted(jsonbrotliminifyer.PRESETS),
+        help="Pick quality and window from the input size; overrides -q/--lgwin/--lgblock",
+    )
+    compress_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Compress blocks of the input on this many threads (framed output); "
+        "with several inputs, the number of files compressed at once",
+    )
+    compress_parser.add_argument(
+        "--block-size",
+        type=int,
+        default=jsonbrotliminifyer.PARALLEL_BLOCK_SIZE,
+        help="Uncompressed bytes per block with --workers "
+        f"(default: {jsonbrotliminifyer.PARALLEL_BLOCK_SIZE})",
+    )
+    compress_parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="Compress the input bytes as-is instead of parsing and re-serializing",
+    )
+    compress_parser.add_argument(
+        "--validate",
+        choices=jsonbrotliminifyer.VALIDATE_LEVELS,
+        default="none",
+        help="Check applied to stdin, or to the input file with --raw (default: none)",
+    )
+    compress_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print time and bytes per stage to stderr when done",
+    )
+    add_batch_arguments(compress_parser, "*.json")
 
     # Decompress command
     decompress_parser = subparsers.add_parser("decompress", help="Decompress JSON data")
@@ -32,10 +332,153 @@ def main() -> None:
     decompress_parser.add_argument(
         "-o", "--output-file", type=str, help="Output JSON file"
     )
+    decompress_parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print time and bytes per stage to stderr when done",
+    )
+    decompress_parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact JSON instead of indenting by two spaces",
+    )
+    decompress_parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="Write the decompressed bytes as stored, without reformatting",
+    )
+    decompress_parser.add_argument(
+        "--validate",
+        choices=("none", "scan"),
+        default="none",
+        help="Check that the output is one well-formed JSON document (default: none)",
+    )
+    decompress_parser.add_argument(
+        "--max-output-size",
+        type=size_type,
+        help="Fail once more than this many bytes are decompressed from an input; "
+        "accepts K, M and G suffixes",
+    )
+    decompress_parser.add_argument(
+        "--max-ratio",
+        type=float,
+        help="Fail once the decompressed size exceeds this multiple of the "
+        "compressed size",
+    )
+    decompress_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of files decompressed at once, with several inputs",
+    )
+    add_batch_arguments(decompress_parser, "*.br")
+
+    # Pack command
+    pack_parser = subparsers.add_parser(
+        "pack", help="Pack JSON files into one indexed archive"
+    )
+    pack_parser.add_argument(
+        "inputs", nargs="+", help="JSON files, or directories to pack recursively"
+    )
+    pack_parser.add_argument(
+        "-o", "--output-file", type=str, required=True, help="Output archive file"
+    )
+    pack_parser.add_argument(
+        "-q",
+        "--quality",
+        type=quality_type,
+        default=11,
+        help='Compression quality (0-11), or "auto"',
+    )
+    pack_parser.add_argument(
+        "--block-size",
+        type=int,
+        default=jsonbrotliminifyer.DEFAULT_ARCHIVE_BLOCK_SIZE,
+        help="Uncompressed bytes per block, 0 for a single block "
+        f"(default: {jsonbrotliminifyer.DEFAULT_ARCHIVE_BLOCK_SIZE})",
+    )
+    pack_parser.add_argument(
+        "--workers", type=int, help="Compress blocks on this many threads"
+    )
+    pack_parser.add_argument(
+        "--validate",
+        choices=jsonbrotliminifyer.VALIDATE_LEVELS,
+        default="none",
+        help="Check applied to each input file (default: none)",
+    )
+
+    # Unpack command
+    unpack_parser = subparsers.add_parser(
+        "unpack", help="Extract JSON files from an archive"
+    )
+    unpack_parser.add_argument(
+        "names", nargs="*", help="Members to extract (default: all)"
+    )
+    unpack_parser.add_argument(
+        "-i", "--input-file", type=str, required=True, help="Input archive file"
+    )
+    unpack_parser.add_argument(
+        "-o", "--output-dir", type=str, default=".", help="Output directory"
+    )
+    unpack_parser.add_argument(
+        "--list",
+        action="store_true",
+        help="List member names and sizes instead of extracting",
+    )
+    unpack_parser.add_argument(
+        "--max-output-size",
+        type=size_type,
+        help="Fail once more than this many bytes are decompressed from the archive; "
+        "accepts K, M and G suffixes",
+    )
+    unpack_parser.add_argument(
+        "--max-ratio",
+        type=float,
+        help="Fail once the decompressed size exceeds this multiple of the "
+        "archive size",
+    )
 
     args = parser.parse_args()
+    stats = jsonbrotliminifyer.StageStats() if getattr(args, "stats", False) else None
 
     if args.command == "compress":
+        if args.budget is not None:
+            if args.quality != "auto":
+                parser.error("--budget requires -q auto")
+            if args.budget <= 0:
+                parser.error("--budget must be positive")
+        encoder_options = {
+            "mode": MODES[args.mode],
+            "lgwin": args.lgwin,
+            "lgblock": args.lgblock,
+            "preset": args.preset,
+            "budget_ms_per_mb": args.budget,
+            "workers": args.workers,
+            "block_size": args.block_size,
+        }
+        if args.validate != "none" and not args.raw and args.input_file:
+            print("Error: --validate requires --raw", file=sys.stderr)
+            sys.exit(1)
+        if args.inputs or args.jobs_from:
+            if args.raw:
+                print("Error: --raw needs a single input", file=sys.stderr)
+                sys.exit(1)
+            if args.validate != "none":
+                parser.error("--validate needs a single input")
+            batch_options = {
+                "quality": args.quality,
+                "mode": MODES[args.mode],
+                "lgwin": args.lgwin,
+                "lgblock": args.lgblock,
+                "preset": args.preset,
+                "budget_ms_per_mb": args.budget,
+            }
+            run_batch(
+                args,
+                jsonbrotliminifyer.compress_json_files,
+                ".br",
+                batch_options,
+                stats,
+            )
         if args.input_file:
             if not args.output_file:
                 print(
@@ -44,86 +487,195 @@ def main() -> None:
                 )
                 sys.exit(1)
             jsonbrotliminifyer.compress_json_file(
-                args.input_file, args.output_file, args.quality
+                args.input_file,
+                args.output_file,
+                args.quality,
+                raw=args.raw,
+                validate=args.validate,
+                stats=stats,
+                **encoder_options,
             )
             print(f"Compressed {args.input_file} to {args.output_file}")
-        else:
-            # Read from stdin
+        elif not (
+            args.preset
+            or args.quality == "auto"
+            or args.workers
+            or args.validate == "parse"
+        ):
+            # Compress stdin chunk by chunk; output starts before the input ends
             try:
-                data = json.load(sys.stdin)
-            except json.JSONDecodeError as e:
-                print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
+                jsonbrotliminifyer.compress_json_stream(
+                    sys.stdin.buffer,
+                    args.output_file or sys.stdout.buffer,
+                    args.quality,
+                    minify=not args.raw,
+                    validate=args.validate,
+                    mode=MODES[args.mode],
+                    lgwin=args.lgwin,
+                    lgblock=args.lgblock,
+                    stats=stats,
+                )
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
                 sys.exit(1)
-            compressed = jsonbrotliminifyer.compress_json(data, args.quality)
             if args.output_file:
-                output_path_str = str(args.output_file)
-                temp_fd, temp_path = tempfile.mkstemp(
-                    dir=os.path.dirname(output_path_str), suffix=".tmp"
+                print(f"Compressed to {args.output_file}")
+        else:
+            # Presets, -q auto, --workers and --validate parse need the whole input
+            start = time.perf_counter()
+            if args.raw:
+                raw = sys.stdin.buffer.read()
+                if stats is not None:
+                    stats.lap("read", start, len(raw), len(raw))
+                try:
+                    compressed = jsonbrotliminifyer.compress_json_bytes(
+                        raw,
+                        args.quality,
+                        validate=args.validate,
+                        stats=stats,
+                        **encoder_options,
+                    )
+                except ValueError as e:
+                    print(f"Error: {e}", file=sys.stderr)
+                    sys.exit(1)
+            else:
+                text = sys.stdin.read()
+                if stats is not None:
+                    start = stats.lap("read", start, len(text), len(text))
+                try:
+                    data = json.loads(text)
+                except json.JSONDecodeError as e:
+                    print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
+                    sys.exit(1)
+                if stats is not None:
+                    stats.lap("parse", start, len(text))
+                compressed = jsonbrotliminifyer.compress_json(
+                    data, args.quality, stats=stats, **encoder_options
                 )
+            if args.output_file:
                 try:
-                    with os.fdopen(temp_fd, "wb") as temp_f:
+                    with jsonbrotliminifyer._atomic_output(
+                        args.output_file, stats=stats, bytes_in=len(compressed)
+                    ) as temp_f:
                         temp_f.write(compressed)
-                    os.replace(temp_path, output_path_str)
-                except PermissionError:
-                    raise ValueError(
-                        f"Permission denied writing to output file: {args.output_file}"
-                    )
-                except OSError as e:
-                    if os.path.exists(temp_path):
-                        try:
-                            os.remove(temp_path)
-                        except Exception:
-                            pass
-                    raise ValueError(
-                        f"Error writing to output file: {args.output_file} - {e}"
-                    )
+                except ValueError as e:
+                    print(f"Error: {e}", file=sys.stderr)
+                    sys.exit(1)
                 print(f"Compressed to {args.output_file}")
             else:
+                start = time.perf_counter()
                 sys.stdout.buffer.write(compressed)
+                sys.stdout.buffer.flush()
+                if stats is not None:
+                    stats.lap("write", start, len(compressed), len(compressed))
+        print_stats(stats)
 
     elif args.command == "decompress":
-        if args.input_file:
+        limits = {"max_output_size": args.max_output_size, "max_ratio": args.max_ratio}
+        if args.max_ratio is not None and args.max_ratio <= 0:
+            print("Error: --max-ratio must be positive", file=sys.stderr)
+            sys.exit(1)
+        if args.inputs or args.jobs_from:
+            # The batch functions always write indented JSON
+            for flag, given in (
+                ("--compact", args.compact),
+                ("--raw", args.raw),
+                ("--validate", args.validate != "none"),
+            ):
+                if given:
+                    parser.error(f"{flag} needs a single input")
+            run_batch(
+                args, jsonbrotliminifyer.decompress_json_files, ".json", limits, stats
+            )
+        if args.compact and args.raw:
+            print("Error: --compact and --raw exclude each other", file=sys.stderr)
+            sys.exit(1)
+        streaming = args.compact or args.raw or args.validate != "none"
+        if args.input_file and not streaming:
             if not args.output_file:
                 print(
                     "Error: --output-file is required when using --input-file",
                     file=sys.stderr,
                 )
                 sys.exit(1)
-            jsonbrotliminifyer.decompress_json_file(args.input_file, args.output_file)
+            try:
+                jsonbrotliminifyer.decompress_json_file(
+                    args.input_file, args.output_file, stats=stats, **limits
+                )
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(1)
             print(f"Decompressed {args.input_file} to {args.output_file}")
         else:
-            # Read from stdin
-            compressed = sys.stdin.buffer.read()
+            # Decode block by block; output starts with the first block
             try:
-                data = jsonbrotliminifyer.decompress_json(compressed)
+                with contextlib.ExitStack() as stack:
+                    source = sys.stdin.buffer
+                    if args.input_file:
+                        try:
+                            source = stack.enter_context(open(args.input_file, "rb"))
+                        except OSError as e:
+                            raise ValueError(
+                                f"Error reading input file: {args.input_file} - {e}"
+                            )
+                    jsonbrotliminifyer.decompress_json_stream(
+                        source,
+                        args.output_file or sys.stdout.buffer,
+                        pretty=not args.compact,
+                        raw=args.raw,
+                        validate=args.validate,
+                        stats=stats,
+                        **limits,
+                    )
             except ValueError as e:
                 print(f"Error: {e}", file=sys.stderr)
                 sys.exit(1)
             if args.output_file:
-                output_path_str = str(args.output_file)
-                temp_fd, temp_path = tempfile.mkstemp(
-                    dir=os.path.dirname(output_path_str), suffix=".tmp"
-                )
-                try:
-                    with os.fdopen(temp_fd, "w", encoding="utf-8") as temp_f:
-                        json.dump(data, temp_f, indent=2)
-                    os.replace(temp_path, output_path_str)
-                except PermissionError:
-                    raise ValueError(
-                        f"Permission denied writing to output file: {args.output_file}"
-                    )
-                except OSError as e:
-                    if os.path.exists(temp_path):
-                        try:
-                            os.remove(temp_path)
-                        except Exception:
-                            pass
-                    raise ValueError(
-                        f"Error writing to output file: {args.output_file} - {e}"
-                    )
                 print(f"Decompressed to {args.output_file}")
-            else:
-                json.dump(data, sys.stdout, indent=2)
+        print_stats(stats)
+
+    elif args.command == "pack":
+        members = archive_members(args.inputs)
+        try:
+            with jsonbrotliminifyer.ArchiveWriter(
+                args.output_file,
+                block_size=args.block_size,
+                quality=args.quality,
+                validate=args.validate,
+                workers=args.workers,
+            ) as writer:
+                for path, name in members:
+                    writer.add_file(path, name)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Packed {len(members)} files to {args.output_file}")
+
+    elif args.command == "unpack":
+        if args.max_ratio is not None and args.max_ratio <= 0:
+            print("Error: --max-ratio must be positive", file=sys.stderr)
+            sys.exit(1)
+        try:
+            if args.list:
+                with jsonbrotliminifyer.ArchiveReader(
+                    args.input_file,
+                    max_output_size=args.max_output_size,
+                    max_ratio=args.max_ratio,
+                ) as reader:
+                    for member in reader.members:
+                        print(f"{member.size:>12}  {member.name}")
+                return
+            written = jsonbrotliminifyer.unpack_json_archive(
+                args.input_file,
+                args.output_dir,
+                args.names or None,
+                max_output_size=args.max_output_size,
+                max_ratio=args.max_ratio,
+            )
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Unpacked {len(written)} files to {args.output_dir}")
     else:
         parser.print_help()
 
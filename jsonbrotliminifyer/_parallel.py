@@ -0,0 +1,120 @@
+"""
+Framed format for payloads compressed as independent blocks on several threads.
+
+Layout::
+
+    MAGIC (4 bytes) VERSION (1 byte)
+    frame*                  compressed size (4 bytes LE) decompressed size
+                            (4 bytes LE) Brotli stream
+    end marker              eight zero bytes
+
+The first byte of MAGIC is not a valid start of a Brotli stream. The decompressed
+frames concatenate to the original payload.
+"""
+
+import collections
+import concurrent.futures
+import struct
+from typing import Callable, Deque, Iterable, Iterator, Optional, Union
+
+import brotli
+
+MAGIC = b"\x11JBP"
+VERSION = 1
+HEADER = MAGIC + bytes([VERSION])
+
+# Largest block a frame can describe
+MAX_BLOCK_SIZE = 2**32 - 1
+
+_FRAME = struct.Struct("<II")
+_END = _FRAME.pack(0, 0)
+
+
+def is_parallel(data: bytes) -> bool:
+    """Return True if data starts with the framed format magic."""
+    return bytes(data[: len(MAGIC)]) == MAGIC
+
+
+def compress_frames(
+    blocks: Iterable[Union[bytes, memoryview]],
+    compress: Callable[[Union[bytes, memoryview]], bytes],
+    workers: int,
+) -> Iterator[bytes]:
+    """
+    Compress blocks on a thread pool and yield the framed output in order.
+
+    Brotli releases the GIL while encoding, so the blocks are compressed in
+    parallel. At most two blocks per worker are in flight, which bounds memory
+    when blocks come from a file.
+    """
+    yield HEADER
+    pending: Deque["concurrent.futures.Future[bytes]"] = collections.deque()
+    sizes: Deque[int] = collections.deque()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            for block in blocks:
+                pending.append(pool.submit(compress, block))
+                sizes.append(len(block))
+                if len(pending) >= 2 * workers:
+                    compressed = pending.popleft().result()
+                    yield _FRAME.pack(len(compressed), sizes.popleft())
+                    yield compressed
+            while pending:
+                compressed = pending.popleft().result()
+                yield _FRAME.pack(len(compressed), sizes.popleft())
+                yield compressed
+        finally:
+            for future in pending:
+                future.cancel()
+    yield _END
+
+
+def _decompress_frame(compressed: bytes, size: int) -> bytes:
+    """Decompress one frame, giving up as soon as it outgrows its declared size."""
+    decompressor = brotli.Decompressor()
+    limit = max(size, 1)
+    try:
+        block: bytes = decompressor.process(compressed, output_buffer_limit=limit)
+        while not decompressor.is_finished() and len(block) <= size:
+            more = decompressor.process(b"", output_buffer_limit=limit)
+            if not more:
+                break
+            block += more
+    except brotli.error as e:
+        raise ValueError("Invalid Brotli-compressed data") from e
+    if len(block) != size or not decompressor.is_finished():
+        raise ValueError("Invalid Brotli-compressed data")
+    return block
+
+
+def iter_frames(
+    read: Callable[[int], bytes], reserve: Optional[Callable[[int], None]] = None
+) -> Iterator[bytes]:
+    """
+    Decompress framed data given a read(n) callable, one block per frame.
+
+    The header must not have been consumed yet. reserve, if given, is called
+    with the declared size of each block before it is decompressed and may
+    raise to stop there. A frame is never decompressed past its declared size.
+
+    Raises:
+        ValueError: If the data is truncated or a frame is corrupt
+    """
+    header = read(len(HEADER))
+    if header[: len(MAGIC)] != MAGIC:
+        raise ValueError("Invalid Brotli-compressed data")
+    if header[len(MAGIC) :] != bytes([VERSION]):
+        raise ValueError("Unsupported parallel stream version")
+    while True:
+        head = read(_FRAME.size)
+        if len(head) < _FRAME.size:
+            raise ValueError("Truncated parallel stream")
+        length, size = _FRAME.unpack(head)
+        if not length:
+            return
+        compressed = read(length)
+        if len(compressed) < length:
+            raise ValueError("Truncated parallel stream")
+        if reserve is not None:
+            reserve(size)
+        yield _decompress_frame(compressed, size)
@@ -0,0 +1,73 @@
+"""JSON Pointer (RFC 6901) parsing and resolution."""
+
+from typing import Any, List, Sequence
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """
+    Split a JSON Pointer into its unescaped reference tokens.
+
+    Raises:
+        ValueError: If the pointer is not empty and does not start with "/"
+    """
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError(f"JSON Pointer must be empty or start with '/': {pointer!r}")
+    return [
+        token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")
+    ]
+
+
+def escape_token(token: str) -> str:
+    """Escape one reference token for use in a JSON Pointer."""
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def format_pointer(tokens: Sequence[str]) -> str:
+    """Join unescaped reference tokens into a JSON Pointer."""
+    return "".join("/" + escape_token(token) for token in tokens)
+
+
+def parse_index(token: str) -> int:
+    """
+    Convert a reference token to an array index.
+
+    Raises:
+        ValueError: If the token is not a non-negative integer without leading zeros
+    """
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise ValueError(f"Invalid array index in JSON Pointer: {token!r}")
+    return int(token)
+
+
+def array_index(token: str, length: int) -> int:
+    """
+    Convert a reference token to an index into an array of the given length.
+
+    Raises:
+        ValueError: If the token is not a valid index or is out of range
+    """
+    index = parse_index(token)
+    if index >= length:
+        raise ValueError(f"Array index out of range in JSON Pointer: {token!r}")
+    return index
+
+
+def resolve_pointer(value: Any, tokens: Sequence[str]) -> Any:
+    """
+    Follow reference tokens from value.
+
+    Raises:
+        ValueError: If a token does not exist in the document
+    """
+    for token in tokens:
+        if type(value) is dict:
+            if token not in value:
+                raise ValueError(f"JSON Pointer member not found: {token!r}")
+            value = value[token]
+        elif type(value) is list:
+            value = value[array_index(token, len(value))]
+        else:
+            raise ValueError(f"JSON Pointer descends into a scalar at {token!r}")
+    return value
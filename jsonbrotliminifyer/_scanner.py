@@ -0,0 +1,656 @@
+"""Incremental JSON scanning for data that arrives in chunks."""
+
+import codecs
+import json
+import re
+from itertools import accumulate
+from typing import Iterable, List, Optional, Sequence, cast
+
+from ._pointer import parse_index
+
+_STRING = r'"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*"'
+
+# One token, preceded by optional whitespace. Every non-whitespace character ends
+# up in some token: besides the valid JSON tokens the pattern also matches a string
+# cut off by the end of the buffer, runs of other characters (partial or invalid
+# literals and numbers) and a lone quote (a string containing an invalid
+# character). This lets findall() tokenize a whole chunk in one C-level pass;
+# invalid tokens are rejected by the consumer.
+_TOKEN_ALTERNATIVES = (
+    r"""
+        [{}\[\],:]
+        |"""
+    + _STRING
+    + r"""
+        |-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?
+        |true|false|null|NaN|Infinity|-Infinity
+        |"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*
+            (?:\\(?:u[0-9a-fA-F]{0,3})?)?\Z
+        |[^ \t\n\r{}\[\],:"]+
+        |"
+    """
+)
+_TOKEN_RE = re.compile(r"[ \t\n\r]*(" + _TOKEN_ALTERNATIVES + ")", re.VERBOSE)
+# For findall(), whitespace at the end of the buffer also matches, as an empty
+# token. Otherwise the search would fail and restart at every character of a
+# trailing run of whitespace, taking quadratic time in its length.
+_FEED_RE = re.compile(r"[ \t\n\r]*(" + _TOKEN_ALTERNATIVES + r"|\Z)", re.VERBOSE)
+_STRING_RE = re.compile(_STRING)
+_PARTIAL_NUMBER_RE = re.compile(r"-?[0-9]*(?:\.[0-9]*)?(?:[eE][+-]?[0-9]*)?")
+_LITERALS = frozenset(("true", "false", "null", "NaN", "Infinity", "-Infinity"))
+_DIGITS = frozenset("0123456789")
+
+
+def is_scalar_token(raw: str) -> bool:
+    """Return True if a raw token from JsonTokenizer is a valid JSON scalar."""
+    kind = raw[0]
+    if kind == '"':
+        # Complete strings are at least two characters; the lone quote is not
+        return len(raw) > 1
+    if kind in _DIGITS or raw in _LITERALS:
+        return True
+    return kind == "-" and len(raw) > 1 and raw[1] in _DIGITS
+
+
+def _is_partial_token(raw: str) -> bool:
+    """Return True if raw could be a number or literal cut off mid-way."""
+    if any(literal.startswith(raw) for literal in _LITERALS):
+        return True
+    return _PARTIAL_NUMBER_RE.fullmatch(raw) is not None
+
+
+class JsonTokenizer:
+    """
+    Split JSON text into tokens without building Python objects.
+
+    Text may be fed in arbitrary pieces; a token that straddles two pieces is held
+    back until the rest of it arrives. Only that unfinished token is buffered.
+    """
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self.consumed = 0
+
+    def feed(self, text: str, final: bool = False) -> List[str]:
+        """
+        Tokenize as much of the buffered text as possible.
+
+        Args:
+            text: The next piece of JSON text
+            final: True if no more text will follow
+
+        Returns:
+            List of raw token strings with surrounding whitespace removed. Tokens
+            are not checked individually; use is_scalar_token() on scalars.
+
+        Raises:
+            ValueError: If final is True and the text ends inside a string
+        """
+        buf = self._buf + text if self._buf else text
+        tokens = _FEED_RE.findall(buf)
+        while tokens and not tokens[-1]:
+            tokens.pop()
+        self._buf = ""
+        if tokens:
+            last = tokens[-1]
+            if final:
+                if last[0] == '"' and _STRING_RE.fullmatch(last) is None:
+                    raise ValueError(
+                        f"Unterminated JSON string near offset {self.consumed}"
+                    )
+            elif last[0] == '"':
+                if _STRING_RE.fullmatch(last) is None and buf.endswith(last):
+                    # A string cut off by the end of the buffer. A lone quote
+                    # followed by a control character is left as an invalid token.
+                    self._buf = tokens.pop()
+            elif last[0] not in "{}[],:" and buf.endswith(last):
+                # Numbers and literals touching the end of the buffer may continue
+                # in the next chunk; "1." arrives as the tokens "1" and "."
+                start = len(tokens) - 1
+                tail = last
+                while (
+                    start > 0
+                    and tokens[start - 1][0] not in '{}[],:"'
+                    and buf.endswith(tokens[start - 1] + tail)
+                ):
+                    start -= 1
+                    tail = tokens[start] + tail
+                if _is_partial_token(tail):
+                    self._buf = tail
+                    del tokens[start:]
+        self.consumed += len(buf) - len(self._buf)
+        return tokens
+
+
+# Parser states for JsonValidator
+_VALUE = 0
+_VALUE_OR_CLOSE = 1
+_KEY = 2
+_KEY_OR_CLOSE = 3
+_COLON = 4
+_COMMA_OR_CLOSE = 5
+_DONE = 6
+
+_CLOSERS = {"]": "[", "}": "{"}
+_STRUCTURAL = frozenset("[]{},:")
+
+
+class JsonValidator:
+    """
+    Check that text fed in chunks forms exactly one well-formed JSON document.
+
+    Memory use is proportional to the nesting depth plus the longest token, never
+    to the document size.
+    """
+
+    def __init__(self) -> None:
+        self._tokenizer = JsonTokenizer()
+        self._stack: List[str] = []
+        self._state = _VALUE
+
+    def feed(self, text: str) -> None:
+        """
+        Validate the next piece of JSON text.
+
+        Raises:
+            ValueError: If the text so far cannot be the prefix of a valid document
+        """
+        self._process(self._tokenizer.feed(text))
+
+    def close(self) -> None:
+        """
+        Finish validation.
+
+        Raises:
+            ValueError: If the document is incomplete or empty
+        """
+        self._process(self._tokenizer.feed("", final=True))
+        if self._state != _DONE:
+            raise ValueError("Unexpected end of JSON data")
+
+    def _process(self, tokens: List[str]) -> None:
+        stack = self._stack
+        state = self._state
+        for raw in tokens:
+            kind = raw[0]
+            if state == _VALUE or state == _VALUE_OR_CLOSE:
+                if kind == "{":
+                    stack.append("{")
+                    state = _KEY_OR_CLOSE
+                    continue
+                if kind == "[":
+                    stack.append("[")
+                    state = _VALUE_OR_CLOSE
+                    continue
+                if kind == "]" and state == _VALUE_OR_CLOSE:
+                    stack.pop()
+                elif not is_scalar_token(raw):
+                    raise self._error(raw)
+            elif state == _KEY or state == _KEY_OR_CLOSE:
+                if kind == '"' and len(raw) > 1:
+                    state = _COLON
+                    continue
+                if kind == "}" and state == _KEY_OR_CLOSE:
+                    stack.pop()
+                else:
+                    raise self._error(raw)
+            elif state == _COLON:
+                if kind != ":":
+                    raise self._error(raw)
+                state = _VALUE
+                continue
+            elif state == _COMMA_OR_CLOSE:
+                if kind == ",":
+                    state = _KEY if stack[-1] == "{" else _VALUE
+                    continue
+                if kind in _CLOSERS and _CLOSERS[kind] == stack[-1]:
+                    stack.pop()
+                else:
+                    raise self._error(raw)
+            else:
+                raise self._error(raw)
+            # A value (scalar or closed container) has just been completed
+            state = _COMMA_OR_CLOSE if stack else _DONE
+        self._state = state
+
+    def _error(self, raw: str) -> ValueError:
+        return ValueError(
+            f"Unexpected {raw[:20]!r} near offset {self._tokenizer.consumed}"
+        )
+
+
+class JsonReformatter:
+    """
+    Lay out tokens from JsonTokenizer as compact or indented JSON text.
+
+    Tokens are copied as they are, so strings and numbers keep their exact
+    spelling and only the whitespace between tokens changes. With indent, the
+    layout matches json.dumps(obj, indent=indent). Tokens are not validated.
+    Memory use is bounded by the tokens of one call.
+    """
+
+    def __init__(self, indent: Optional[int] = None) -> None:
+        self._indent = indent
+        self._depth = 0
+        # An opening bracket is held back until the next token shows whether
+        # its container is empty, which json.dumps writes as [] or {}
+        self._held = ""
+
+    def format(self, tokens: List[str], final: bool = False) -> str:
+        """Return the text for the next tokens of the document."""
+        if self._indent is None:
+            return "".join(tokens)
+        unit = " " * self._indent
+        depth = self._depth
+        held = self._held
+        out: List[str] = []
+        append = out.append
+        # Separator after a comma at the current depth; its tail starts a line
+        comma = ",\n" + unit * depth
+        for raw in tokens:
+            if held:
+                if raw == "]" or raw == "}":
+                    append(held + raw)
+                    held = ""
+                    continue
+                depth += 1
+                comma = ",\n" + unit * depth
+                append(held + comma[1:])
+                held = ""
+            # Scalars are by far the most common tokens; test for them first
+            if raw not in _STRUCTURAL:
+                append(raw)
+            elif raw == ":":
+                append(": ")
+            elif raw == ",":
+                append(comma)
+            elif raw == "[" or raw == "{":
+                held = raw
+            else:
+                if depth:
+                    depth -= 1
+                comma = ",\n" + unit * depth
+                append(comma[1:] + raw)
+        if final and held:
+            append(held)
+            held = ""
+        self._depth = depth
+        self._held = held
+        return "".join(out)
+
+
+# Byte-level patterns for JsonCursor. UTF-8 never uses ASCII bytes inside
+# multi-byte characters, so structure can be found without decoding the text.
+_TOKEN_BYTES_RE = re.compile(_TOKEN_RE.pattern.encode("ascii"), re.VERBOSE)
+_STRING_BYTES_RE = re.compile(_STRING.encode("ascii"))
+# Skipped strings are not validated, only delimited
+_SKIP_STRUCTURE_RE = re.compile(rb'"[^"\\]*(?:\\[\s\S][^"\\]*)*"|[\[\]{},]')
+_NOT_STRUCTURE = bytes(sorted(set(range(256)) - set(b"[]{},")))
+# Signed depth change of each structural byte
+_DEPTH_DELTA = bytes.maketrans(b"[{]},", b"\x01\x01\xff\xff\x00")
+_STRUCTURE_BYTES = frozenset(b"{}[],:")
+_SCALAR_RUN_RE = re.compile(rb'[^ \t\n\r{}\[\],:"]*')
+_COMMA_MASK = bytes.maketrans(b"[{]},", b"\x01\x01\x01\x01\x00")
+_SKIP_WINDOW = 4096
+
+
+def _level_commas(structure: bytes, levels: List[int]) -> List[int]:
+    """Return the indices of the commas in structure whose level is 0."""
+    if max(levels, default=0) < 256:
+        # Bytewise OR of the levels and a mask that is 0 only at commas leaves
+        # zero bytes exactly at the commas on level 0
+        size = len(structure)
+        marks = int.from_bytes(bytes(levels), "big") | int.from_bytes(
+            structure.translate(_COMMA_MASK), "big"
+        )
+        combined = marks.to_bytes(size, "big")
+        commas = []
+        index = combined.find(0)
+        while index >= 0:
+            commas.append(index)
+            index = combined.find(0, index + 1)
+        return commas
+    return [i for i, level in enumerate(levels) if level == 0 and structure[i] == 0x2C]
+
+
+def _open_quote(data: bytes) -> int:
+    """Return the index of the last quote in data that is not escaped."""
+    index = len(data)
+    while True:
+        index = data.rfind(b'"', 0, index)
+        start = index
+        while start and data[start - 1] == 0x5C:
+            start -= 1
+        if (index - start) % 2 == 0:
+            return index
+
+
+class JsonCursor:
+    """
+    Walk JSON text that arrives as blocks of UTF-8 bytes.
+
+    Tokens on the path of interest are read one by one; subtrees and array
+    elements off the path are skipped a window at a time by erasing strings and
+    counting brackets with bytes methods, so their cost is a few C-level passes
+    over the data rather than a Python step per token. Skipped data is not
+    validated. Only the unread rest of the current block is buffered, plus the
+    value being captured, if any.
+    """
+
+    def __init__(self, blocks: Iterable[bytes]) -> None:
+        self._blocks = iter(blocks)
+        self._buf = b""
+        self._pos = 0
+        self._eof = False
+        self._mark: Optional[int] = None
+        self._captured: List[bytes] = []
+
+    def _more(self) -> bool:
+        """Append the next block to the buffer, dropping what has been read."""
+        if self._eof:
+            return False
+        block = next(self._blocks, None)
+        if block is None:
+            self._eof = True
+            return False
+        if self._mark is not None:
+            self._captured.append(self._buf[self._mark : self._pos])
+            self._mark = 0
+        self._buf = self._buf[self._pos :] + block
+        self._pos = 0
+        return True
+
+    def token(self) -> Optional[bytes]:
+        """Return the next raw token, or None at the end of the data."""
+        while True:
+            buf = self._buf
+            match = _TOKEN_BYTES_RE.match(buf, self._pos)
+            if match is not None:
+                start, end = match.span(1)
+                kind = buf[start]
+                if kind == 0x22:
+                    complete = (
+                        end < len(buf)
+                        or _STRING_BYTES_RE.fullmatch(buf, start, end) is not None
+                    )
+                elif kind in _STRUCTURE_BYTES:
+                    complete = True
+                else:
+                    # Take the whole run up to the next delimiter, so that "1.5e-3"
+                    # split between blocks is not read as "1.5"
+                    end = cast(
+                        "re.Match[bytes]", _SCALAR_RUN_RE.match(buf, start)
+                    ).end()
+                    complete = end < len(buf)
+                if complete or self._eof:
+                    self._pos = end
+                    return buf[start:end]
+            if not self._more() and match is None:
+                return None
+
+    def _scan(self, separators: int) -> bool:
+        """
+        Skip structure at the current nesting level.
+
+        Stops after the separators-th comma at this level and returns True, or
+        after the bracket that closes the level and returns False.
+        """
+        depth = 0
+        window = _SKIP_WINDOW
+        while True:
+            end = min(self._pos + window, len(self._buf))
+            chunk = self._buf[self._pos : end]
+            if b"\\" in chunk:
+                # Drop escaped backslashes, then escaped quotes, so every
+                # remaining quote delimits a string
+                parts = chunk.replace(b"\\\\", b"").replace(b'\\"', b"").split(b'"')
+            else:
+                parts = chunk.split(b'"')
+            resume = end
+            if len(parts) % 2 == 0:
+                # The window ends inside a string; look at it again with the
+                # next window
+                parts.pop()
+                resume = self._pos + _open_quote(chunk)
+            text = b"".join(parts[::2])
+            structure = text.translate(None, _NOT_STRUCTURE)
+            levels = list(
+                accumulate(
+                    memoryview(structure.translate(_DEPTH_DELTA)).cast("b"),
+                    initial=depth,
+                )
+            )
+            try:
+                stop = levels.index(-1) - 1
+            except ValueError:
+                stop = len(structure)
+            if separators:
+                commas = _level_commas(structure[:stop], levels[1 : stop + 1])
+                if len(commas) >= separators:
+                    self._advance(commas[separators - 1] + 1)
+                    return True
+                separators -= len(commas)
+            if stop < len(structure):
+                self._advance(stop + 1)
+                return False
+            depth = levels[-1]
+            self._pos = resume
+            window *= 2
+            if end == len(self._buf) and not self._more():
+                raise ValueError("Unexpected end of JSON data")
+
+    def _advance(self, count: int) -> None:
+        """Move past the count-th structural byte outside strings."""
+        for match in _SKIP_STRUCTURE_RE.finditer(self._buf, self._pos):
+            if match.group()[0] != 0x22:
+                count -= 1
+                if not count:
+                    self._pos = match.end()
+                    return
+        raise AssertionError("structural byte not found")
+
+    def skip_value(self, first: bytes) -> None:
+        """Skip the rest of the value whose first token is first."""
+        if first == b"{" or first == b"[":
+            self._scan(0)
+
+    def skip_items(self, count: int) -> bool:
+        """
+        Skip count array elements, the first of which has not been read yet.
+
+        Returns:
+            False if the array ended first
+        """
+        return self._scan(count)
+
+    def capture(self, first: bytes) -> bytes:
+        """Return the complete text of the value whose first token is first."""
+        self._mark = self._pos - len(first)
+        self._captured = []
+        self.skip_value(first)
+        self._captured.append(self._buf[self._mark : self._pos])
+        self._mark = None
+        return b"".join(self._captured)
+
+
+def _member_key(raw: bytes) -> str:
+    if _STRING_BYTES_RE.fullmatch(raw) is None:
+        raise ValueError(f"Unexpected {raw[:20]!r} where a member name was expected")
+    if b"\\" not in raw:
+        return raw[1:-1].decode("utf-8")
+    return cast(str, json.loads(raw))
+
+
+def find_value(cursor: JsonCursor, path: Sequence[str]) -> Optional[bytes]:
+    """
+    Return the JSON text of the value at path, or None if it does not exist.
+
+    The cursor is advanced only up to the end of that value. For repeated member
+    names the first one wins.
+
+    Args:
+        cursor: A JsonCursor at the start of the document
+        path: Unescaped JSON Pointer reference tokens
+    """
+    first = cursor.token()
+    for step in path:
+        if first == b"{":
+            raw = cursor.token()
+            while raw is not None and raw != b"}":
+                key = _member_key(raw)
+                if cursor.token() != b":":
+                    raise ValueError("Expected ':' after a member name")
+                first = cursor.token()
+                if first is None:
+                    break
+                if key == step:
+                    break
+                cursor.skip_value(first)
+                raw = cursor.token()
+                if raw == b",":
+                    raw = cursor.token()
+            else:
+                return None
+        elif first == b"[":
+            index = parse_index(step)
+            if index and not cursor.skip_items(index):
+                return None
+            first = cursor.token()
+            if first == b"]":
+                return None
+        else:
+            return None
+        if first is None:
+            break
+    if first is None:
+        raise ValueError("Unexpected end of JSON data")
+    return cursor.capture(first)
+
+
+# Patterns for JsonScanner. Strings and scalars are replaced by single control
+# bytes, which are invalid anywhere in JSON text and so cannot be confused with
+# input, and containers are then reduced bottom-up with regular expressions.
+_SCAN_TEXT = bytes(range(0x20, 0x100)) + b"\t\n\r"
+_SCAN_ESCAPED = b"\x04"
+_SCAN_SIMPLE_ESCAPES = (b"\\/", b"\\b", b"\\f", b"\\n", b"\\r", b"\\t")
+_SCAN_BAD_ESCAPE_RE = re.compile(rb"\\(?!u[0-9a-fA-F]{4})")
+_SCAN_ESCAPE_TAIL_RE = re.compile(rb"\\(?:u[0-9a-fA-F]{0,3})?\Z")
+_SCAN_DELIMITERS = b"[]{},:\x01 \t\n\r"
+_SCAN_SCALAR_CHARS = bytes(set(range(256)) - set(_SCAN_DELIMITERS))
+# Splits scalars apart and maps digits 1-9 to 1, so runs of one shape compare equal
+_SCAN_RUN_TABLE = bytes.maketrans(
+    _SCAN_DELIMITERS + b"23456789", b" " * len(_SCAN_DELIMITERS) + b"1" * 8
+)
+_SCAN_SKELETON_TABLE = bytes(c if c in _SCAN_DELIMITERS else 2 for c in range(256))
+_SCAN_SCALAR_RE = re.compile(
+    rb"-?(?:0|1[01]*)(?:\.[01]+)?(?:[eE][+-]?[01]+)?"
+    rb"|true|false|null|NaN|Infinity|-Infinity"
+)
+_V = rb"[\x01-\x03]"
+_SCAN_CLOSE_RE = re.compile(
+    rb"\[\]|\{\}|\[" + _V + rb"(?:," + _V + rb")*\]"
+    rb"|\{\x01:" + _V + rb"(?:,\x01:" + _V + rb")*\}"
+)
+# Inside an array or object that is still open, the members so far can be
+# replaced by one, which keeps the unreduced structure as small as the nesting
+_SCAN_ARRAY_RE = re.compile(rb"\[" + _V + rb"(?:," + _V + rb")+")
+_SCAN_OBJECT_RE = re.compile(rb"\{\x01:" + _V + rb"(?:,\x01:" + _V + rb")+")
+# Longest unreduced structure, reached only by very deep nesting or invalid input
+_SCAN_MAX_OPEN = 64 * 1024
+
+
+class JsonScanner:
+    """
+    Check that UTF-8 bytes fed in chunks form exactly one well-formed JSON document.
+
+    Accepts the same documents as JsonValidator but works on whole chunks with
+    bytes methods instead of a Python step per token, which makes it several
+    times faster. Errors are reported without offsets. Memory use is bounded by
+    the chunk size plus the nesting depth.
+    """
+
+    def __init__(self) -> None:
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._carry = b""
+        self._open = b""
+
+    def feed(self, data: bytes, final: bool = False) -> None:
+        """
+        Check the next chunk of JSON text.
+
+        Raises:
+            ValueError: If the text so far cannot be the prefix of a valid document
+        """
+        try:
+            self._utf8.decode(data, final)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Invalid UTF-8 in JSON text - {e}") from e
+        data = self._carry + data
+        self._carry = b""
+        if data.translate(None, _SCAN_TEXT):
+            raise ValueError("Invalid control character in JSON text")
+        if b"\\" in data:
+            data = data.replace(b"\\\\", _SCAN_ESCAPED).replace(b'\\"', _SCAN_ESCAPED)
+        parts = data.split(b'"')
+        strings = parts[1::2]
+        outside = parts[0::2]
+        if len(parts) % 2 == 0:
+            # The last string continues in the next chunk, which starts by
+            # reopening it along with any escape sequence cut in half
+            if final:
+                raise ValueError("Unterminated JSON string")
+            tail = _SCAN_ESCAPE_TAIL_RE.search(strings[-1])
+            if tail is not None:
+                strings[-1] = strings[-1][: tail.start()]
+            self._carry = b'"' + (tail.group() if tail is not None else b"")
+        elif not final:
+            # A number or literal may continue in the next chunk
+            last = outside[-1]
+            stripped = last.rstrip(_SCAN_SCALAR_CHARS)
+            self._carry = last[len(stripped) :]
+            outside[-1] = stripped
+        self._check_strings(b'"'.join(strings))
+        self._reduce(b"\x01".join(outside))
+
+    def close(self) -> None:
+        """
+        Finish the check.
+
+        Raises:
+            ValueError: If the document is incomplete, empty or followed by more data
+        """
+        self.feed(b"", final=True)
+        if len(self._open) != 1 or self._open not in b"\x01\x02\x03":
+            raise ValueError("Invalid JSON structure")
+
+    @staticmethod
+    def _check_strings(strings: bytes) -> None:
+        if len(strings.translate(None, b"\t\n\r")) != len(strings):
+            raise ValueError("Invalid control character in JSON string")
+        if b"\\" in strings:
+            # Replaced rather than deleted, so the bytes around an escape cannot
+            # join into one that looks valid, as "\u12\t34" would
+            for escape in _SCAN_SIMPLE_ESCAPES:
+                strings = strings.replace(escape, _SCAN_ESCAPED)
+            if _SCAN_BAD_ESCAPE_RE.search(strings) is not None:
+                raise ValueError("Invalid escape in JSON string")
+
+    def _reduce(self, text: bytes) -> None:
+        for run in set(text.translate(_SCAN_RUN_TABLE).split()):
+            if _SCAN_SCALAR_RE.fullmatch(run) is None:
+                raise ValueError("Invalid JSON token")
+        text = text.translate(_SCAN_SKELETON_TABLE)
+        while b"\x02\x02" in text:
+            text = text.replace(b"\x02\x02", b"\x02")
+        tree = self._open + text.translate(None, b" \t\n\r")
+        while True:
+            tree, closed = _SCAN_CLOSE_RE.subn(b"\x03", tree)
+            if closed:
+                continue
+            tree, arrays = _SCAN_ARRAY_RE.subn(b"[\x03", tree)
+            tree, objects = _SCAN_OBJECT_RE.subn(b"{\x01:\x03", tree)
+            if not (arrays or objects):
+                break
+        if len(tree) > _SCAN_MAX_OPEN:
+            raise ValueError("Invalid JSON structure or nesting too deep")
+        self._open = tree
@@ -0,0 +1,403 @@
+"""
+Reversible pre-transforms applied to a document before it is serialized.
+
+A transformed payload is not plain JSON: it starts with ENVELOPE_MAGIC and a flags
+byte naming the transforms applied. With FLAG_PACKED the flags are followed by the
+length of the JSON text as a little-endian 64-bit integer, the JSON text and a
+binary section holding packed numeric arrays; otherwise the JSON text follows the
+flags directly. JSON text never starts with a NUL byte, so decompression can tell
+transformed and plain payloads apart from the first bytes.
+
+Transformed documents mark their rewritten parts with single-key objects whose key
+starts with a NUL character. Keys of the original document that start with NUL are
+escaped by doubling it, so the markers can never collide with user data.
+"""
+
+import array
+import itertools
+import math
+import operator
+import struct
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+ENVELOPE_MAGIC = b"\x00JBM"
+
+# Flags byte of the envelope
+FLAG_COLUMNAR = 0x01
+FLAG_PACKED = 0x02
+_KNOWN_FLAGS = FLAG_COLUMNAR | FLAG_PACKED
+
+# Lists of at least this many records with identical keys are stored as columns.
+# Shorter lists gain little and cost a marker object each.
+COLUMNAR_MIN_ROWS = 16
+
+# Lists of at least this many ints, or of floats, are packed into the binary section
+PACK_MIN_LENGTH = 64
+
+# Floats that are all decimals with at most this many fractional digits are stored
+# as scaled integers, which compress far better than IEEE doubles
+_MAX_DECIMALS = 6
+
+_ESCAPE = "\x00"
+_COLUMNS_KEY = "\x00c"
+_PACKED_KEY = "\x00n"
+_JSON_LENGTH = struct.Struct("<Q")
+
+# The walks below test whole containers with set(map(type, ...)), which runs at C
+# speed, and only visit elements one by one when a container holds containers.
+# Encoding skips only values known to be scalars, since subclasses of dict, list
+# and tuple (OrderedDict, namedtuple) serialize like their base types.
+_ENCODE_SCALARS = frozenset((str, int, float, bool, type(None)))
+_DECODE_CONTAINERS = frozenset((dict, list))
+
+# array typecodes for signed integers of each byte width
+_INT_CODES = {array.array(code).itemsize: code for code in ("l", "q", "i", "h", "b")}
+_INT_LIMITS = [
+    (width, -(1 << (8 * width - 1)), (1 << (8 * width - 1)) - 1)
+    for width in (1, 2, 4, 8)
+]
+_SWAP = sys.byteorder == "big"
+
+
+def _has_escape(keys: Iterable[Any]) -> bool:
+    """Return True if any key may start with the escape character."""
+    try:
+        return _ESCAPE in "".join(keys)
+    except TypeError:
+        # Non-string keys; check the string ones individually
+        return any(type(key) is str and key[:1] == _ESCAPE for key in keys)
+
+
+def _escape_keys(keys: Iterable[Any]) -> List[Any]:
+    return [
+        _ESCAPE + key if type(key) is str and key[:1] == _ESCAPE else key
+        for key in keys
+    ]
+
+
+def _record_keys(rows: Sequence[Any]) -> Optional[Tuple[str, ...]]:
+    """Return the key tuple shared by all rows, or None if they differ."""
+    first = rows[0]
+    if not first:
+        return None
+    keys = tuple(first)
+    # Same keys in the same order; map() and count() keep the loop in C
+    if list(map(tuple, rows)).count(keys) != len(rows):
+        return None
+    if not all(type(key) is str for key in keys):
+        return None
+    return keys
+
+
+def _int_width(values: Sequence[int]) -> Optional[int]:
+    """Return the narrowest signed width in bytes holding values, or None."""
+    low, high = min(values), max(values)
+    for width, minimum, maximum in _INT_LIMITS:
+        if minimum <= low and high <= maximum:
+            return width
+    return None
+
+
+def _shuffle(data: bytes, width: int) -> bytes:
+    """Group the bytes of width-byte items by significance; high bytes form runs."""
+    if width == 1:
+        return data
+    return b"".join(data[i::width] for i in range(width))
+
+
+def _unshuffle(data: memoryview, width: int) -> bytes:
+    if width == 1:
+        return bytes(data)
+    count = len(data) // width
+    out = bytearray(len(data))
+    for i in range(width):
+        out[i::width] = data[i * count : (i + 1) * count]
+    return bytes(out)
+
+
+def _to_bytes(values: Iterable[Any], code: str) -> bytes:
+    packed = array.array(code, values)
+    if _SWAP:
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _from_bytes(data: bytes, code: str) -> List[Any]:
+    packed = array.array(code)
+    packed.frombytes(data)
+    if _SWAP:
+        packed.byteswap()
+    return packed.tolist()
+
+
+def _scaled(values: Sequence[float], scale: int) -> List[int]:
+    return list(map(round, map(operator.mul, values, itertools.repeat(scale))))
+
+
+def _unscaled(values: Iterable[int], scale: int) -> List[float]:
+    return list(map(operator.truediv, values, itertools.repeat(scale)))
+
+
+def _decimals(values: Sequence[float]) -> Optional[Tuple[int, List[int]]]:
+    """
+    Find the fewest decimals k such that every value is exactly n / 10**k.
+
+    Returns k and the integers n, or None. Candidates are checked on a prefix first,
+    then confirmed bit for bit on the whole list, so -0.0 and values that merely
+    print the same are never altered.
+    """
+    if not all(map(math.isfinite, values)):
+        return None
+    head = list(values[:PACK_MIN_LENGTH])
+    original = _to_bytes(values, "d")
+    for decimals in range(_MAX_DECIMALS + 1):
+        scale = 10**decimals
+        try:
+            if _unscaled(_scaled(head, scale), scale) != head:
+                continue
+            scaled = _scaled(values, scale)
+        except OverflowError:
+            # A product is infinite, and stays so at every larger scale
+            return None
+        if _to_bytes(_unscaled(scaled, scale), "d") == original:
+            return decimals, scaled
+    return None
+
+
+class Encoder:
+    """Apply the selected transforms to a document, collecting packed arrays."""
+
+    def __init__(self, columnar: bool, pack_numbers: bool) -> None:
+        self.columnar = columnar
+        self.pack_numbers = pack_numbers
+        self.blob = bytearray()
+
+    @property
+    def flags(self) -> int:
+        return (FLAG_COLUMNAR if self.columnar else 0) | (
+            FLAG_PACKED if self.pack_numbers else 0
+        )
+
+    def encode(self, value: Any) -> Any:
+        """
+        Return the transformed document.
+
+        The result shares unchanged containers with value; it is only meant to be
+        serialized.
+        """
+        kind = type(value)
+        if kind is dict:
+            return self._encode_dict(value)
+        if kind is list or kind is tuple:
+            return self._encode_list(value)
+        if kind in _ENCODE_SCALARS:
+            return value
+        if isinstance(value, dict):
+            return self._encode_dict(value)
+        if isinstance(value, (list, tuple)):
+            return self._encode_list(value)
+        return value
+
+    def _encode_dict(self, value: Dict[Any, Any]) -> Dict[Any, Any]:
+        keys: Iterable[Any] = _escape_keys(value) if _has_escape(value) else value
+        if set(map(type, value.values())) <= _ENCODE_SCALARS:
+            return value if keys is value else dict(zip(keys, value.values()))
+        return dict(zip(keys, map(self.encode, value.values())))
+
+    def _encode_list(self, value: Sequence[Any]) -> Any:
+        types = set(map(type, value))
+        if types <= _ENCODE_SCALARS:
+            if self.pack_numbers and len(value) >= PACK_MIN_LENGTH:
+                if types == {int}:
+                    return self._pack_ints(value, -1) or value
+                if types == {float}:
+                    return self._pack_floats(value)
+            return value
+        if self.columnar and types == {dict} and len(value) >= COLUMNAR_MIN_ROWS:
+            keys = _record_keys(value)
+            if keys is not None:
+                columns = [list(map(operator.itemgetter(key), value)) for key in keys]
+                return {
+                    _COLUMNS_KEY: [
+                        _escape_keys(keys),
+                        *(self._encode_list(column) for column in columns),
+                    ]
+                }
+        return list(map(self.encode, value))
+
+    def _pack_ints(
+        self, values: Sequence[int], decimals: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Store integers at their narrowest width, as deltas if that is narrower.
+
+        Returns None for values beyond 64 bits, which stay in the JSON text.
+        """
+        width = _int_width(values)
+        if width is None:
+            return None
+        base = None
+        if width > 1:
+            deltas = [0]
+            deltas += map(operator.sub, values[1:], values[:-1])
+            delta_width = _int_width(deltas)
+            if delta_width is not None and delta_width < width:
+                base, values, width = values[0], deltas, delta_width
+        offset = len(self.blob)
+        self.blob += _shuffle(_to_bytes(values, _INT_CODES[width]), width)
+        kind = "i" if decimals < 0 else "f"
+        return {_PACKED_KEY: [kind, width, offset, len(values), base, decimals]}
+
+    def _pack_floats(self, values: Sequence[float]) -> Dict[str, Any]:
+        scaled = _decimals(values)
+        if scaled is not None:
+            packed = self._pack_ints(scaled[1], scaled[0])
+            if packed is not None:
+                return packed
+        # Raw IEEE doubles keep NaN, infinities and -0.0 bit for bit
+        offset = len(self.blob)
+        self.blob += _shuffle(_to_bytes(values, "d"), 8)
+        return {_PACKED_KEY: ["f", 8, offset, len(values), None, -1]}
+
+
+class Decoder:
+    """Undo the transforms named by an envelope's flags."""
+
+    def __init__(self, flags: int, blob: memoryview) -> None:
+        self.flags = flags
+        self.blob = blob
+
+    def decode(self, value: Any) -> Any:
+        """Return the original document. Containers of value are updated in place."""
+        kind = type(value)
+        if kind is dict:
+            return self._decode_dict(value)
+        if kind is list:
+            self._decode_list(value)
+        return value
+
+    def _decode_dict(self, value: Dict[str, Any]) -> Any:
+        if len(value) == 1:
+            if _COLUMNS_KEY in value and self.flags & FLAG_COLUMNAR:
+                keys, *columns = value[_COLUMNS_KEY]
+                keys = [key[1:] if key[:1] == _ESCAPE else key for key in keys]
+                # Columns may themselves be packed or stored as columns
+                columns = list(map(self.decode, columns))
+                return list(map(dict, map(zip, itertools.repeat(keys), zip(*columns))))
+            if _PACKED_KEY in value and self.flags & FLAG_PACKED:
+                return self._unpack(*value[_PACKED_KEY])
+        if not _DECODE_CONTAINERS.isdisjoint(set(map(type, value.values()))):
+            for key, item in value.items():
+                kind = type(item)
+                if kind is dict:
+                    value[key] = self._decode_dict(item)
+                elif kind is list:
+                    self._decode_list(item)
+        if _ESCAPE in "".join(value):
+            return {
+                (key[1:] if key[:1] == _ESCAPE else key): item
+                for key, item in value.items()
+            }
+        return value
+
+    def _decode_list(self, value: List[Any]) -> None:
+        if _DECODE_CONTAINERS.isdisjoint(set(map(type, value))):
+            return
+        for index, item in enumerate(value):
+            kind = type(item)
+            if kind is dict:
+                value[index] = self._decode_dict(item)
+            elif kind is list:
+                self._decode_list(item)
+
+    def _unpack(
+        self,
+        kind: str,
+        width: int,
+        offset: int,
+        count: int,
+        base: Optional[int],
+        decimals: int,
+    ) -> List[Any]:
+        raw_floats = kind == "f" and decimals < 0
+        code = "d" if raw_floats else _INT_CODES.get(width)
+        end = offset + width * count
+        if (
+            kind not in ("i", "f")
+            or code is None
+            or (raw_floats and width != 8)
+            or not 0 <= offset <= end <= len(self.blob)
+            or decimals > _MAX_DECIMALS
+        ):
+            raise ValueError("Invalid packed array")
+        values = _from_bytes(_unshuffle(self.blob[offset:end], width), code)
+        if base is not None and values:
+            values[0] = base
+            values = list(itertools.accumulate(values))
+        if kind == "f" and decimals >= 0:
+            values = _unscaled(values, 10**decimals)
+        return values
+
+
+def is_envelope(data: bytes) -> bool:
+    """Return True if decompressed data is a transformed payload."""
+    return data[: len(ENVELOPE_MAGIC)] == ENVELOPE_MAGIC
+
+
+def wrap(json_bytes: bytes, flags: int, blob: bytes = b"") -> bytes:
+    """Prefix the JSON text of a transformed document with the envelope header."""
+    header = ENVELOPE_MAGIC + bytes((flags,))
+    if flags & FLAG_PACKED:
+        return b"".join((header, _JSON_LENGTH.pack(len(json_bytes)), json_bytes, blob))
+    return header + json_bytes
+
+
+def unwrap(data: bytes) -> Tuple[int, memoryview, memoryview]:
+    """
+    Split a transformed payload into its flags, JSON text and binary section.
+
+    Raises:
+        ValueError: If the header is truncated or names unknown transforms
+    """
+    header = len(ENVELOPE_MAGIC) + 1
+    if len(data) < header:
+        raise ValueError("Truncated transform envelope")
+    flags = data[header - 1]
+    if flags & ~_KNOWN_FLAGS:
+        raise ValueError(f"Unknown transform flags: {flags:#04x}")
+    view = memoryview(data)
+    if not flags & FLAG_PACKED:
+        return flags, view[header:], view[:0]
+    start = header + _JSON_LENGTH.size
+    if len(data) < start:
+        raise ValueError("Truncated transform envelope")
+    (length,) = _JSON_LENGTH.unpack_from(data, header)
+    if start + length > len(data):
+        raise ValueError("Truncated transform envelope")
+    return flags, view[start : start + length], view[start + length :]
+
+
+def dumps(
+    obj: Any, serialize: Callable[[Any], bytes], columnar: bool, pack_numbers: bool
+) -> bytes:
+    """Transform obj, serialize it with serialize() and wrap it in an envelope."""
+    encoder = Encoder(columnar, pack_numbers)
+    json_bytes = serialize(encoder.encode(obj))
+    return wrap(json_bytes, encoder.flags, bytes(encoder.blob))
+
+
+def loads(data: bytes, parse: Callable[[memoryview], Any]) -> Any:
+    """
+    Parse a transformed payload with parse() and undo its transforms.
+
+    Raises:
+        ValueError: If parse() fails, or (as "Invalid transformed data") if the
+                    markers or binary section are corrupt
+    """
+    flags, text, blob = unwrap(data)
+    obj = parse(text)
+    try:
+        return Decoder(flags, blob).decode(obj)
+    except (ValueError, TypeError, AttributeError, OverflowError) as e:
+        raise ValueError(f"Invalid transformed data - {e}") from e
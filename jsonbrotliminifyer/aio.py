@@ -0,0 +1,282 @@
+"""
+asyncio front end: the compression functions without blocking the event loop.
+
+Every call is offloaded to one shared executor, a thread pool by default, and
+at most max_concurrency calls per event loop run at once; the others wait on a
+semaphore, so a burst of requests queues up instead of piling work onto the
+pool. The batch functions keep at most max_concurrency files in flight and
+yield each result as soon as its file is done.
+
+Brotli releases the GIL while it compresses, so with the default thread pool
+the event loop keeps running during the bulk of the work. JSON parsing and
+serialization hold the GIL; configure a ProcessPoolExecutor to move them off
+the loop's interpreter as well.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import os
+import threading
+import weakref
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from . import (
+    DEFAULT_LGBLOCK,
+    DEFAULT_LGWIN,
+    DEFAULT_MODE,
+    BatchTask,
+    QualityOption,
+    SerializerOption,
+    _compress_task,
+    _decompress_task,
+    _encoder_options,
+    _plan_batch,
+    _validate_budget,
+    _validate_limits,
+    compress_json,
+    compress_json_file,
+    decompress_json,
+    decompress_json_file,
+)
+
+_Result = TypeVar("_Result")
+
+# (input path, output path, None or the exception raised for that file)
+BatchResult = Tuple[Union[str, Path], Path, Optional[Exception]]
+
+# Calls per event loop that run at once unless configure() sets another limit
+DEFAULT_MAX_CONCURRENCY = os.cpu_count() or 1
+
+_lock = threading.Lock()
+_executor: Optional[concurrent.futures.Executor] = None
+_default_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_max_concurrency = DEFAULT_MAX_CONCURRENCY
+# One semaphore per event loop, since an asyncio.Semaphore belongs to a single loop
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]"
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def configure(
+    executor: Optional[concurrent.futures.Executor] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> None:
+    """
+    Set the executor and concurrency limit shared by the async functions.
+
+    Calls already running are not affected; configure() restores the defaults.
+
+    Args:
+        executor: Executor that runs the work, e.g. a ProcessPoolExecutor; the
+                  caller remains responsible for shutting it down. If None, a
+                  thread pool with max_concurrency threads is created on first use.
+        max_concurrency: Most calls running at once per event loop, default
+                         DEFAULT_MAX_CONCURRENCY. Calls beyond it wait their turn.
+
+    Raises:
+        ValueError: If max_concurrency is not positive
+    """
+    global _executor, _default_executor, _max_concurrency
+    if max_concurrency <= 0:
+        raise ValueError("max_concurrency must be positive")
+    with _lock:
+        _executor = executor
+        _max_concurrency = max_concurrency
+        _semaphores.clear()
+        # The default pool is sized to the limit; make a new one on next use
+        if _default_executor is not None:
+            _default_executor.shutdown(wait=False)
+            _default_executor = None
+
+
+def _get_executor() -> concurrent.futures.Executor:
+    global _default_executor
+    with _lock:
+        if _executor is not None:
+            return _executor
+        if _default_executor is None:
+            _default_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_max_concurrency, thread_name_prefix="jsonbrotliminifyer"
+            )
+        return _default_executor
+
+
+def _get_semaphore(loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+    with _lock:
+        semaphore = _semaphores.get(loop)
+        if semaphore is None:
+            semaphore = _semaphores[loop] = asyncio.Semaphore(_max_concurrency)
+        return semaphore
+
+
+async def _run(func: Callable[..., _Result], *args: Any, **kwargs: Any) -> _Result:
+    """Run func on the shared executor once a concurrency slot is free."""
+    loop = asyncio.get_running_loop()
+    async with _get_semaphore(loop):
+        return await loop.run_in_executor(
+            _get_executor(), functools.partial(func, *args, **kwargs)
+        )
+
+
+async def compress_json_async(
+    json_obj: Any, quality: QualityOption = 11, **kwargs: Any
+) -> bytes:
+    """
+    Compress a JSON object on the shared executor, see compress_json.
+
+    Other keyword arguments are passed to compress_json. The object must not be
+    modified until the call completes.
+    """
+    return await _run(compress_json, json_obj, quality, **kwargs)
+
+
+async def decompress_json_async(
+    compressed_bytes: bytes,
+    serializer: SerializerOption = "auto",
+    max_output_size: Optional[int] = None,
+    max_ratio: Optional[float] = None,
+) -> Any:
+    """Decompress and parse data on the shared executor, see decompress_json."""
+    return await _run(
+        decompress_json, compressed_bytes, serializer, max_output_size, max_ratio
+    )
+
+
+async def compress_json_file_async(
+    input_path: Union[str, Path],
+    output_path: Union[str, Path],
+    quality: QualityOption = 11,
+    **kwargs: Any,
+) -> None:
+    """
+    Compress a file on the shared executor, see compress_json_file.
+
+    Reading and writing the files happen on the executor as well. Other keyword
+    arguments are passed to compress_json_file.
+    """
+    await _run(compress_json_file, input_path, output_path, quality, **kwargs)
+
+
+async def decompress_json_file_async(
+    input_path: Union[str, Path], output_path: Union[str, Path], **kwargs: Any
+) -> None:
+    """
+    Decompress a file on the shared executor, see decompress_json_file.
+
+    Keyword arguments are passed to decompress_json_file.
+    """
+    await _run(decompress_json_file, input_path, output_path, **kwargs)
+
+
+async def _as_completed(
+    task_fn: Callable[[BatchTask], Optional[Exception]], tasks: Iterable[BatchTask]
+) -> AsyncGenerator[BatchResult, None]:
+    """Run batch tasks with at most max_concurrency in flight, yielding as they finish."""
+    running: Dict["asyncio.Future[Optional[Exception]]", BatchTask] = {}
+    pending: Set["asyncio.Future[Optional[Exception]]"] = set()
+    queue = iter(tasks)
+    limit = _max_concurrency
+    try:
+        while True:
+            for task in queue:
+                future = asyncio.ensure_future(_run(task_fn, task))
+                running[future] = task
+                pending.add(future)
+                if len(pending) >= limit:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for finished in done:
+                input_file, output_path, _ = running.pop(finished)
+                yield input_file, Path(output_path), finished.result()
+    finally:
+        for unfinished in pending:
+            unfinished.cancel()
+
+
+async def compress_json_files_async(
+    input_files: Sequence[Union[str, Path]],
+    output_dir: Union[str, Path],
+    quality: QualityOption = 11,
+    serializer: SerializerOption = "auto",
+    mode: int = DEFAULT_MODE,
+    lgwin: int = DEFAULT_LGWIN,
+    lgblock: int = DEFAULT_LGBLOCK,
+    preset: Optional[str] = None,
+    budget_ms_per_mb: Optional[float] = None,
+    columnar: bool = False,
+    pack_numbers: bool = False,
+) -> AsyncGenerator[BatchResult, None]:
+    """
+    Compress files to output_dir, yielding (input, output, error) as each finishes.
+
+    Output names follow compress_json_files. Results come in completion order;
+    error is None on success, else the exception raised for that file. Leaving
+    the loop early cancels the files that have not started.
+
+    Raises:
+        ValueError: If an option is invalid, or input or output paths repeat
+    """
+    _encoder_options(quality, mode, lgwin, lgblock, preset, 0)
+    _validate_budget(quality, budget_ms_per_mb)
+    options = {
+        "quality": quality,
+        "serializer": serializer,
+        "mode": mode,
+        "lgwin": lgwin,
+        "lgblock": lgblock,
+        "preset": preset,
+        "budget_ms_per_mb": budget_ms_per_mb,
+        "columnar": columnar,
+        "pack_numbers": pack_numbers,
+    }
+    plan = await _run(_plan_batch, input_files, output_dir, ".br")
+    tasks: List[BatchTask] = [
+        (input_file, output_path, options) for input_file, output_path in plan
+    ]
+    async for result in _as_completed(_compress_task, tasks):
+        yield result
+
+
+async def decompress_json_files_async(
+    input_files: Sequence[Union[str, Path]],
+    output_dir: Union[str, Path],
+    serializer: SerializerOption = "auto",
+    max_output_size: Optional[int] = None,
+    max_ratio: Optional[float] = None,
+) -> AsyncGenerator[BatchResult, None]:
+    """
+    Decompress files to output_dir, yielding (input, output, error) as each finishes.
+
+    Output names and max_output_size and max_ratio follow decompress_json_files;
+    see compress_json_files_async.
+    """
+    _validate_limits(max_output_size, max_ratio)
+    plan = await _run(_plan_batch, input_files, output_dir, ".json")
+    options = {
+        "serializer": serializer,
+        "max_output_size": max_output_size,
+        "max_ratio": max_ratio,
+    }
+    tasks: List[BatchTask] = [
+        (input_file, output_path, options) for input_file, output_path in plan
+    ]
+    async for result in _as_completed(_decompress_task, tasks):
+        yield result
@@ -0,0 +1,650 @@
+"""
+Solid archives: many JSON documents in a few shared Brotli streams, with an index.
+
+Compressing every small file on its own throws away the redundancy between
+files, which for a few KB of JSON is most of it, and costs a temporary file
+and a rename per output. An archive concatenates the documents into blocks of
+about block_size bytes, compresses each block as one stream so later documents
+are encoded against the window of earlier ones, and ends with an index that
+maps each member name to its block and position. Reading one member decodes
+its block only up to the member's end; block_size=0 gives a fully solid
+archive of one block.
+
+Layout::
+
+    MAGIC (4 bytes) VERSION (1 byte)
+    block 0 ... block N-1          each a complete Brotli stream
+    index                          Brotli-compressed JSON
+    index offset (8 bytes LE) index length (8 bytes LE) MAGIC (4 bytes)
+
+As for containers, the first byte of MAGIC is not a valid start of a Brotli
+stream. The index holds "blocks", a list of [offset, length, size], and
+"members", a list of [name, block, start, size], where start and size locate
+the member's bytes in the decompressed block. Members are stored byte for byte
+as added and never span blocks.
+"""
+
+import collections
+import concurrent.futures
+import contextlib
+import json
+import mmap
+import posixpath
+import struct
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import brotli
+
+from . import (
+    DEFAULT_LGBLOCK,
+    DEFAULT_LGWIN,
+    DEFAULT_MODE,
+    BytesLike,
+    DecompressionLimitError,
+    QualityOption,
+    SerializerOption,
+    _atomic_output,
+    _check_validate,
+    _compress_bytes,
+    _encoder_options,
+    _iter_decompress,
+    _map_input,
+    _open_input,
+    _output_limit,
+    _validate_json_bytes,
+    _validate_limits,
+    _validate_path,
+    get_serializer,
+)
+
+MAGIC = b"\x91JBA"
+VERSION = 1
+
+# Uncompressed bytes per block. Reading one member decodes half a block on
+# average; beyond a few hundred KiB the ratio barely improves.
+DEFAULT_ARCHIVE_BLOCK_SIZE = 512 * 1024
+
+_TRAILER = struct.Struct("<QQ4s")
+_HEADER_SIZE = len(MAGIC) + 1
+
+# Compressed bytes fed to the decoder per step, and the largest decoded block
+_READ_SIZE = 64 * 1024
+
+
+class ArchiveMember(NamedTuple):
+    """Where a member is stored, as listed by ArchiveReader.members."""
+
+    name: str
+    size: int
+    block: int
+    start: int
+
+
+def is_archive(data: Union[bytes, memoryview]) -> bool:
+    """Return True if data starts with the archive magic."""
+    return bytes(data[: len(MAGIC)]) == MAGIC
+
+
+def _check_name(name: str) -> str:
+    """
+    Reject member names that could escape the output directory when unpacked.
+
+    Names are relative POSIX paths such as "2024/05/orders.json".
+    """
+    if not isinstance(name, str) or not name:
+        raise ValueError("Member name must be a non-empty string")
+    parts = name.split("/")
+    if (
+        name.startswith("/")
+        or "\\" in name
+        or "\0" in name
+        or any(part in ("", ".", "..") for part in parts)
+        or ":" in parts[0]
+    ):
+        raise ValueError(f"Invalid member name: {name!r}")
+    return name
+
+
+class ArchiveWriter:
+    """
+    Write JSON documents into a solid archive file.
+
+    The archive is written to a temporary file and moved into place by close(),
+    so a failed or interrupted run never leaves a partial archive behind. Used
+    as a context manager, an exception in the body discards the archive.
+    """
+
+    def __init__(
+        self,
+        output_path: Union[str, Path],
+        block_size: int = DEFAULT_ARCHIVE_BLOCK_SIZE,
+        quality: QualityOption = 11,
+        serializer: SerializerOption = "auto",
+        mode: int = DEFAULT_MODE,
+        lgwin: int = DEFAULT_LGWIN,
+        lgblock: int = DEFAULT_LGBLOCK,
+        preset: Optional[str] = None,
+        validate: str = "none",
+        workers: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            output_path: Path of the archive file
+            block_size: Uncompressed bytes per block, default 512 KiB; 0 puts
+                        every member into a single block
+            quality, mode, lgwin, lgblock, preset: See compress_json. A preset
+                        is resolved per block.
+            serializer: Serializer backend used by add() and validate="parse"
+            validate: Check applied to each member added, one of VALIDATE_LEVELS
+            workers: Compress blocks on this many threads. Default None (one).
+
+        Raises:
+            ValueError: If an option is invalid or the output cannot be written
+        """
+        _validate_path(output_path)
+        if block_size < 0:
+            raise ValueError("block_size must not be negative")
+        if workers is not None and workers <= 0:
+            raise ValueError("workers must be positive")
+        _check_validate(validate)
+        self._options = _encoder_options(quality, mode, lgwin, lgblock, None, 0)
+        if preset is not None:
+            _encoder_options(quality, mode, lgwin, lgblock, preset, 0)
+        self._preset = preset
+        self._backend = get_serializer(serializer)
+        self._validate = validate
+        self._block_size = block_size
+        self._parts: List[bytes] = []
+        self._size = 0
+        self._blocks: List[List[int]] = []
+        # Blocks handed to the pool are only listed in _blocks once written
+        self._block_count = 0
+        self._members: List[List[Any]] = []
+        self._names: Dict[str, None] = {}
+        self._offset = _HEADER_SIZE
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._pending: Deque[Tuple["concurrent.futures.Future[bytes]", int]] = (
+            collections.deque()
+        )
+        if workers is not None and workers > 1:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="jsonbrotliminifyer"
+            )
+        self._workers = workers or 1
+        self._stack = contextlib.ExitStack()
+        try:
+            self._out: IO[bytes] = self._stack.enter_context(
+                _atomic_output(output_path)
+            )
+        except BaseException:
+            self._shutdown()
+            raise
+        self._out.write(MAGIC + bytes([VERSION]))
+        self.closed = False
+
+    def add_bytes(self, name: str, data: BytesLike) -> None:
+        """
+        Add serialized JSON under name, stored byte for byte.
+
+        Raises:
+            ValueError: If the name is invalid or taken, or validation fails
+        """
+        if self.closed:
+            raise ValueError("ArchiveWriter is closed")
+        _check_name(name)
+        if name in self._names:
+            raise ValueError(f"Duplicate member name: {name!r}")
+        try:
+            _validate_json_bytes(data, self._validate, self._backend)
+        except ValueError as e:
+            raise ValueError(f"Member {name!r} is not valid JSON - {e}") from e
+        self._names[name] = None
+        data = bytes(data)
+        self._members.append([name, self._block_count, self._size, len(data)])
+        self._parts.append(data)
+        self._size += len(data)
+        if self._block_size and self._size >= self._block_size:
+            self._flush_block()
+
+    def add(self, name: str, json_obj: Any) -> None:
+        """Serialize a JSON object with the writer's serializer and add it."""
+        self.add_bytes(name, self._backend.dumps(json_obj))
+
+    def add_file(
+        self, input_path: Union[str, Path], name: Optional[str] = None
+    ) -> None:
+        """
+        Add a file's bytes, under name or, by default, the file's base name.
+
+        Raises:
+            ValueError: If the file cannot be read, or as for add_bytes
+        """
+        with _open_input(input_path) as f, _map_input(f, input_path) as data:
+            self.add_bytes(Path(input_path).name if name is None else name, data)
+
+    def _flush_block(self) -> None:
+        if not self._parts:
+            return
+        data = b"".join(self._parts)
+        self._parts = []
+        self._size = 0
+        self._block_count += 1
+        options = self._options
+        if self._preset is not None:
+            options = _encoder_options(
+                options["quality"],
+                options["mode"],
+                options["lgwin"],
+                options["lgblock"],
+                self._preset,
+                len(data),
+            )
+        if self._pool is None:
+            self._write_block(_compress_bytes(data, options, None), len(data))
+            return
+        future = self._pool.submit(_compress_bytes, data, options, None)
+        self._pending.append((future, len(data)))
+        # Keep every worker busy without holding more blocks than that
+        while len(self._pending) > 2 * self._workers:
+            self._write_pending()
+
+    def _write_pending(self) -> None:
+        future, size = self._pending.popleft()
+        self._write_block(future.result(), size)
+
+    def _write_block(self, compressed: bytes, size: int) -> None:
+        self._out.write(compressed)
+        self._blocks.append([self._offset, len(compressed), size])
+        self._offset += len(compressed)
+
+    def _shutdown(self) -> None:
+        if self._pool is not None:
+            for future, _ in self._pending:
+                future.cancel()
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def close(self) -> None:
+        """Write the last block and the index, and move the archive into place."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._flush_block()
+            while self._pending:
+                self._write_pending()
+            index = brotli.compress(
+                json.dumps(
+                    {
+                        "version": VERSION,
+                        "blocks": self._blocks,
+                        "members": self._members,
+                    },
+                    separators=(",", ":"),
+                ).encode("utf-8")
+            )
+            self._out.write(index)
+            self._out.write(_TRAILER.pack(self._offset, len(index), MAGIC))
+        except BaseException as e:
+            self._shutdown()
+            self._stack.__exit__(type(e), e, e.__traceback__)
+            raise
+        self._shutdown()
+        self._stack.close()
+
+    def abort(self) -> None:
+        """Discard the archive; nothing is written to output_path."""
+        if self.closed:
+            return
+        self.closed = True
+        self._shutdown()
+        error = ValueError("ArchiveWriter aborted")
+        with contextlib.suppress(ValueError):
+            self._stack.__exit__(ValueError, error, None)
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ArchiveReader:
+    """
+    Read members of an archive written by ArchiveWriter.
+
+    Files are memory-mapped. Reading one member decodes its block only up to the
+    member's end; iterating over all members decodes each block once. Use as a
+    context manager or call close().
+    """
+
+    def __init__(
+        self,
+        source: Union[str, Path, bytes, bytearray, memoryview],
+        serializer: SerializerOption = "auto",
+        max_output_size: Optional[int] = None,
+        max_ratio: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            source: Path to an archive file, or the archive bytes
+            serializer: Serializer backend used by read(), see compress_json
+            max_output_size, max_ratio: Limits on the bytes decompressed over
+                    the reader's lifetime, index included, see decompress_json.
+                    The ratio is taken against the archive size.
+
+        Raises:
+            ValueError: If the file cannot be read or is not a valid archive
+            DecompressionLimitError: If a read exceeds max_output_size or
+                                     max_ratio
+        """
+        _validate_limits(max_output_size, max_ratio)
+        self._backend = get_serializer(serializer)
+        self._file: Any = None
+        self._map: Optional[mmap.mmap] = None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._data = memoryview(source)
+        else:
+            _validate_path(source)
+            self._file = _open_input(source)
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as e:
+                self._file.close()
+                raise ValueError(f"Invalid archive: {source} - {e}")
+            self._data = memoryview(self._map)
+        self._limit = _output_limit(max_output_size, max_ratio, len(self._data))
+        try:
+            self._load_index()
+        except ValueError:
+            self.close()
+            raise
+
+    def _load_index(self) -> None:
+        data = self._data
+        if len(data) < _HEADER_SIZE + _TRAILER.size or not is_archive(data):
+            raise ValueError("Invalid archive: missing header")
+        if data[len(MAGIC)] != VERSION:
+            raise ValueError(f"Unsupported archive version: {data[len(MAGIC)]}")
+        offset, length, magic = _TRAILER.unpack(data[-_TRAILER.size :])
+        if magic != MAGIC or offset + length > len(data) - _TRAILER.size:
+            raise ValueError("Invalid archive: truncated or corrupt trailer")
+        try:
+            with data[offset : offset + length] as view:
+                index = json.loads(self._inflate(view))
+            self._blocks: List[Tuple[int, int, int]] = [
+                (int(start), int(size), int(total))
+                for start, size, total in index["blocks"]
+            ]
+            self.members: List[ArchiveMember] = [
+                ArchiveMember(str(name), int(size), int(block), int(start))
+                for name, block, start, size in index["members"]
+            ]
+        except DecompressionLimitError:
+            raise
+        except (brotli.error, ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid archive index - {e}") from e
+        self._by_name = {member.name: member for member in self.members}
+        for member in self.members:
+            if not 0 <= member.block < len(self._blocks):
+                raise ValueError(f"Invalid archive index: member {member.name!r}")
+
+    def close(self) -> None:
+        """Release the memory map and the underlying file."""
+        self._data.release()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._by_name
+
+    def names(self) -> List[str]:
+        """Return the member names in the order they were added."""
+        return [member.name for member in self.members]
+
+    def _inflate(self, view: memoryview) -> bytes:
+        """Decompress the index, counting it against the reader's limits."""
+        if self._limit is None:
+            data: bytes = brotli.decompress(view)
+            return data
+        return b"".join(_iter_decompress((view,), _READ_SIZE, self._limit))
+
+    def _decode(self, block: int, end: int) -> Iterator[bytes]:
+        """Decode a block in pieces, stopping once end bytes have come out."""
+        offset, length, _ = self._blocks[block]
+        produced = 0
+        # Slices are taken per step and released at once, so close() can unmap
+        chunks = (
+            bytes(self._data[start : min(start + _READ_SIZE, offset + length)])
+            for start in range(offset, offset + length, _READ_SIZE)
+        )
+        for piece in _iter_decompress(chunks, _READ_SIZE, self._limit):
+            yield piece
+            produced += len(piece)
+            if produced >= end:
+                return
+
+    def read_bytes(self, name: str) -> bytes:
+        """
+        Return a member's bytes, decoding its block up to the member's end.
+
+        Raises:
+            ValueError: If there is no such member or its block is corrupt
+            DecompressionLimitError: If decoding exceeds the reader's limits
+        """
+        member = self._by_name.get(name)
+        if member is None:
+            raise ValueError(f"No such archive member: {name!r}")
+        end = member.start + member.size
+        data = bytearray()
+        position = 0
+        for piece in self._decode(member.block, end):
+            if position + len(piece) > member.start:
+                data += piece[max(member.start - position, 0) : end - position]
+            position += len(piece)
+        if len(data) != member.size:
+            raise ValueError(f"Invalid archive: member {name!r} is truncated")
+        return bytes(data)
+
+    def read(self, name: str) -> Any:
+        """
+        Return a member parsed as JSON.
+
+        Raises:
+            ValueError: If there is no such member or it is not valid JSON
+            DecompressionLimitError: If decoding exceeds the reader's limits
+        """
+        data = self.read_bytes(name)
+        try:
+            return self._backend.loads(data)
+        except ValueError as e:
+            raise ValueError(f"Member {name!r} is not valid JSON - {e}") from e
+
+    def iter_bytes(
+        self, names: Optional[Sequence[str]] = None
+    ) -> Iterator[Tuple[str, bytes]]:
+        """
+        Yield (name, bytes) for every member, or for the given names, in archive order.
+
+        Each block is decoded at most once, and no further than its last wanted
+        member.
+
+        Raises:
+            ValueError: If a name is not in the archive or a block is corrupt
+            DecompressionLimitError: If decoding exceeds the reader's limits
+        """
+        wanted = None
+        if names is not None:
+            wanted = set(names)
+            missing = wanted - self._by_name.keys()
+            if missing:
+                raise ValueError(f"No such archive member: {sorted(missing)[0]!r}")
+        by_block: Dict[int, List[ArchiveMember]] = {}
+        for member in self.members:
+            if wanted is None or member.name in wanted:
+                by_block.setdefault(member.block, []).append(member)
+        for block, members in by_block.items():
+            members.sort(key=lambda member: member.start)
+            end = members[-1].start + members[-1].size
+            if not end:
+                # Only empty members, which a block with no output never reaches
+                for member in members:
+                    yield member.name, b""
+                continue
+            buffer = bytearray()
+            position = 0
+            queue = collections.deque(members)
+            for piece in self._decode(block, end):
+                buffer += piece
+                # Hand out members as soon as they are complete, then drop them
+                while (
+                    queue and position + len(buffer) >= queue[0].start + queue[0].size
+                ):
+                    member = queue.popleft()
+                    first = member.start - position
+                    yield member.name, bytes(buffer[first : first + member.size])
+                    del buffer[: first + member.size]
+                    position += first + member.size
+                if not queue:
+                    break
+                # Nothing before the next member is needed again
+                skip = min(queue[0].start - position, len(buffer))
+                del buffer[:skip]
+                position += skip
+            if queue:
+                raise ValueError(f"Invalid archive: block {block} is truncated")
+
+
+def _output_path(output_dir: Path, name: str) -> Path:
+    """Map a member name to a path under output_dir, refusing any that escape it."""
+    _check_name(name)
+    return output_dir.joinpath(*posixpath.normpath(name).split("/"))
+
+
+def pack_json_files(
+    input_files: Sequence[Union[str, Path]],
+    output_path: Union[str, Path],
+    base_dir: Optional[Union[str, Path]] = None,
+    block_size: int = DEFAULT_ARCHIVE_BLOCK_SIZE,
+    quality: QualityOption = 11,
+    serializer: SerializerOption = "auto",
+    mode: int = DEFAULT_MODE,
+    lgwin: int = DEFAULT_LGWIN,
+    lgblock: int = DEFAULT_LGBLOCK,
+    preset: Optional[str] = None,
+    validate: str = "none",
+    workers: Optional[int] = None,
+) -> List[str]:
+    """
+    Pack JSON files into one archive, see ArchiveWriter.
+
+    Args:
+        input_files: Paths of the files to pack, in archive order
+        output_path: Path of the archive file
+        base_dir: Name members by their path relative to this directory, with
+                  "/" separators. By default members are named by file name.
+        block_size, quality, serializer, mode, lgwin, lgblock, preset, validate,
+        workers: See ArchiveWriter
+
+    Returns:
+        The member names, in archive order
+
+    Raises:
+        ValueError: If a file cannot be read, is outside base_dir, two files map
+                    to the same name, or an option is invalid. No archive is
+                    written then.
+    """
+    names = []
+    for input_file in input_files:
+        if base_dir is None:
+            names.append(Path(input_file).name)
+            continue
+        try:
+            relative = Path(input_file).resolve().relative_to(Path(base_dir).resolve())
+        except ValueError:
+            raise ValueError(f"Input file {input_file} is not inside {base_dir}")
+        names.append(relative.as_posix())
+    with ArchiveWriter(
+        output_path,
+        block_size=block_size,
+        quality=quality,
+        serializer=serializer,
+        mode=mode,
+        lgwin=lgwin,
+        lgblock=lgblock,
+        preset=preset,
+        validate=validate,
+        workers=workers,
+    ) as writer:
+        for input_file, name in zip(input_files, names):
+            writer.add_file(input_file, name)
+    return names
+
+
+def unpack_json_archive(
+    input_path: Union[str, Path],
+    output_dir: Union[str, Path],
+    names: Optional[Sequence[str]] = None,
+    max_output_size: Optional[int] = None,
+    max_ratio: Optional[float] = None,
+) -> List[Path]:
+    """
+    Write the members of an archive, or just the given names, under output_dir.
+
+    Member names become paths relative to output_dir; subdirectories are
+    created as needed. Each file is written atomically. max_output_size and
+    max_ratio limit the bytes decompressed, see ArchiveReader; members written
+    before a limit is exceeded are kept.
+
+    Returns:
+        The paths written, in archive order
+
+    Raises:
+        ValueError: If the archive is invalid, a name is missing, a member
+                    name would leave output_dir, or writing fails
+        DecompressionLimitError: If a limit is exceeded
+    """
+    output_dir_path = Path(output_dir)
+    written = []
+    with ArchiveReader(
+        input_path, max_output_size=max_output_size, max_ratio=max_ratio
+    ) as reader:
+        # Checked up front, so a hostile name cannot leave a half-unpacked tree
+        for name in reader.names() if names is None else names:
+            _output_path(output_dir_path, name)
+        for name, data in reader.iter_bytes(names):
+            path = _output_path(output_dir_path, name)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with _atomic_output(path) as temp_f:
+                temp_f.write(data)
+            written.append(path)
+    return written
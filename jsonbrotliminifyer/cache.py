@@ -0,0 +1,173 @@
+"""
+Content-addressed cache for compressed payloads.
+
+Entries are keyed by a BLAKE2b digest of the serialized JSON and the encoder
+parameters, so a repeated payload costs one hash instead of one Brotli encode.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Mapping, NamedTuple, Optional, Union
+
+# Default limit for the compressed bytes held in memory by a CompressionCache
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+class CacheStats(NamedTuple):
+    """Counters reported by CompressionCache.stats()."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+
+class CompressionCache:
+    """
+    Thread-safe LRU cache of compressed payloads, bounded by total size.
+
+    Pass an instance to compress_json(cache=...). With a directory, every stored
+    entry is also written there and misses in memory are looked up on disk, so
+    the cache survives restarts and can be shared between processes. The
+    directory is not size-bounded; clear() empties it.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        directory: Optional[Union[str, Path]] = None,
+    ) -> None:
+        """
+        Args:
+            max_bytes: Upper bound for the compressed bytes kept in memory; least
+                       recently used entries are evicted beyond it
+            directory: Optional directory for the on-disk tier, created if missing
+
+        Raises:
+            ValueError: If max_bytes is negative or the directory cannot be created
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory is not None else None
+        if self.directory is not None:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                raise ValueError(f"Cannot create cache directory: {directory} - {e}")
+        self._entries: "OrderedDict[bytes, bytes]" = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(data: Union[bytes, memoryview], options: Mapping[str, Any]) -> bytes:
+        """Return the cache key for serialized JSON and its encoder options."""
+        digest = hashlib.blake2b(data, digest_size=20)
+        digest.update(repr(sorted(options.items())).encode("utf-8"))
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """Return the cached payload for key, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return value
+        value = self._read(key)
+        with self._lock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._store(key, value)
+        return value
+
+    def put(self, key: bytes, value: bytes) -> None:
+        """Store a payload, evicting least recently used entries as needed."""
+        with self._lock:
+            self._store(key, value)
+        self._write(key, value)
+
+    def stats(self) -> CacheStats:
+        """Return hit, miss and eviction counters and the in-memory footprint."""
+        with self._lock:
+            return CacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                len(self._entries),
+                self._size,
+            )
+
+    def clear(self) -> None:
+        """Drop every entry, including the on-disk tier, and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = self._hits = self._misses = self._evictions = 0
+        if self.directory is not None:
+            for path in self.directory.glob("*.br"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _store(self, key: bytes, value: bytes) -> None:
+        # Caller holds the lock
+        if len(value) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = value
+        self._size += len(value)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+            self._evictions += 1
+
+    def _path(self, key: bytes) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key.hex()}.br"
+
+    def _read(self, key: bytes) -> Optional[bytes]:
+        if self.directory is None:
+            return None
+        try:
+            return self._path(key).read_bytes()
+        except OSError:
+            return None
+
+    def _write(self, key: bytes, value: bytes) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key)
+        if path.exists():
+            return
+        # The disk tier is best effort: a failed write only costs a later miss
+        temp_path = None
+        try:
+            temp_fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(temp_fd, "wb") as f:
+                f.write(value)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logging.warning(f"Failed to write cache entry {path}: {e}")
+            if temp_path is not None and os.path.exists(temp_path):
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
@@ -0,0 +1,495 @@
+"""
+Seekable container of independently compressed JSON blocks.
+
+A plain .br file is one Brotli stream, so reading any part of it means decoding
+everything before that part. A container splits the document into blocks of
+about block_size bytes of JSON, compresses each on its own and ends with an
+index, so a reader can map the file and decode only the blocks it needs.
+
+Layout::
+
+    MAGIC (4 bytes) VERSION (1 byte)
+    block 0 ... block N-1          each a complete Brotli stream
+    index                          Brotli-compressed JSON
+    index offset (8 bytes LE) index length (8 bytes LE) MAGIC (4 bytes)
+
+The first byte of MAGIC is not a valid start of a Brotli stream, so a
+container can never be mistaken for a plain .br file.
+
+Each index entry has a kind and the JSON Pointer it applies to:
+
+- "list" / "object": a container at the pointer was split; its contents are
+  given by the entries that follow, in document order
+- "items": a JSON array holding elements start .. start + count - 1 of the
+  split array at the pointer
+- "members": a JSON object holding some members (listed in "keys") of the
+  split object at the pointer
+- "value": the whole document, when it fits into a single block
+
+Array elements and object members larger than block_size are split in turn and
+get a pointer of their own.
+"""
+
+import json
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import brotli
+
+from . import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_LGBLOCK,
+    DEFAULT_LGWIN,
+    DEFAULT_MODE,
+    DecompressionLimitError,
+    QualityOption,
+    SerializerOption,
+    _atomic_output,
+    _compress_bytes,
+    _encoder_options,
+    _iter_decompress,
+    _open_input,
+    _output_limit,
+    _validate_limits,
+    _validate_path,
+    get_serializer,
+)
+from ._pointer import (
+    escape_token,
+    format_pointer,
+    parse_index,
+    parse_pointer,
+    resolve_pointer,
+)
+
+MAGIC = b"\x11JBC"
+VERSION = 1
+
+# Target amount of JSON text per block; smaller blocks make random access cheaper
+# at some cost in ratio
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+_TRAILER = struct.Struct("<QQ4s")
+_HEADER_SIZE = len(MAGIC) + 1
+
+
+def is_container(data: Union[bytes, memoryview]) -> bool:
+    """Return True if data starts with the container magic."""
+    return bytes(data[: len(MAGIC)]) == MAGIC
+
+
+class _Writer:
+    """Serialize, split and compress a document into container blocks."""
+
+    def __init__(
+        self,
+        out: Any,
+        backend: Any,
+        block_size: int,
+        options: Dict[str, Any],
+        preset: Optional[str],
+    ) -> None:
+        self.out = out
+        self.backend = backend
+        self.block_size = block_size
+        self.options = options
+        self.preset = preset
+        self.offset = _HEADER_SIZE
+        self.entries: List[Dict[str, Any]] = []
+
+    def _block(self, kind: str, pointer: str, data: bytes, **extra: Any) -> None:
+        options = self.options
+        if self.preset is not None:
+            options = _encoder_options(
+                options["quality"],
+                options["mode"],
+                options["lgwin"],
+                options["lgblock"],
+                self.preset,
+                len(data),
+            )
+        compressed = _compress_bytes(data, options, None)
+        self.out.write(compressed)
+        self.entries.append(
+            {
+                "kind": kind,
+                "pointer": pointer,
+                "offset": self.offset,
+                "length": len(compressed),
+                **extra,
+            }
+        )
+        self.offset += len(compressed)
+
+    def _splittable(self, value: Any, encoded: bytes) -> bool:
+        return (
+            len(encoded) > self.block_size
+            and type(value) in (list, dict)
+            and len(value) > 0
+        )
+
+    def write(self, value: Any) -> None:
+        encoded = self.backend.dumps(value)
+        if self._splittable(value, encoded):
+            self._split(value, "")
+        else:
+            self._block("value", "", encoded)
+
+    def _split(self, value: Any, pointer: str) -> None:
+        if type(value) is list:
+            self._split_list(value, pointer)
+        else:
+            self._split_dict(value, pointer)
+
+    def _split_list(self, value: List[Any], pointer: str) -> None:
+        self.entries.append({"kind": "list", "pointer": pointer})
+        parts: List[bytes] = []
+        size = start = 0
+
+        def flush() -> None:
+            if parts:
+                data = b"[" + b",".join(parts) + b"]"
+                self._block("items", pointer, data, start=start, count=len(parts))
+                parts.clear()
+
+        for index, item in enumerate(value):
+            part = self.backend.dumps(item)
+            if self._splittable(item, part):
+                flush()
+                size = 0
+                self._split(item, f"{pointer}/{index}")
+                continue
+            if parts and size + len(part) > self.block_size:
+                flush()
+                size = 0
+            if not parts:
+                start = index
+            parts.append(part)
+            size += len(part) + 1
+        flush()
+
+    def _split_dict(self, value: Dict[Any, Any], pointer: str) -> None:
+        self.entries.append({"kind": "object", "pointer": pointer})
+        parts: List[bytes] = []
+        keys: List[str] = []
+        size = 0
+
+        def flush() -> None:
+            if parts:
+                data = b"{" + b",".join(parts) + b"}"
+                self._block("members", pointer, data, keys=list(keys))
+                parts.clear()
+                keys.clear()
+
+        for key, item in value.items():
+            part = self.backend.dumps({key: item})[1:-1]
+            if type(key) is not str:
+                # The serializer decides how non-string keys are spelled
+                key = next(iter(json.loads(b"{" + part.split(b":", 1)[0] + b":0}")))
+            if self._splittable(item, part):
+                flush()
+                size = 0
+                self._split(item, f"{pointer}/{escape_token(key)}")
+                continue
+            if parts and size + len(part) > self.block_size:
+                flush()
+                size = 0
+            parts.append(part)
+            keys.append(key)
+            size += len(part) + 1
+        flush()
+
+
+def compress_json_container(
+    json_obj: Any,
+    output_path: Union[str, Path],
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    quality: QualityOption = 11,
+    serializer: SerializerOption = "auto",
+    mode: int = DEFAULT_MODE,
+    lgwin: int = DEFAULT_LGWIN,
+    lgblock: int = DEFAULT_LGBLOCK,
+    preset: Optional[str] = None,
+) -> None:
+    """
+    Write a JSON object as a seekable container of independently compressed blocks.
+
+    Args:
+        json_obj: A JSON-serializable Python object
+        output_path: Path to the output container file (str or Path)
+        block_size: Target size in bytes of the JSON text in each block, default
+                    1 MiB. Arrays and objects larger than this are split between
+                    blocks; a single scalar larger than it gets a block of its own.
+        quality, serializer, mode, lgwin, lgblock, preset: See compress_json. A
+                    preset is resolved per block. quality="auto" uses the default
+                    budget.
+
+    Raises:
+        ValueError: If an argument is invalid or writing to the output file fails
+    """
+    _validate_path(output_path)
+    if block_size <= 0:
+        raise ValueError("block_size must be positive")
+    options = _encoder_options(quality, mode, lgwin, lgblock, None, 0)
+    if preset is not None:
+        _encoder_options(quality, mode, lgwin, lgblock, preset, 0)
+    backend = get_serializer(serializer)
+    with _atomic_output(output_path) as temp_f:
+        temp_f.write(MAGIC + bytes([VERSION]))
+        writer = _Writer(temp_f, backend, block_size, options, preset)
+        writer.write(json_obj)
+        index = brotli.compress(
+            json.dumps(
+                {"version": VERSION, "blocks": writer.entries}, separators=(",", ":")
+            ).encode("utf-8")
+        )
+        temp_f.write(index)
+        temp_f.write(_TRAILER.pack(writer.offset, len(index), MAGIC))
+
+
+class ContainerReader:
+    """
+    Random access to a container written by compress_json_container.
+
+    Files are memory-mapped and each method decodes only the blocks that hold the
+    requested part of the document. Use as a context manager or call close().
+    """
+
+    def __init__(
+        self,
+        source: Union[str, Path, bytes, bytearray, memoryview],
+        serializer: SerializerOption = "auto",
+        max_output_size: Optional[int] = None,
+        max_ratio: Optional[float] = None,
+    ) -> None:
+        """
+        Args:
+            source: Path to a container file, or the container bytes
+            serializer: Serializer backend used to parse blocks, see compress_json
+            max_output_size, max_ratio: Limits on the bytes decompressed over
+                    the reader's lifetime, index included, see decompress_json.
+                    The ratio is taken against the container size.
+
+        Raises:
+            ValueError: If the file cannot be read or is not a valid container
+            DecompressionLimitError: If a read exceeds max_output_size or
+                                     max_ratio
+        """
+        _validate_limits(max_output_size, max_ratio)
+        self._backend = get_serializer(serializer)
+        self._file: Any = None
+        self._map: Optional[mmap.mmap] = None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._data = memoryview(source)
+        else:
+            _validate_path(source)
+            self._file = _open_input(source)
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError) as e:
+                self._file.close()
+                raise ValueError(f"Invalid container: {source} - {e}")
+            self._data = memoryview(self._map)
+        self._limit = _output_limit(max_output_size, max_ratio, len(self._data))
+        try:
+            self._load_index()
+        except ValueError:
+            self.close()
+            raise
+
+    def _load_index(self) -> None:
+        data = self._data
+        if len(data) < _HEADER_SIZE + _TRAILER.size or not is_container(data):
+            raise ValueError("Invalid container: missing header")
+        if data[len(MAGIC)] != VERSION:
+            raise ValueError(f"Unsupported container version: {data[len(MAGIC)]}")
+        offset, length, magic = _TRAILER.unpack(data[-_TRAILER.size :])
+        if magic != MAGIC or offset + length > len(data) - _TRAILER.size:
+            raise ValueError("Invalid container: truncated or corrupt trailer")
+        try:
+            with data[offset : offset + length] as view:
+                index = json.loads(self._inflate(view))
+            self.blocks: List[Dict[str, Any]] = index["blocks"]
+            self._splits = {
+                entry["pointer"]: entry["kind"]
+                for entry in self.blocks
+                if entry["kind"] in ("list", "object")
+            }
+        except DecompressionLimitError:
+            raise
+        except (brotli.error, ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid container index - {e}") from e
+
+    def close(self) -> None:
+        """Release the memory map and the underlying file."""
+        self._data.release()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "ContainerReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _inflate(self, view: memoryview) -> bytes:
+        """Decompress one block, counting it against the reader's limits."""
+        if self._limit is None:
+            data: bytes = brotli.decompress(view)
+            return data
+        return b"".join(_iter_decompress((view,), DEFAULT_CHUNK_SIZE, self._limit))
+
+    def _decode(self, entry: Dict[str, Any]) -> Any:
+        start = entry["offset"]
+        try:
+            # Release the slice at once so close() can unmap the file
+            with self._data[start : start + entry["length"]] as view:
+                data = self._inflate(view)
+        except brotli.error as e:
+            raise ValueError("Invalid Brotli-compressed data in container") from e
+        try:
+            return self._backend.loads(data)
+        except ValueError as e:
+            raise ValueError("Decompressed data is not valid JSON") from e
+
+    def _subtree(self, pointer: str) -> Iterator[Dict[str, Any]]:
+        prefix = pointer + "/"
+        for entry in self.blocks:
+            if entry["pointer"] == pointer or entry["pointer"].startswith(prefix):
+                yield entry
+
+    def _assemble(self, pointer: str) -> Any:
+        """Rebuild the split container at pointer from all blocks below it."""
+        nodes: Dict[str, Any] = {}
+        for entry in self._subtree(pointer):
+            kind, at = entry["kind"], entry["pointer"]
+            if kind == "value":
+                return self._decode(entry)
+            if kind in ("list", "object"):
+                node: Any = [] if kind == "list" else {}
+                if at != pointer:
+                    parent_pointer, token = at.rsplit("/", 1)
+                    parent = nodes[parent_pointer]
+                    if type(parent) is list:
+                        parent.append(node)
+                    else:
+                        parent[parse_pointer("/" + token)[0]] = node
+                nodes[at] = node
+            elif kind == "items":
+                nodes[at].extend(self._decode(entry))
+            else:
+                nodes[at].update(self._decode(entry))
+        return nodes[pointer]
+
+    def _locate(self, pointer: str) -> Tuple[str, List[str]]:
+        """Return the deepest split container at or above pointer and the rest."""
+        tokens = parse_pointer(pointer)
+        for depth in range(len(tokens), -1, -1):
+            prefix = format_pointer(tokens[:depth])
+            if prefix in self._splits:
+                return prefix, tokens[depth:]
+        return "", tokens
+
+    def get(self, pointer: str = "") -> Any:
+        """
+        Return the value at a JSON Pointer (RFC 6901), "" for the whole document.
+
+        Raises:
+            ValueError: If the pointer is malformed or does not exist
+        """
+        base, rest = self._locate(pointer)
+        if base not in self._splits:
+            return resolve_pointer(self._decode(self.blocks[0]), rest)
+        if not rest:
+            return self._assemble(base)
+        token, rest = rest[0], rest[1:]
+        index = parse_index(token) if self._splits[base] == "list" else -1
+        for entry in self.blocks:
+            if entry["pointer"] != base:
+                continue
+            if entry["kind"] == "items":
+                if entry["start"] <= index < entry["start"] + entry["count"]:
+                    item = self._decode(entry)[index - entry["start"]]
+                    return resolve_pointer(item, rest)
+            elif entry["kind"] == "members" and token in entry["keys"]:
+                return resolve_pointer(self._decode(entry)[token], rest)
+        raise ValueError(f"JSON Pointer not found: {pointer!r}")
+
+    def read(self) -> Any:
+        """Decode the whole document."""
+        return self.get("")
+
+    def read_records(
+        self, start: int = 0, stop: Optional[int] = None, pointer: str = ""
+    ) -> List[Any]:
+        """
+        Return elements start .. stop - 1 of the array at pointer.
+
+        Only the blocks that overlap the range are decoded.
+
+        Raises:
+            ValueError: If the range is invalid or pointer is not an array
+        """
+        if start < 0 or (stop is not None and stop < start):
+            raise ValueError("start and stop must be non-negative with start <= stop")
+        if self._splits.get(pointer) != "list":
+            value = self.get(pointer)
+            if type(value) is not list:
+                raise ValueError(f"Not an array: {pointer!r}")
+            return value[start:stop]
+        records: List[Any] = []
+        prefix = pointer + "/"
+        for entry in self.blocks:
+            at = entry["pointer"]
+            if at == pointer and entry["kind"] == "items":
+                first = entry["start"]
+                last = first + entry["count"]
+                if last > start and (stop is None or first < stop):
+                    items = self._decode(entry)
+                    records.extend(
+                        items[
+                            max(start - first, 0) : None
+                            if stop is None
+                            else stop - first
+                        ]
+                    )
+            elif (
+                entry["kind"] in ("list", "object")
+                and at.startswith(prefix)
+                and "/" not in at[len(prefix) :]
+            ):
+                index = int(at[len(prefix) :])
+                if index >= start and (stop is None or index < stop):
+                    records.append(self._assemble(at))
+        return records
+
+
+def decompress_json_container(
+    input_path: Union[str, Path],
+    serializer: SerializerOption = "auto",
+    max_output_size: Optional[int] = None,
+    max_ratio: Optional[float] = None,
+) -> Any:
+    """
+    Decode a whole container file back to a JSON object.
+
+    max_output_size and max_ratio limit the bytes decompressed, see
+    ContainerReader.
+
+    Raises:
+        ValueError: If the file cannot be read or is not a valid container
+        DecompressionLimitError: If a limit is exceeded
+    """
+    with ContainerReader(
+        input_path,
+        serializer=serializer,
+        max_output_size=max_output_size,
+        max_ratio=max_ratio,
+    ) as reader:
+        return reader.read()
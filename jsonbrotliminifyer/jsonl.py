@@ -0,0 +1,233 @@
+"""
+Streaming compression of JSON Lines: one record per line, one shared Brotli stream.
+
+Compressing each record on its own throws away the redundancy between records
+and pays the encoder setup cost every time. JsonlWriter feeds all records to a
+single brotli.Compressor instead, so later records are encoded against the
+window of earlier ones, and emits a flush point every flush_bytes of JSON so
+that everything written so far can be decoded even while the stream is still
+open. JsonlReader decodes such a stream, or any Brotli-compressed JSON Lines
+file, and yields the records one at a time.
+
+Both hold at most one chunk of input, one decompressed block and one record in
+memory, however long the stream runs.
+"""
+
+from pathlib import Path
+from typing import IO, Any, BinaryIO, Callable, Iterable, Iterator, Optional, Union
+
+import brotli
+
+from . import (
+    DEFAULT_LGBLOCK,
+    DEFAULT_LGWIN,
+    DEFAULT_MODE,
+    SerializerOption,
+    _encoder_options,
+    _iter_decompress,
+    _open_input,
+    _validate_chunk_size,
+    _validate_path,
+    get_serializer,
+)
+
+# Uncompressed JSON written between two flush points. Each flush ends a Brotli
+# meta-block; at this spacing the cost is well under 1% of the output.
+DEFAULT_FLUSH_BYTES = 1024 * 1024
+
+# Bytes requested per read from the source of a JsonlReader, and the largest
+# decompressed block it handles at once
+_READ_SIZE = 64 * 1024
+
+
+class JsonlWriter:
+    """
+    Compress records to a binary file or stream as Brotli-compressed JSON Lines.
+
+    Args:
+        target: Output path (str or Path), or a binary file-like object with a
+                write() method such as a socket file. A path is opened for
+                writing and closed by close(); a file object is left open.
+        quality: Compression quality level (0-11), default 11
+        serializer: Serializer backend used to write each record, see
+                    compress_json
+        mode, lgwin, lgblock: Brotli encoder tuning, see compress_json
+        flush_bytes: Uncompressed bytes between automatic flush points, or None
+                     to flush only when flush() is called
+
+    Raises:
+        ValueError: If an option is invalid or the output cannot be opened
+    """
+
+    def __init__(
+        self,
+        target: Union[str, Path, IO[bytes]],
+        quality: int = 11,
+        serializer: SerializerOption = "auto",
+        mode: int = DEFAULT_MODE,
+        lgwin: int = DEFAULT_LGWIN,
+        lgblock: int = DEFAULT_LGBLOCK,
+        flush_bytes: Optional[int] = DEFAULT_FLUSH_BYTES,
+    ) -> None:
+        if not isinstance(quality, int):
+            raise ValueError("JsonlWriter needs an integer quality (0-11)")
+        options = _encoder_options(quality, mode, lgwin, lgblock, None, 0)
+        if flush_bytes is not None and flush_bytes <= 0:
+            raise ValueError("flush_bytes must be positive")
+        self._backend = get_serializer(serializer)
+        self._flush_bytes = flush_bytes
+        self._pending = 0
+        self._compressor = brotli.Compressor(**options)
+        self._owned: Optional[BinaryIO] = None
+        if isinstance(target, (str, Path)):
+            _validate_path(target)
+            try:
+                self._owned = open(target, "wb")
+            except PermissionError:
+                raise ValueError(f"Permission denied writing to output file: {target}")
+            except OSError as e:
+                raise ValueError(f"Error writing to output file: {target} - {e}")
+            self._out: IO[bytes] = self._owned
+        else:
+            self._out = target
+        self.records = 0
+        self.closed = False
+
+    def write(self, record: Any) -> None:
+        """Append one record as a line of compact JSON."""
+        if self.closed:
+            raise ValueError("JsonlWriter is closed")
+        line = self._backend.dumps(record) + b"\n"
+        self._emit(self._compressor.process(line))
+        self.records += 1
+        self._pending += len(line)
+        if self._flush_bytes is not None and self._pending >= self._flush_bytes:
+            self.flush()
+
+    def write_many(self, records: Iterable[Any]) -> int:
+        """Append every record from an iterable and return how many were written."""
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+    def flush(self) -> None:
+        """
+        Emit a flush point, so every record written so far can be decoded.
+
+        The output file object is flushed as well if it has a flush() method.
+        """
+        if self.closed:
+            raise ValueError("JsonlWriter is closed")
+        self._emit(self._compressor.flush())
+        self._pending = 0
+        flush = getattr(self._out, "flush", None)
+        if flush is not None:
+            flush()
+
+    def close(self) -> None:
+        """Finish the Brotli stream, and close the output if it was opened by path."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._emit(self._compressor.finish())
+        finally:
+            if self._owned is not None:
+                self._owned.close()
+
+    def _emit(self, data: bytes) -> None:
+        if data:
+            self._out.write(data)
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class JsonlReader:
+    """
+    Iterate over the records of Brotli-compressed JSON Lines.
+
+    Args:
+        source: Input path (str or Path), a binary file-like object with a
+                read(n) method, or a socket-like object with recv(n). A path is
+                opened for reading and closed by close(); other sources are left
+                open. Empty lines are skipped.
+        serializer: Serializer backend used to parse each record, see
+                    compress_json
+        chunk_size: Bytes requested from the source per read, default 64 KiB
+
+    Raises:
+        ValueError: If the source cannot be opened, or while iterating, if the
+                    data is not valid Brotli-compressed JSON Lines. Records
+                    before the point of failure are yielded first, so a stream
+                    cut off after a flush point gives up every flushed record.
+    """
+
+    def __init__(
+        self,
+        source: Union[str, Path, IO[bytes], Any],
+        serializer: SerializerOption = "auto",
+        chunk_size: int = _READ_SIZE,
+    ) -> None:
+        _validate_chunk_size(chunk_size)
+        self._backend = get_serializer(serializer)
+        self._chunk_size = chunk_size
+        self._owned: Optional[BinaryIO] = None
+        if isinstance(source, (str, Path)):
+            _validate_path(source)
+            self._owned = _open_input(source)
+            self._read: Callable[[int], bytes] = self._owned.read
+        elif hasattr(source, "read"):
+            self._read = source.read
+        elif hasattr(source, "recv"):
+            self._read = source.recv
+        else:
+            raise ValueError("source must be a path or have a read() or recv() method")
+        self.records = 0
+
+    def __iter__(self) -> Iterator[Any]:
+        line_number = 0
+        tail = b""
+        for block in _iter_decompress(self._chunks(), _READ_SIZE):
+            lines = (tail + block).split(b"\n")
+            tail = lines.pop()
+            for line in lines:
+                line_number += 1
+                if line.strip():
+                    yield self._parse(line, line_number)
+        if tail.strip():
+            yield self._parse(tail, line_number + 1)
+
+    def _chunks(self) -> Iterator[bytes]:
+        while True:
+            try:
+                chunk = self._read(self._chunk_size)
+            except OSError as e:
+                raise ValueError(f"Error reading JSON Lines stream - {e}")
+            if not chunk:
+                return
+            yield chunk
+
+    def _parse(self, line: bytes, line_number: int) -> Any:
+        try:
+            record = self._backend.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON on line {line_number} - {e}") from e
+        self.records += 1
+        return record
+
+    def close(self) -> None:
+        """Close the input if it was opened by path."""
+        if self._owned is not None:
+            self._owned.close()
+
+    def __enter__(self) -> "JsonlReader":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
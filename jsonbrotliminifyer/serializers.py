@@ -0,0 +1,258 @@
+"""
+JSON serializer backends used by the compression functions.
+
+Every backend writes compact JSON (no whitespace between tokens) as UTF-8 bytes.
+The stdlib backend is always available; orjson, ujson and rapidjson are used when
+installed. Third-party backends fall back to the stdlib for values they cannot
+represent exactly, such as integers beyond 64 bits or NaN, so a payload written by one
+backend always decodes to the same Python object with any other.
+"""
+
+import importlib
+import itertools
+import json
+import math
+from types import ModuleType
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+
+# Order in which serializer="auto" picks an installed backend
+_AUTO_ORDER = ("orjson", "ujson", "rapidjson")
+
+# Integers with 20 or more digits may not fit in 64 bits; third-party decoders
+# would turn them into floats or reject them, so such payloads are decoded with the
+# stdlib. Mapping every digit to "0" lets a plain substring search find them much
+# faster than a regular expression would.
+_DIGITS_TO_ZERO = bytes(48 if 48 <= i <= 57 else 32 for i in range(256))
+_LONG_NUMBER = b"0" * 20
+
+# Leaf types that cannot hold a non-finite float
+_FINITE_TYPES = frozenset((str, int, bool, type(None)))
+
+
+class Serializer:
+    """
+    Standard library serializer with compact separators.
+
+    Subclasses override _dumps/_loads with a faster backend; the public methods
+    handle the fallback to the standard library.
+    """
+
+    name = "json"
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        """
+        Serialize obj to UTF-8 JSON bytes.
+
+        Args:
+            obj: A JSON-serializable Python object
+            pretty: Indent with two spaces instead of writing compact JSON
+
+        Raises:
+            TypeError: If obj is not JSON-serializable
+        """
+        if pretty:
+            return json.dumps(obj, indent=2).encode("utf-8")
+        try:
+            return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode(
+                "utf-8"
+            )
+        except UnicodeEncodeError:
+            # Lone surrogates cannot be encoded as UTF-8; escape them instead
+            return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        """
+        Parse UTF-8 JSON bytes (or str) into a Python object.
+
+        Raises:
+            ValueError: If data is not valid UTF-8 JSON
+        """
+        if not isinstance(data, str):
+            data = bytes(data).decode("utf-8")
+        return json.loads(data)
+
+
+def _of_types(values: List[Any], types: FrozenSet[type]) -> Iterator[Any]:
+    return itertools.compress(values, map(types.__contains__, map(type, values)))
+
+
+def _has_non_finite(obj: Any) -> bool:
+    """
+    Return True if obj holds a NaN or infinite float at any depth.
+
+    The document is walked one nesting level at a time. Every pass over the
+    values of a level runs in C, so the cost does not include a Python call
+    per container.
+    """
+    level = [obj]
+    while level:
+        types = set(map(type, level))
+        if types <= _FINITE_TYPES:
+            return False
+        floats = frozenset(kind for kind in types if issubclass(kind, float))
+        if floats and not all(map(math.isfinite, _of_types(level, floats))):
+            return True
+        dicts = frozenset(kind for kind in types if issubclass(kind, dict))
+        sequences = frozenset(kind for kind in types if issubclass(kind, (list, tuple)))
+        children: List[Any] = []
+        if dicts:
+            children += itertools.chain.from_iterable(
+                map(dict.values, _of_types(level, dicts))
+            )
+        if sequences:
+            children += itertools.chain.from_iterable(_of_types(level, sequences))
+        level = children
+    return False
+
+
+class _BackendSerializer(Serializer):
+    """Base class for serializers that wrap a third-party JSON module."""
+
+    module: ModuleType
+
+    def __init__(self) -> None:
+        self.module = importlib.import_module(self.name)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Modules cannot be pickled; re-import the backend in the receiving process
+        return (self.__class__, ())
+
+    def dumps(self, obj: Any, pretty: bool = False) -> bytes:
+        if not pretty:
+            try:
+                return self._dumps(obj)
+            except (TypeError, ValueError, OverflowError):
+                pass
+        return super().dumps(obj, pretty)
+
+    def loads(self, data: Union[bytes, bytearray, memoryview, str]) -> Any:
+        raw = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+        if _LONG_NUMBER not in raw.translate(_DIGITS_TO_ZERO):
+            try:
+                return self._loads(raw)
+            except (ValueError, OverflowError):
+                pass
+        # Let the stdlib decide; it also raises the canonical error message
+        return super().loads(raw)
+
+    def _dumps(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    def _loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class OrjsonSerializer(_BackendSerializer):
+    """
+    orjson backend.
+
+    orjson writes NaN and Infinity as null, and serializes datetimes,
+    dataclasses and subclasses of the JSON types the stdlib either keeps
+    exactly or rejects. Documents holding non-finite floats are therefore
+    written by the stdlib instead, and those types are handed back to it, so
+    values round-trip and unsupported types raise TypeError as with the stdlib
+    backend. Only output that contains null is searched for such floats.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        super().__init__()
+        module = self.module
+        self._options = (
+            module.OPT_NON_STR_KEYS
+            | module.OPT_PASSTHROUGH_DATACLASS
+            | module.OPT_PASSTHROUGH_DATETIME
+            | module.OPT_PASSTHROUGH_SUBCLASS
+        )
+
+    def _dumps(self, obj: Any) -> bytes:
+        # Without a default function, passed-through types raise TypeError
+        data = bytes(self.module.dumps(obj, option=self._options))
+        if b"null" in data and _has_non_finite(obj):
+            raise ValueError("orjson writes non-finite floats as null")
+        return data
+
+    def _loads(self, data: bytes) -> Any:
+        return self.module.loads(data)
+
+
+class UjsonSerializer(_BackendSerializer):
+    """ujson backend."""
+
+    name = "ujson"
+
+    def _dumps(self, obj: Any) -> bytes:
+        text = self.module.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+        return str(text).encode("utf-8")
+
+    def _loads(self, data: bytes) -> Any:
+        return self.module.loads(data)
+
+
+class RapidjsonSerializer(_BackendSerializer):
+    """python-rapidjson backend."""
+
+    name = "rapidjson"
+
+    def _dumps(self, obj: Any) -> bytes:
+        return str(self.module.dumps(obj, ensure_ascii=False)).encode("utf-8")
+
+    def _loads(self, data: bytes) -> Any:
+        return self.module.loads(data.decode("utf-8"))
+
+
+_BACKENDS = {
+    "json": Serializer,
+    "orjson": OrjsonSerializer,
+    "ujson": UjsonSerializer,
+    "rapidjson": RapidjsonSerializer,
+}
+_instances: Dict[str, Serializer] = {}
+
+
+def _load(name: str) -> Optional[Serializer]:
+    """Return a cached serializer instance, or None if its module is missing."""
+    serializer = _instances.get(name)
+    if serializer is None:
+        try:
+            serializer = _BACKENDS[name]()
+        except ImportError:
+            return None
+        _instances[name] = serializer
+    return serializer
+
+
+def available_serializers() -> List[str]:
+    """Return the names of the serializer backends that can be used here."""
+    return [name for name in _BACKENDS if _load(name) is not None]
+
+
+def get_serializer(serializer: Union[str, Serializer] = "auto") -> Serializer:
+    """
+    Resolve a serializer name to a Serializer instance.
+
+    Args:
+        serializer: "auto" (fastest installed backend), "json", "orjson", "ujson",
+                    "rapidjson", or a Serializer instance which is returned as-is
+
+    Raises:
+        ValueError: If the name is unknown or the backend is not installed
+    """
+    if isinstance(serializer, Serializer):
+        return serializer
+    if serializer == "auto":
+        for name in _AUTO_ORDER:
+            backend = _load(name)
+            if backend is not None:
+                return backend
+        return _load("json")  # type: ignore[return-value]
+    if serializer not in _BACKENDS:
+        raise ValueError(
+            f"Unknown serializer: {serializer!r}; expected one of "
+            f"{', '.join(['auto', *_BACKENDS])}"
+        )
+    backend = _load(serializer)
+    if backend is None:
+        raise ValueError(f"Serializer {serializer!r} is not installed")
+    return backend
@@ -0,0 +1,255 @@
+"""
+Sessions: one long-lived worker pool and one set of defaults for many calls.
+
+compress_json_files and decompress_json_files start and shut down a pool on
+every call. For a few small files that startup is most of the work, a process
+pool in particular, which has to spawn and import this package in each worker.
+A BrotliJsonSession creates its pool once and hands it to every batch it runs,
+and applies its default options to each call; keyword arguments given to a
+method override the defaults for that call only.
+
+Single-object and single-file methods run in the calling thread, which waits
+for the result anyway; only the batch methods use the pool. A session may be
+shared between threads.
+"""
+
+import concurrent.futures
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from . import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_LGBLOCK,
+    DEFAULT_LGWIN,
+    DEFAULT_MODE,
+    BytesLike,
+    FileResult,
+    QualityOption,
+    SerializerOption,
+    StageStats,
+    _encoder_options,
+    _validate_budget,
+    _validate_chunk_size,
+    _validate_limits,
+    _validate_memory_limit,
+    compress_json,
+    compress_json_bytes,
+    compress_json_file,
+    compress_json_files,
+    decompress_json,
+    decompress_json_file,
+    decompress_json_files,
+    get_serializer,
+    iter_compress_json_files,
+    iter_decompress_json_files,
+)
+
+# Session defaults passed to each function, by the parameters it accepts
+_ENCODER_KEYS = (
+    "quality",
+    "serializer",
+    "mode",
+    "lgwin",
+    "lgblock",
+    "preset",
+    "budget_ms_per_mb",
+    "stats",
+)
+_FILE_KEYS = _ENCODER_KEYS + ("chunk_size",)
+_BATCH_KEYS = _ENCODER_KEYS + ("max_workers", "memory_limit")
+_DECODER_KEYS: Tuple[str, ...] = ("serializer", "max_output_size", "max_ratio", "stats")
+_DECODER_FILE_KEYS = _DECODER_KEYS + ("chunk_size",)
+_DECODER_BATCH_KEYS = _DECODER_KEYS + ("max_workers",)
+
+
+class BrotliJsonSession:
+    """
+    Keep a worker pool and default options for repeated compression calls.
+
+    Args:
+        executor: "thread" (default) or "process", the kind of pool the batch
+                  methods run on; see compress_json_files
+        max_workers: Workers in the pool. If None, the pool's own default.
+        quality, serializer, mode, lgwin, lgblock, preset, budget_ms_per_mb:
+                  Defaults for every call, see compress_json
+        chunk_size: Default block size of the streaming file paths
+        memory_limit: Default memory budget of the compression batches, see
+                      compress_json_files
+        max_output_size, max_ratio: Default limits on the decompressed size,
+                      see decompress_json
+        stats: A StageStats every call adds its stages to, see compress_json
+
+    Raises:
+        ValueError: If an option is invalid
+
+    Use the session as a context manager, or call close() when done with it.
+    Methods raise ValueError once the session is closed.
+    """
+
+    def __init__(
+        self,
+        executor: str = "thread",
+        max_workers: Optional[int] = None,
+        quality: QualityOption = 11,
+        serializer: SerializerOption = "auto",
+        mode: int = DEFAULT_MODE,
+        lgwin: int = DEFAULT_LGWIN,
+        lgblock: int = DEFAULT_LGBLOCK,
+        preset: Optional[str] = None,
+        budget_ms_per_mb: Optional[float] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        memory_limit: Optional[int] = None,
+        max_output_size: Optional[int] = None,
+        max_ratio: Optional[float] = None,
+        stats: Optional[StageStats] = None,
+    ) -> None:
+        if executor not in ("thread", "process"):
+            raise ValueError('executor must be "thread" or "process"')
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        _encoder_options(quality, mode, lgwin, lgblock, preset, 0)
+        _validate_budget(quality, budget_ms_per_mb)
+        _validate_chunk_size(chunk_size)
+        _validate_memory_limit(memory_limit)
+        _validate_limits(max_output_size, max_ratio)
+        get_serializer(serializer)
+        self.defaults: Dict[str, Any] = {
+            "quality": quality,
+            "serializer": serializer,
+            "mode": mode,
+            "lgwin": lgwin,
+            "lgblock": lgblock,
+            "preset": preset,
+            "budget_ms_per_mb": budget_ms_per_mb,
+            "chunk_size": chunk_size,
+            "max_workers": max_workers,
+            "memory_limit": memory_limit,
+            "max_output_size": max_output_size,
+            "max_ratio": max_ratio,
+            "stats": stats,
+        }
+        self._pool: concurrent.futures.Executor
+        if executor == "process":
+            self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="jsonbrotliminifyer"
+            )
+        self.closed = False
+
+    def _options(
+        self, keys: Tuple[str, ...], overrides: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Merge the session defaults a function accepts with per-call overrides."""
+        if self.closed:
+            raise ValueError("BrotliJsonSession is closed")
+        options = {key: self.defaults[key] for key in keys}
+        if (
+            overrides.get("quality", "auto") != "auto"
+            and "budget_ms_per_mb" not in overrides
+        ):
+            # The session budget only applies to its quality="auto"
+            options.pop("budget_ms_per_mb", None)
+        options.update(overrides)
+        return options
+
+    def compress_json(self, json_obj: Any, **kwargs: Any) -> bytes:
+        """Compress a JSON object with the session defaults, see compress_json."""
+        return compress_json(json_obj, **self._options(_ENCODER_KEYS, kwargs))
+
+    def compress_json_bytes(self, data: BytesLike, **kwargs: Any) -> bytes:
+        """Compress serialized JSON with the session defaults, see compress_json_bytes."""
+        return compress_json_bytes(data, **self._options(_ENCODER_KEYS, kwargs))
+
+    def decompress_json(self, compressed_bytes: bytes, **kwargs: Any) -> Any:
+        """Decompress and parse data with the session serializer, see decompress_json."""
+        return decompress_json(compressed_bytes, **self._options(_DECODER_KEYS, kwargs))
+
+    def compress_json_file(
+        self, input_path: Union[str, Path], output_path: Union[str, Path], **kwargs: Any
+    ) -> None:
+        """Compress a file with the session defaults, see compress_json_file."""
+        options = self._options(_FILE_KEYS, kwargs)
+        compress_json_file(input_path, output_path, **options)
+
+    def decompress_json_file(
+        self, input_path: Union[str, Path], output_path: Union[str, Path], **kwargs: Any
+    ) -> None:
+        """Decompress a file with the session defaults, see decompress_json_file."""
+        options = self._options(_DECODER_FILE_KEYS, kwargs)
+        decompress_json_file(input_path, output_path, **options)
+
+    def compress_json_files(
+        self,
+        input_files: Sequence[Union[str, Path]],
+        output_dir: Union[str, Path],
+        **kwargs: Any,
+    ) -> List[Optional[Exception]]:
+        """
+        Compress files on the session pool, see compress_json_files.
+
+        max_workers only sizes the deadline budget here; the pool is fixed.
+        """
+        options = self._options(_BATCH_KEYS, kwargs)
+        return compress_json_files(
+            input_files, output_dir, executor=self._pool, **options
+        )
+
+    def decompress_json_files(
+        self,
+        input_files: Sequence[Union[str, Path]],
+        output_dir: Union[str, Path],
+        **kwargs: Any,
+    ) -> List[Optional[Exception]]:
+        """Decompress files on the session pool, see decompress_json_files."""
+        options = self._options(_DECODER_BATCH_KEYS, kwargs)
+        return decompress_json_files(
+            input_files, output_dir, executor=self._pool, **options
+        )
+
+    def iter_compress_json_files(
+        self,
+        input_files: Iterable[Union[str, Path]],
+        output_dir: Union[str, Path],
+        **kwargs: Any,
+    ) -> Generator[FileResult, None, None]:
+        """Compress files on the session pool as they come, see iter_compress_json_files."""
+        options = self._options(_BATCH_KEYS, kwargs)
+        return iter_compress_json_files(
+            input_files, output_dir, executor=self._pool, **options
+        )
+
+    def iter_decompress_json_files(
+        self,
+        input_files: Iterable[Union[str, Path]],
+        output_dir: Union[str, Path],
+        **kwargs: Any,
+    ) -> Generator[FileResult, None, None]:
+        """Decompress files on the session pool as they come, see iter_decompress_json_files."""
+        options = self._options(_DECODER_BATCH_KEYS, kwargs)
+        return iter_decompress_json_files(
+            input_files, output_dir, executor=self._pool, **options
+        )
+
+    def close(self) -> None:
+        """Shut the pool down once running batches finish. Calling it again is a no-op."""
+        if self.closed:
+            return
+        self.closed = True
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "BrotliJsonSession":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,277 @@
+"""
+Opt-in instrumentation: time and bytes spent in each stage of a compression call.
+
+Pass a StageStats as stats= to the compression and decompression functions, the
+file functions, the batch functions or a BrotliJsonSession. Each stage a call
+goes through is recorded as (stage, seconds, bytes in, bytes out) and added to
+the running totals; hooks registered with add_hook() see every record as it
+happens, e.g. to feed a metrics client. Without stats= the functions take no
+timings at all, so leaving it off costs one None check per stage.
+
+Batch functions also record each batch's wall time and how long every worker
+was busy, from which summary() derives throughput and worker utilization, and
+with memory_limit the peak memory estimated for each file.
+Records from process pool workers are sent back with the results and replayed
+in the calling process, so hooks always run there.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Stages recorded by this package, in the order compression goes through them.
+# With streaming=True and raw decompression, reading and writing overlap with
+# the codec and are counted in the "compress" or "decompress" stage.
+STAGES = (
+    "read",
+    "validate",
+    "parse",
+    "serialize",
+    "compress",
+    "decompress",
+    "write",
+    "replace",
+)
+
+# hook(stage, seconds, bytes_in, bytes_out)
+StageHook = Callable[[str, float, int, int], None]
+
+# One recorded stage: (stage, seconds, bytes in, bytes out)
+StageRecord = Tuple[str, float, int, int]
+
+
+class StageTotals(NamedTuple):
+    """Running totals for one stage, reported by StageStats.stages()."""
+
+    calls: int
+    seconds: float
+    bytes_in: int
+    bytes_out: int
+
+
+class StageStats:
+    """
+    Thread-safe totals of the time and bytes spent per stage, plus batch figures.
+
+    One instance can be shared by any number of calls and threads. Hooks run in
+    the thread that records the stage, outside the internal lock; an exception
+    raised by a hook propagates into the call being measured.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hooks: List[StageHook] = []
+        self._totals: Dict[str, List[Any]] = {}
+        self._busy: Dict[str, float] = {}
+        self._estimates: Dict[str, int] = {}
+        self.files = 0
+        self.batches = 0
+        self.wall_seconds = 0.0
+
+    def add_hook(self, hook: StageHook) -> None:
+        """Call hook(stage, seconds, bytes_in, bytes_out) for every stage recorded."""
+        with self._lock:
+            # Replaced rather than changed, as record() iterates it unlocked
+            self._hooks = self._hooks + [hook]
+
+    def remove_hook(self, hook: StageHook) -> None:
+        """Stop calling a hook added with add_hook()."""
+        with self._lock:
+            hooks = list(self._hooks)
+            hooks.remove(hook)
+            self._hooks = hooks
+
+    def record(
+        self, stage: str, seconds: float, bytes_in: int = 0, bytes_out: int = 0
+    ) -> None:
+        """Add one stage to the totals and pass it to the hooks."""
+        with self._lock:
+            totals = self._totals.get(stage)
+            if totals is None:
+                totals = self._totals[stage] = [0, 0.0, 0, 0]
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] += bytes_in
+            totals[3] += bytes_out
+            hooks = self._hooks
+        for hook in hooks:
+            hook(stage, seconds, bytes_in, bytes_out)
+
+    def lap(
+        self, stage: str, start: float, bytes_in: int = 0, bytes_out: int = 0
+    ) -> float:
+        """Record a stage that began at time.perf_counter() == start; return now."""
+        now = time.perf_counter()
+        self.record(stage, now - start, bytes_in, bytes_out)
+        return now
+
+    def record_batch(
+        self, wall_seconds: float, busy: Dict[str, float], files: int
+    ) -> None:
+        """Add a finished batch: its wall time, busy seconds per worker and file count."""
+        with self._lock:
+            self.batches += 1
+            self.files += files
+            self.wall_seconds += wall_seconds
+            for worker, seconds in busy.items():
+                self._busy[worker] = self._busy.get(worker, 0.0) + seconds
+
+    def record_estimate(self, path: str, estimate: int) -> None:
+        """Add the peak memory a batch estimated for one input file, in bytes."""
+        with self._lock:
+            self._estimates[path] = estimate
+
+    def memory_estimates(self) -> Dict[str, int]:
+        """
+        Return the estimated peak memory per input path, in bytes.
+
+        Compression batches record an estimate for every file when memory_limit
+        is set. A file compressed again keeps its latest estimate.
+        """
+        with self._lock:
+            return dict(self._estimates)
+
+    def stages(self) -> Dict[str, StageTotals]:
+        """Return the totals per stage, in the order each stage was first recorded."""
+        with self._lock:
+            return {name: StageTotals(*values) for name, values in self._totals.items()}
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Derive overall figures from the totals.
+
+        Returns a dict with:
+            seconds: Time summed over all stages
+            input_bytes: Bytes read from input files
+            ratio: Uncompressed over compressed bytes of the compress stage, or
+                   of the decompress stage when nothing was compressed; None
+                   when neither ran
+            mib_per_s: Input MiB per second of batch wall time, or per second
+                       of stage time when no batch ran; None without input
+            utilization: Share of the batch wall time each worker was busy
+        """
+        stages = self.stages()
+        with self._lock:
+            busy = dict(self._busy)
+            wall = self.wall_seconds
+        seconds = sum(totals.seconds for totals in stages.values())
+        read = stages.get("read")
+        input_bytes = read.bytes_in if read is not None else 0
+        ratio = None
+        if "compress" in stages and stages["compress"].bytes_out:
+            ratio = stages["compress"].bytes_in / stages["compress"].bytes_out
+        elif "decompress" in stages and stages["decompress"].bytes_in:
+            ratio = stages["decompress"].bytes_out / stages["decompress"].bytes_in
+        elapsed = wall or seconds
+        mib_per_s = None
+        if input_bytes and elapsed:
+            mib_per_s = input_bytes / (1024 * 1024) / elapsed
+        utilization = {worker: busy[worker] / wall for worker in busy} if wall else {}
+        return {
+            "seconds": seconds,
+            "input_bytes": input_bytes,
+            "ratio": ratio,
+            "mib_per_s": mib_per_s,
+            "utilization": utilization,
+        }
+
+    def format(self) -> str:
+        """Render the totals and summary as a plain-text table."""
+        stages = self.stages()
+        summary = self.summary()
+        total = summary["seconds"] or 1.0
+        lines = [
+            f"{'stage':<11}{'calls':>7}{'seconds':>10}{'share':>8}"
+            f"{'MiB in':>10}{'MiB out':>10}{'MiB/s':>9}"
+        ]
+        for name, totals in stages.items():
+            moved = max(totals.bytes_in, totals.bytes_out) / (1024 * 1024)
+            rate = (
+                f"{moved / totals.seconds:9.1f}"
+                if totals.seconds and moved
+                else " " * 9
+            )
+            lines.append(
+                f"{name:<11}{totals.calls:>7}{totals.seconds:>10.3f}"
+                f"{totals.seconds / total:>8.1%}"
+                f"{totals.bytes_in / (1024 * 1024):>10.2f}"
+                f"{totals.bytes_out / (1024 * 1024):>10.2f}{rate}"
+            )
+        lines.append(f"{'total':<11}{'':>7}{summary['seconds']:>10.3f}")
+        if summary["ratio"] is not None:
+            lines.append(f"ratio {summary['ratio']:.2f}")
+        if self.batches:
+            rate = summary["mib_per_s"]
+            lines.append(
+                f"{self.files} files in {self.batches} batches, "
+                f"{self.wall_seconds:.3f} s wall"
+                + (f", {rate:.1f} MiB/s" if rate is not None else "")
+            )
+            for worker, share in sorted(summary["utilization"].items()):
+                lines.append(f"  worker {worker}: {share:.0%} busy")
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """Clear all totals; hooks stay registered."""
+        with self._lock:
+            self._totals.clear()
+            self._busy.clear()
+            self._estimates.clear()
+            self.files = 0
+            self.batches = 0
+            self.wall_seconds = 0.0
+
+
+class _StageLog(StageStats):
+    """Keep the records of one batch task, to be replayed where the batch started."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: List[StageRecord] = []
+
+    def record(
+        self, stage: str, seconds: float, bytes_in: int = 0, bytes_out: int = 0
+    ) -> None:
+        self.records.append((stage, seconds, bytes_in, bytes_out))
+
+
+class _StageClock:
+    """
+    Sum stages that repeat for every chunk of a stream, to record each once.
+
+    Recording every chunk would call the hooks thousands of times per stream.
+    """
+
+    def __init__(self) -> None:
+        self._totals: Dict[str, List[float]] = {}
+
+    def lap(
+        self, stage: str, start: float, bytes_in: int = 0, bytes_out: int = 0
+    ) -> float:
+        """Add the time since start and the bytes to stage; return now."""
+        now = time.perf_counter()
+        totals = self._totals.get(stage)
+        if totals is None:
+            totals = self._totals[stage] = [0.0, 0, 0]
+        totals[0] += now - start
+        totals[1] += bytes_in
+        totals[2] += bytes_out
+        return now
+
+    def flush(self, stats: Optional[StageStats]) -> None:
+        """Record the sums in stats, one record per stage."""
+        if stats is not None:
+            for stage, (seconds, bytes_in, bytes_out) in self._totals.items():
+                stats.record(stage, seconds, int(bytes_in), int(bytes_out))
+        self._totals.clear()
+
+
+def _worker_name() -> str:
+    """Name the current worker uniquely across the threads and processes of a pool."""
+    return f"{os.getpid()}/{threading.current_thread().name}"
+
+
+def _replay(stats: StageStats, records: Iterable[StageRecord]) -> None:
+    for record in records:
+        stats.record(*record)
@@ -0,0 +1,122 @@
+import asyncio
+import concurrent.futures
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from typing import List
+
+import jsonbrotliminifyer
+from jsonbrotliminifyer import aio
+
+
+class TestAsync(unittest.TestCase):
+    def tearDown(self) -> None:
+        aio.configure()
+
+    def test_roundtrip(self) -> None:
+        data = {"records": [{"id": i, "name": f"item{i}"} for i in range(1000)]}
+
+        async def run() -> None:
+            compressed = await jsonbrotliminifyer.compress_json_async(data, quality=5)
+            self.assertEqual(jsonbrotliminifyer.decompress_json(compressed), data)
+            self.assertEqual(
+                await jsonbrotliminifyer.decompress_json_async(compressed), data
+            )
+            with self.assertRaises(ValueError):
+                await jsonbrotliminifyer.decompress_json_async(b"invalid")
+            with self.assertRaises(jsonbrotliminifyer.DecompressionLimitError):
+                await jsonbrotliminifyer.decompress_json_async(compressed, max_ratio=2)
+
+        asyncio.run(run())
+
+    def test_concurrency_is_bounded(self) -> None:
+        aio.configure(max_concurrency=2)
+        lock = threading.Lock()
+        active: List[int] = [0, 0]
+
+        def work(i: int) -> int:
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+            return i
+
+        async def run() -> List[int]:
+            return await asyncio.gather(*(aio._run(work, i) for i in range(10)))
+
+        self.assertEqual(asyncio.run(run()), list(range(10)))
+        self.assertEqual(active[1], 2)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+            aio.configure(executor=pool, max_concurrency=4)
+            compressed = asyncio.run(jsonbrotliminifyer.compress_json_async([1, 2]))
+            self.assertEqual(jsonbrotliminifyer.decompress_json(compressed), [1, 2])
+        with self.assertRaises(ValueError):
+            aio.configure(max_concurrency=0)
+
+    def test_files(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = []
+            for i in range(5):
+                path = os.path.join(temp_dir, f"input{i}.json")
+                with open(path, "w") as f:
+                    json.dump({"file": i, "values": list(range(100))}, f)
+                input_files.append(path)
+            missing = os.path.join(temp_dir, "missing.json")
+            compressed_dir = os.path.join(temp_dir, "compressed")
+            output_dir = os.path.join(temp_dir, "output")
+
+            async def run() -> None:
+                single = os.path.join(temp_dir, "single.br")
+                await jsonbrotliminifyer.compress_json_file_async(
+                    input_files[0], single, quality=5
+                )
+                restored = os.path.join(temp_dir, "single.json")
+                await jsonbrotliminifyer.decompress_json_file_async(single, restored)
+                with open(restored) as f:
+                    self.assertEqual(json.load(f)["file"], 0)
+
+                results = {}
+                batch = jsonbrotliminifyer.compress_json_files_async(
+                    input_files + [missing], compressed_dir, quality=5
+                )
+                async for input_file, output_path, error in batch:
+                    results[input_file] = (output_path, error)
+                self.assertEqual(set(results), set(input_files + [missing]))
+                self.assertIsInstance(results[missing][1], ValueError)
+                compressed = [results[path][0] for path in input_files]
+                for path in input_files:
+                    self.assertIsNone(results[path][1])
+
+                restored_files = []
+                batch = jsonbrotliminifyer.decompress_json_files_async(
+                    compressed, output_dir
+                )
+                async for _, output_path, error in batch:
+                    self.assertIsNone(error)
+                    restored_files.append(output_path)
+                self.assertEqual(len(restored_files), 5)
+                for output_path in restored_files:
+                    with open(output_path) as f:
+                        self.assertEqual(json.load(f)["values"], list(range(100)))
+
+                with self.assertRaises(ValueError):
+                    async for _ in jsonbrotliminifyer.compress_json_files_async(
+                        input_files, compressed_dir, quality=12
+                    ):
+                        pass
+
+            asyncio.run(run())
+
+    def test_lazy_import(self) -> None:
+        self.assertIs(jsonbrotliminifyer.compress_json_async, aio.compress_json_async)
+        self.assertFalse(hasattr(jsonbrotliminifyer, "missing_name"))
+
+
+if __name__ == "__main__":
+    unittest.main()
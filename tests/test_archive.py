@@ -0,0 +1,247 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import jsonbrotliminifyer
+from jsonbrotliminifyer import ArchiveReader, ArchiveWriter
+
+
+def _documents(count: int) -> dict:
+    return {
+        f"part{i % 3}/doc{i}.json": {
+            "id": i,
+            "tags": ["a", "b"],
+            "values": list(range(i)),
+        }
+        for i in range(count)
+    }
+
+
+class TestArchive(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        documents = _documents(40)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive = os.path.join(temp_dir, "data.jba")
+            for block_size in (0, 256, jsonbrotliminifyer.DEFAULT_ARCHIVE_BLOCK_SIZE):
+                for workers in (None, 3):
+                    with ArchiveWriter(
+                        archive, block_size=block_size, quality=5, workers=workers
+                    ) as writer:
+                        for name, document in documents.items():
+                            writer.add(name, document)
+                    with ArchiveReader(archive) as reader:
+                        self.assertEqual(reader.names(), list(documents))
+                        self.assertEqual(len(reader), 40)
+                        self.assertIn("part1/doc7.json", reader)
+                        for name in ("part0/doc0.json", "part1/doc37.json"):
+                            self.assertEqual(reader.read(name), documents[name])
+                        self.assertEqual(
+                            {
+                                name: json.loads(data)
+                                for name, data in reader.iter_bytes()
+                            },
+                            documents,
+                        )
+                        selected = ["part2/doc38.json", "part0/doc3.json"]
+                        self.assertEqual(
+                            [name for name, _ in reader.iter_bytes(selected)],
+                            ["part0/doc3.json", "part2/doc38.json"],
+                        )
+                        blocks = {member.block for member in reader.members}
+                        self.assertEqual(len(blocks) == 1, block_size != 256)
+
+            # Members are stored byte for byte
+            with ArchiveWriter(archive) as writer:
+                writer.add_bytes("a.json", b'{ "a" : 1 }\n')
+            with open(archive, "rb") as f:
+                with ArchiveReader(f.read()) as reader:
+                    self.assertEqual(reader.read_bytes("a.json"), b'{ "a" : 1 }\n')
+
+    def test_empty_members(self) -> None:
+        members = {"a": b"[1]", "b": b"", "c": b"", "d": b"{}"}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive = os.path.join(temp_dir, "data.jba")
+            for block_size in (0, 1):
+                with ArchiveWriter(archive, block_size=block_size) as writer:
+                    writer.add_bytes("empty", b"")
+                    for name, data in members.items():
+                        writer.add_bytes(name, data)
+                with ArchiveReader(archive) as reader:
+                    self.assertEqual(
+                        dict(reader.iter_bytes()), {"empty": b"", **members}
+                    )
+                    self.assertEqual(list(reader.iter_bytes(["c"])), [("c", b"")])
+                    self.assertEqual(reader.read_bytes("b"), b"")
+                output_dir = os.path.join(temp_dir, f"out{block_size}")
+                jsonbrotliminifyer.unpack_json_archive(archive, output_dir)
+                with open(os.path.join(output_dir, "c"), "rb") as f:
+                    self.assertEqual(f.read(), b"")
+
+    def test_ratio(self) -> None:
+        documents = _documents(200)
+        separate = sum(
+            len(jsonbrotliminifyer.compress_json(document, 11))
+            for document in documents.values()
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive = os.path.join(temp_dir, "data.jba")
+            with ArchiveWriter(archive) as writer:
+                for name, document in documents.items():
+                    writer.add(name, document)
+            self.assertLess(os.path.getsize(archive), separate / 2)
+
+    def test_limits(self) -> None:
+        big = b"[" + b"0," * (2 << 20) + b"0]"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive = os.path.join(temp_dir, "data.jba")
+            with ArchiveWriter(archive, quality=5) as writer:
+                writer.add("small.json", {"a": 1})
+                writer.add_bytes("big.json", big)
+            with ArchiveReader(archive, max_output_size=1 << 20) as reader:
+                self.assertEqual(reader.read("small.json"), {"a": 1})
+                with self.assertRaises(jsonbrotliminifyer.DecompressionLimitError):
+                    reader.read("big.json")
+            with ArchiveReader(archive, max_ratio=10) as reader:
+                with self.assertRaises(jsonbrotliminifyer.DecompressionLimitError):
+                    dict(reader.iter_bytes())
+            with ArchiveReader(archive, max_output_size=8 << 20) as reader:
+                self.assertEqual(reader.read_bytes("big.json"), big)
+            # The index counts too
+            with self.assertRaises(jsonbrotliminifyer.DecompressionLimitError):
+                ArchiveReader(archive, max_output_size=1)
+
+            output_dir = os.path.join(temp_dir, "out")
+            with self.assertRaises(jsonbrotliminifyer.DecompressionLimitError):
+                jsonbrotliminifyer.unpack_json_archive(
+                    archive, output_dir, max_output_size=1 << 20
+                )
+            self.assertEqual(os.listdir(output_dir), ["small.json"])
+            for options in ({"max_output_size": 0}, {"max_ratio": -1.0}):
+                with self.assertRaises(ValueError):
+                    ArchiveReader(archive, **options)
+
+    def test_invalid(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            archive = os.path.join(temp_dir, "data.jba")
+            with ArchiveWriter(archive, validate="parse") as writer:
+                for name in ("", "/abs.json", "a/../b.json", "a//b.json", "C:x.json"):
+                    with self.assertRaises(ValueError):
+                        writer.add_bytes(name, b"{}")
+                writer.add_bytes("a.json", b"{}")
+                with self.assertRaises(ValueError):
+                    writer.add_bytes("a.json", b"{}")
+                with self.assertRaises(ValueError):
+                    writer.add_bytes("b.json", b"{")
+            with ArchiveReader(archive) as reader:
+                self.assertEqual(reader.names(), ["a.json"])
+                with self.assertRaises(ValueError):
+                    reader.read_bytes("b.json")
+                with self.assertRaises(ValueError):
+                    list(reader.iter_bytes(["b.json"]))
+
+            # An exception while writing leaves no archive behind
+            broken = os.path.join(temp_dir, "broken.jba")
+            with self.assertRaises(RuntimeError):
+                with ArchiveWriter(broken) as writer:
+                    writer.add("a.json", {})
+                    raise RuntimeError
+            self.assertEqual(sorted(os.listdir(temp_dir)), ["data.jba"])
+
+            with open(archive, "rb") as f:
+                data = f.read()
+            for corrupt in (b"", data[:-1], jsonbrotliminifyer.compress_json({})):
+                with self.assertRaises(ValueError):
+                    ArchiveReader(corrupt)
+            with self.assertRaises(ValueError):
+                ArchiveWriter(os.path.join(temp_dir, "x.jba"), block_size=-1)
+
+    def test_pack_unpack(self) -> None:
+        documents = _documents(12)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, "source")
+            paths = []
+            for name, document in documents.items():
+                path = os.path.join(source, *name.split("/"))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as f:
+                    json.dump(document, f)
+                paths.append(path)
+            archive = os.path.join(temp_dir, "data.jba")
+            names = jsonbrotliminifyer.pack_json_files(paths, archive, base_dir=source)
+            self.assertEqual(names, list(documents))
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.pack_json_files(paths + paths[:1], archive)
+
+            output_dir = os.path.join(temp_dir, "restored")
+            written = jsonbrotliminifyer.unpack_json_archive(
+                archive, output_dir, ["part1/doc4.json"]
+            )
+            self.assertEqual(
+                [str(path) for path in written],
+                [os.path.join(output_dir, "part1", "doc4.json")],
+            )
+            written = jsonbrotliminifyer.unpack_json_archive(archive, output_dir)
+            self.assertEqual(len(written), 12)
+            for written_path, name in zip(written, documents):
+                with open(written_path) as f:
+                    self.assertEqual(json.load(f), documents[name])
+
+    def test_cli(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, "source")
+            os.makedirs(os.path.join(source, "nested"))
+            for name in ("a.json", os.path.join("nested", "b.json"), "skip.txt"):
+                with open(os.path.join(source, name), "w") as f:
+                    json.dump({"name": name}, f)
+            archive = os.path.join(temp_dir, "data.jba")
+            command = [sys.executable, "-m", "jsonbrotliminifyer"]
+            result = subprocess.run(
+                command + ["pack", "-o", archive, source, "--block-size", "0"],
+                capture_output=True,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+
+            result = subprocess.run(
+                command + ["unpack", "-i", archive, "--list"], capture_output=True
+            )
+            self.assertEqual(result.returncode, 0)
+            self.assertEqual(
+                [line.split()[-1] for line in result.stdout.decode().splitlines()],
+                ["a.json", "nested/b.json"],
+            )
+
+            output_dir = os.path.join(temp_dir, "out")
+            result = subprocess.run(
+                command + ["unpack", "-i", archive, "-o", output_dir, "nested/b.json"],
+                capture_output=True,
+            )
+            self.assertEqual(result.returncode, 0)
+            self.assertEqual(os.listdir(output_dir), ["nested"])
+
+            result = subprocess.run(
+                command + ["unpack", "-i", archive, "-o", output_dir, "missing.json"],
+                capture_output=True,
+            )
+            self.assertEqual(result.returncode, 1)
+            self.assertIn(b"missing.json", result.stderr)
+
+            limited = command + ["unpack", "-i", archive, "-o", output_dir]
+            for options in (["--max-output-size", "1"], ["--max-ratio", "0.001"]):
+                result = subprocess.run(limited + options, capture_output=True)
+                self.assertEqual(result.returncode, 1)
+                self.assertIn(b"exceeds max_", result.stderr)
+            result = subprocess.run(
+                limited + ["--max-output-size", "1K"], capture_output=True
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            result = subprocess.run(
+                limited + ["--max-output-size", "lots"], capture_output=True
+            )
+            self.assertEqual(result.returncode, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
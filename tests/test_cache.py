@@ -0,0 +1,107 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import jsonbrotliminifyer
+from jsonbrotliminifyer import CompressionCache
+
+
+class TestCompressionCache(unittest.TestCase):
+    def test_hits_and_misses(self) -> None:
+        cache = CompressionCache()
+        data = {"catalog": [{"sku": i, "name": f"item{i}"} for i in range(100)]}
+        first = jsonbrotliminifyer.compress_json(data, cache=cache)
+        with patch("brotli.compress") as compress:
+            second = jsonbrotliminifyer.compress_json(data, cache=cache)
+            compress.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertEqual(jsonbrotliminifyer.decompress_json(second), data)
+        stats = cache.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 1, 1))
+        self.assertEqual(stats.size, len(first))
+
+    def test_parameters_are_part_of_the_key(self) -> None:
+        cache = CompressionCache()
+        data = {"config": list(range(200))}
+        jsonbrotliminifyer.compress_json(data, quality=5, cache=cache)
+        jsonbrotliminifyer.compress_json(data, quality=6, cache=cache)
+        jsonbrotliminifyer.compress_json(data, quality=5, lgwin=16, cache=cache)
+        compressed = jsonbrotliminifyer.compress_json(
+            data, quality=5, pack_numbers=True, cache=cache
+        )
+        self.assertEqual(cache.stats().misses, 4)
+        self.assertEqual(jsonbrotliminifyer.decompress_json(compressed), data)
+
+    def test_lru_eviction(self) -> None:
+        cache = CompressionCache(max_bytes=30)
+        for key in (b"a", b"b", b"c"):
+            cache.put(key, b"x" * 10)
+        cache.get(b"a")
+        cache.put(b"d", b"x" * 10)
+        self.assertIsNone(cache.get(b"b"))
+        self.assertIsNotNone(cache.get(b"a"))
+        stats = cache.stats()
+        self.assertEqual((stats.evictions, stats.entries, stats.size), (1, 3, 30))
+        # Entries larger than the cache are not kept
+        cache.put(b"e", b"x" * 31)
+        self.assertIsNone(cache.get(b"e"))
+
+    def test_disk_tier(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            directory = os.path.join(temp_dir, "cache")
+            data = {"shared": "payload" * 100}
+            compressed = jsonbrotliminifyer.compress_json(
+                data, cache=CompressionCache(directory=directory)
+            )
+            self.assertEqual(len(os.listdir(directory)), 1)
+
+            # A new instance (another process, or after a restart) finds it on disk
+            cache = CompressionCache(directory=directory)
+            with patch("brotli.compress") as compress:
+                self.assertEqual(
+                    jsonbrotliminifyer.compress_json(data, cache=cache), compressed
+                )
+                compress.assert_not_called()
+            self.assertEqual(cache.stats().hits, 1)
+            self.assertEqual(len(cache), 1)
+
+            cache.clear()
+            self.assertEqual(os.listdir(directory), [])
+            self.assertEqual(cache.stats().hits, 0)
+
+    def test_thread_safety(self) -> None:
+        cache = CompressionCache(max_bytes=2000)
+        documents = [{"doc": i, "body": "text" * i} for i in range(20)]
+        errors = []
+
+        def worker() -> None:
+            try:
+                for _ in range(5):
+                    for document in documents:
+                        compressed = jsonbrotliminifyer.compress_json(
+                            document, quality=1, cache=cache
+                        )
+                        decoded = jsonbrotliminifyer.decompress_json(compressed)
+                        assert decoded == document
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        stats = cache.stats()
+        self.assertEqual(stats.hits + stats.misses, 4 * 5 * 20)
+        self.assertLessEqual(stats.size, 2000)
+
+    def test_invalid_max_bytes(self) -> None:
+        with self.assertRaises(ValueError):
+            CompressionCache(max_bytes=-1)
+
+
+if __name__ == "__main__":
+    unittest.main()
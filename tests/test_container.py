@@ -0,0 +1,139 @@
+import json
+import os
+import tempfile
+import unittest
+from typing import Any
+from unittest.mock import patch
+
+import brotli
+
+import jsonbrotliminifyer
+from jsonbrotliminifyer import ContainerReader, compress_json_container
+
+
+def _document() -> Any:
+    return {
+        "meta": {"version": 3},
+        "records": [{"id": i, "name": f"row{i}", "ok": i % 2 == 0} for i in range(500)],
+        "nested": [{"id": i, "values": list(range(200))} for i in range(5)],
+        "a/b~c": list(range(300)),
+        7: "seven",
+    }
+
+
+class TestContainer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "doc.jbc")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_roundtrip(self) -> None:
+        documents = [
+            _document(),
+            [{"id": i} for i in range(1000)],
+            [[list(range(100))] * 5] * 5,
+            {"empty": [], "deep": {"x": {"y": list(range(500))}}},
+            [],
+            "text",
+            None,
+        ]
+        for document in documents:
+            with self.subTest(document=str(document)[:40]):
+                compress_json_container(document, self.path, block_size=512)
+                expected = json.loads(json.dumps(document))
+                decoded = jsonbrotliminifyer.decompress_json_container(self.path)
+                self.assertEqual(decoded, expected)
+                self.assertEqual(json.dumps(decoded), json.dumps(expected))
+                with open(self.path, "rb") as f:
+                    data = f.read()
+                self.assertEqual(jsonbrotliminifyer.decompress_json(data), expected)
+
+    def test_get_decodes_only_needed_blocks(self) -> None:
+        document = _document()
+        compress_json_container(document, self.path, block_size=512)
+        with ContainerReader(self.path) as reader:
+            self.assertGreater(len(reader.blocks), 20)
+            with patch("brotli.decompress", wraps=brotli.decompress) as decompress:
+                self.assertEqual(reader.get("/records/321/name"), "row321")
+                self.assertEqual(decompress.call_count, 1)
+            self.assertEqual(reader.get("/meta"), {"version": 3})
+            self.assertEqual(reader.get("/nested/2/values/199"), 199)
+            self.assertEqual(reader.get("/nested/4"), document["nested"][4])
+            self.assertEqual(reader.get("/a~1b~0c/299"), 299)
+            self.assertEqual(reader.get("/7"), "seven")
+            self.assertEqual(reader.get("/records"), document["records"])
+            for pointer in (
+                "/records/500",
+                "/missing",
+                "/records/x",
+                "/meta/version/0",
+            ):
+                with self.subTest(pointer=pointer):
+                    with self.assertRaises(ValueError):
+                        reader.get(pointer)
+            with self.assertRaises(ValueError):
+                reader.get("records")
+
+    def test_read_records(self) -> None:
+        document = _document()
+        compress_json_container(document, self.path, block_size=512)
+        with ContainerReader(self.path) as reader:
+            records = document["records"]
+            for start, stop in ((0, 10), (95, 305), (490, None), (600, 700)):
+                with self.subTest(start=start, stop=stop):
+                    self.assertEqual(
+                        reader.read_records(start, stop, pointer="/records"),
+                        records[start:stop],
+                    )
+            self.assertEqual(
+                reader.read_records(1, 3, pointer="/nested"), document["nested"][1:3]
+            )
+            self.assertEqual(reader.read_records(pointer="/nested/0/values")[-1], 199)
+            with self.assertRaises(ValueError):
+                reader.read_records(pointer="/meta")
+            with self.assertRaises(ValueError):
+                reader.read_records(-1)
+
+    def test_reader_accepts_bytes(self) -> None:
+        compress_json_container(list(range(1000)), self.path, block_size=256)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        with ContainerReader(data) as reader:
+            self.assertEqual(reader.read_records(10, 12), [10, 11])
+
+    def test_plain_files_unchanged(self) -> None:
+        data = {"plain": True}
+        compressed = jsonbrotliminifyer.compress_json(data)
+        self.assertEqual(jsonbrotliminifyer.decompress_json(compressed), data)
+        with self.assertRaises(ValueError):
+            ContainerReader(compressed)
+
+    def test_decompress_json_file(self) -> None:
+        document = _document()
+        compress_json_container(document, self.path, block_size=512)
+        expected = json.loads(json.dumps(document))
+        output_path = os.path.join(self.temp_dir.name, "doc.json")
+        for raw in (False, True):
+            with self.subTest(raw=raw):
+                jsonbrotliminifyer.decompress_json_file(self.path, output_path, raw=raw)
+                with open(output_path) as f:
+                    self.assertEqual(json.load(f), expected)
+
+    def test_invalid_containers(self) -> None:
+        compress_json_container(_document(), self.path, block_size=512)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        for corrupt in (data[:-3], data[:100], data[:5] + b"\x00" * 40 + data[45:]):
+            with self.assertRaises(ValueError):
+                with ContainerReader(corrupt) as reader:
+                    reader.read()
+        with self.assertRaises(ValueError):
+            compress_json_container([], self.path, block_size=0)
+        with self.assertRaises(ValueError):
+            compress_json_container([], self.path, quality=12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,8 +4,14 @@ import tempfile
 import os
 import json
 import brotli
+import io
+import struct
 import subprocess
 import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple, Union
 from unittest.mock import patch, Mock
 
 
@@ -51,6 +57,80 @@ class TestJsonBrotliMinifyer(unittest.TestCase):
         with self.assertRaises(ValueError):
             jsonbrotliminifyer.compress_json({"test": "data"}, quality=-1)
 
+    def test_compress_encoder_parameters(self) -> None:
+        original = {"data": ["value"] * 200}
+        for mode in (brotli.MODE_GENERIC, brotli.MODE_TEXT, brotli.MODE_FONT):
+            compressed = jsonbrotliminifyer.compress_json(
+                original, quality=5, mode=mode, lgwin=16, lgblock=18
+            )
+            self.assertEqual(jsonbrotliminifyer.decompress_json(compressed), original)
+        invalid: List[Dict[str, Any]] = [
+            {"lgwin": 9},
+            {"lgwin": 25},
+            {"lgblock": 12},
+            {"mode": 7},
+        ]
+        for kwargs in invalid:
+            with self.subTest(kwargs=kwargs):
+                with self.assertRaises(ValueError):
+                    jsonbrotliminifyer.compress_json(original, **kwargs)
+
+    def test_presets(self) -> None:
+        # Tiny payloads get a window just large enough to hold them
+        tiny = jsonbrotliminifyer.preset_options("latency", 300)
+        self.assertEqual(tiny["lgwin"], 10)
+        archive = jsonbrotliminifyer.preset_options("archive", 100 * 1024 * 1024)
+        self.assertEqual(archive, {"quality": 11, "lgwin": 24, "lgblock": 0})
+        self.assertLessEqual(
+            jsonbrotliminifyer.preset_options("latency", 10**9)["quality"],
+            jsonbrotliminifyer.preset_options("balanced", 10**9)["quality"],
+        )
+
+        original = {"rows": [{"id": i, "name": f"row{i}"} for i in range(100)]}
+        for preset in jsonbrotliminifyer.PRESETS:
+            with self.subTest(preset=preset):
+                # The preset overrides an otherwise invalid quality
+                compressed = jsonbrotliminifyer.compress_json(
+                    original, quality=99, preset=preset
+                )
+                self.assertEqual(
+                    jsonbrotliminifyer.decompress_json(compressed), original
+                )
+        with self.assertRaises(ValueError) as cm:
+            jsonbrotliminifyer.compress_json(original, preset="fastest")
+        self.assertIn("Unknown preset", str(cm.exception))
+
+    def test_compress_auto_quality(self) -> None:
+        original = {"rows": [{"id": i, "name": f"row{i}"} for i in range(2000)]}
+        data = json.dumps(original, separators=(",", ":")).encode()
+        levels = jsonbrotliminifyer.AUTO_QUALITY_LEVELS
+        # An impossible budget still yields the fastest level
+        self.assertEqual(jsonbrotliminifyer.select_quality(data, 1e-9), levels[0])
+        generous = jsonbrotliminifyer.select_quality(data, 1e9)
+        self.assertIn(generous, levels)
+        self.assertLessEqual(
+            len(brotli.compress(data, quality=generous)),
+            len(brotli.compress(data, quality=levels[0])),
+        )
+
+        for budget in (None, 1e-9, 1e9):
+            with self.subTest(budget=budget):
+                compressed = jsonbrotliminifyer.compress_json(
+                    original, quality="auto", budget_ms_per_mb=budget
+                )
+                self.assertEqual(
+                    jsonbrotliminifyer.decompress_json(compressed), original
+                )
+
+    def test_compress_auto_quality_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            jsonbrotliminifyer.compress_json({}, quality="fast")
+        with self.assertRaises(ValueError) as cm:
+            jsonbrotliminifyer.compress_json({}, budget_ms_per_mb=10)
+        self.assertIn('quality="auto"', str(cm.exception))
+        with self.assertRaises(ValueError):
+            jsonbrotliminifyer.compress_json({}, quality="auto", budget_ms_per_mb=0)
+
     def test_compress_decompress_file(self) -> None:
         original = {"test": "data", "array": [1, 2, 3]}
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -73,6 +153,557 @@ class TestJsonBrotliMinifyer(unittest.TestCase):
                 decompressed = json.load(f)
             self.assertEqual(original, decompressed)
 
+    def test_compress_json_file_streaming(self) -> None:
+        original = {"records": [{"id": i, "name": f"item{i}"} for i in range(500)]}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "input.json")
+            compressed_file = os.path.join(temp_dir, "compressed.br")
+            with open(input_file, "w") as f:
+                json.dump(original, f, indent=2)
+
+            # A tiny chunk size forces many compressor.process() calls
+            jsonbrotliminifyer.compress_json_file(
+                input_file, compressed_file, streaming=True, chunk_size=64
+            )
+
+            with open(compressed_file, "rb") as f:
+                compressed = f.read()
+            # The input bytes are stored verbatim, formatting included
+            with open(input_file, "rb") as f:
+                self.assertEqual(brotli.decompress(compressed), f.read())
+            self.assertEqual(jsonbrotliminifyer.decompress_json(compressed), original)
+
+    def test_compress_json_file_streaming_preset(self) -> None:
+        original = {"records": list(range(1000))}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "input.json")
+            compressed_file = os.path.join(temp_dir, "compressed.br")
+            with open(input_file, "w") as f:
+                json.dump(original, f)
+            for streaming in (False, True):
+                jsonbrotliminifyer.compress_json_file(
+                    input_file, compressed_file, streaming=streaming, preset="latency"
+                )
+                with open(compressed_file, "rb") as f:
+                    decompressed = jsonbrotliminifyer.decompress_json(f.read())
+                self.assertEqual(decompressed, original)
+
+    def test_compress_json_file_auto_quality(self) -> None:
+        original = {"records": list(range(1000))}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "input.json")
+            compressed_file = os.path.join(temp_dir, "compressed.br")
+            with open(input_file, "w") as f:
+                json.dump(original, f)
+            for streaming in (False, True):
+                jsonbrotliminifyer.compress_json_file(
+                    input_file,
+                    compressed_file,
+                    quality="auto",
+                    streaming=streaming,
+                    budget_ms_per_mb=20,
+                )
+                with open(compressed_file, "rb") as f:
+                    decompressed = jsonbrotliminifyer.decompress_json(f.read())
+                self.assertEqual(decompressed, original)
+
+    def test_compress_json_file_streaming_invalid_chunk_size(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "input.json")
+            output_file = os.path.join(temp_dir, "output.br")
+            with open(input_file, "w") as f:
+                json.dump({"test": "data"}, f)
+            with self.assertRaises(ValueError) as cm:
+                jsonbrotliminifyer.compress_json_file(
+                    input_file, output_file, streaming=True, chunk_size=0
+                )
+            self.assertIn("chunk_size must be positive", str(cm.exception))
+
+    def test_compress_json_bytes(self) -> None:
+        original = {"records": [{"id": i, "name": f"item{i}"} for i in range(500)]}
+        payload = json.dumps(original, indent=2).encode()
+        for validate in jsonbrotliminifyer.VALIDATE_LEVELS:
+            with self.subTest(validate=validate):
+                compressed = jsonbrotliminifyer.compress_json_bytes(
+                    memoryview(payload), quality=5, validate=validate
+                )
+                # Formatting is kept, nothing is re-serialized
+                self.assertEqual(brotli.decompress(compressed), payload)
+                self.assertEqual(
+                    jsonbrotliminifyer.decompress_json(compressed), original
+                )
+        framed = jsonbrotliminifyer.compress_json_bytes(
+            payload, quality=5, workers=2, block_size=4096
+        )
+        self.assertEqual(jsonbrotliminifyer.decompress_json(framed), original)
+
+        for validate in ("scan", "parse"):
+            with self.subTest(validate=validate):
+                with self.assertRaises(ValueError) as cm:
+                    jsonbrotliminifyer.compress_json_bytes(
+                        payload[:-1], validate=validate
+                    )
+                self.assertIn("not valid JSON", str(cm.exception))
+        # Without validation, any bytes are compressed as given
+        compressed = jsonbrotliminifyer.compress_json_bytes(payload[:-1])
+        self.assertEqual(brotli.decompress(compressed), payload[:-1])
+        with self.assertRaises(ValueError):
+            jsonbrotliminifyer.compress_json_bytes(payload, validate="full")
+
+    def test_compress_json_file_raw(self) -> None:
+        original = {"records": [{"id": i, "name": f"item{i}"} for i in range(500)]}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "input.json")
+            compressed_file = os.path.join(temp_dir, "compressed.br")
+            with open(input_file, "w") as f:
+                json.dump(original, f, indent=2)
+            with open(input_file, "rb") as f:
+                payload = f.read()
+            for validate in jsonbrotliminifyer.VALIDATE_LEVELS:
+                for workers in (None, 2):
+                    with self.subTest(validate=validate, workers=workers):
+                        jsonbrotliminifyer.compress_json_file(
+                            input_file,
+                            compressed_file,
+                            quality=5,
+                            raw=True,
+                            validate=validate,
+                            workers=workers,
+                            block_size=4096,
+                        )
+                        with open(compressed_file, "rb") as f:
+                            compressed = f.read()
+                        self.assertEqual(
+                            jsonbrotliminifyer.decompress_json(compressed), original
+                        )
+                        if workers is None:
+                            self.assertEqual(brotli.decompress(compressed), payload)
+
+            empty_file = os.path.join(temp_dir, "empty.json")
+            open(empty_file, "wb").close()
+            jsonbrotliminifyer.compress_json_file(empty_file, compressed_file, raw=True)
+            with open(compressed_file, "rb") as f:
+                self.assertEqual(brotli.decompress(f.read()), b"")
+
+    def test_compress_json_file_validate(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "input.json")
+            output_file = os.path.join(temp_dir, "output.br")
+            with open(input_file, "w") as f:
+                f.write('{"records": [1, 2, 3], "name": "x"')
+            invalid: List[Dict[str, Any]] = [
+                {"raw": True, "validate": "scan"},
+                {"raw": True, "validate": "parse"},
+                {"streaming": True, "validate": "scan", "chunk_size": 8},
+            ]
+            for kwargs in invalid:
+                with self.subTest(**kwargs):
+                    with self.assertRaises(ValueError) as cm:
+                        jsonbrotliminifyer.compress_json_file(
+                            input_file, output_file, **kwargs
+                        )
+                    self.assertIn("invalid JSON", str(cm.exception))
+                    self.assertFalse(os.path.exists(output_file))
+                    self.assertEqual(os.listdir(temp_dir), ["input.json"])
+
+            rejected: List[Dict[str, Any]] = [
+                {"raw": True, "streaming": True},
+                {"raw": True, "columnar": True},
+                {"validate": "scan"},
+                {"streaming": True, "validate": "parse"},
+            ]
+            for kwargs in rejected:
+                with self.subTest(**kwargs):
+                    with self.assertRaises(ValueError):
+                        jsonbrotliminifyer.compress_json_file(
+                            input_file, output_file, **kwargs
+                        )
+
+    def test_decompress_json_file_raw(self) -> None:
+        payload = json.dumps({"rows": [[i, str(i) * 3] for i in range(2000)]}).encode()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "input.br")
+            output_file = os.path.join(temp_dir, "output.json")
+            with open(input_file, "wb") as f:
+                f.write(brotli.compress(payload))
+
+            jsonbrotliminifyer.decompress_json_file(
+                input_file, output_file, raw=True, chunk_size=128, validate="scan"
+            )
+
+            # Raw mode writes the decompressed bytes unchanged
+            with open(output_file, "rb") as f:
+                self.assertEqual(f.read(), payload)
+
+    def test_decompress_json_file_raw_validate_invalid(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "input.br")
+            output_file = os.path.join(temp_dir, "output.json")
+            with open(input_file, "wb") as f:
+                f.write(brotli.compress(b'{"truncated": [1, 2'))
+
+            # Without validation the bytes are passed through
+            jsonbrotliminifyer.decompress_json_file(input_file, output_file, raw=True)
+            os.remove(output_file)
+
+            with self.assertRaises(ValueError) as cm:
+                jsonbrotliminifyer.decompress_json_file(
+                    input_file, output_file, raw=True, validate="scan"
+                )
+            self.assertIn("Decompressed data is not valid JSON", str(cm.exception))
+            for validate in ("parse", "full"):
+                with self.assertRaises(ValueError):
+                    jsonbrotliminifyer.decompress_json_file(
+                        input_file, output_file, raw=True, validate=validate
+                    )
+            with self.assertRaises(ValueError) as cm:
+                jsonbrotliminifyer.decompress_json_file(
+                    input_file, output_file, raw=True, validate=True
+                )
+            self.assertIn("Decompressed data is not valid JSON", str(cm.exception))
+            self.assertFalse(os.path.exists(output_file))
+            self.assertFalse(any(f.endswith(".tmp") for f in os.listdir(temp_dir)))
+
+    def test_decompress_json_file_raw_truncated_stream(self) -> None:
+        compressed = jsonbrotliminifyer.compress_json({"data": list(range(1000))})
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "input.br")
+            output_file = os.path.join(temp_dir, "output.json")
+            with open(input_file, "wb") as f:
+                f.write(compressed[: len(compressed) // 2])
+            with self.assertRaises(ValueError) as cm:
+                jsonbrotliminifyer.decompress_json_file(
+                    input_file, output_file, raw=True
+                )
+            self.assertIn("Invalid Brotli-compressed data", str(cm.exception))
+            self.assertFalse(os.path.exists(output_file))
+
+    def test_compress_json_stream(self) -> None:
+        data = {"rows": [{"id": i, "name": f"row {i} é"} for i in range(2000)]}
+        text = json.dumps(data, indent=2, ensure_ascii=False).encode()
+        for minify in (True, False):
+            for validate in ("none", "scan"):
+                target = io.BytesIO()
+                written = jsonbrotliminifyer.compress_json_stream(
+                    io.BytesIO(text),
+                    target,
+                    quality=5,
+                    minify=minify,
+                    validate=validate,
+                    chunk_size=1000,
+                )
+                compressed = target.getvalue()
+                self.assertEqual(written, len(compressed))
+                stored = brotli.decompress(compressed)
+                if minify:
+                    self.assertEqual(
+                        stored,
+                        json.dumps(
+                            data, separators=(",", ":"), ensure_ascii=False
+                        ).encode(),
+                    )
+                else:
+                    self.assertEqual(stored, text)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = os.path.join(temp_dir, "output.br")
+            jsonbrotliminifyer.compress_json_stream(io.BytesIO(text), output_file)
+            with open(output_file, "rb") as f:
+                self.assertEqual(jsonbrotliminifyer.decompress_json(f.read()), data)
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.compress_json_stream(
+                    io.BytesIO(b'{"a": 1,'), output_file, validate="scan"
+                )
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.compress_json_stream(
+                    io.BytesIO(b"\xff"), output_file
+                )
+            self.assertEqual(os.listdir(temp_dir), ["output.br"])
+        for options in ({"quality": "auto"}, {"validate": "parse"}, {"chunk_size": 0}):
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.compress_json_stream(
+                    io.BytesIO(text),
+                    io.BytesIO(),
+                    **options,
+                )
+
+    def test_decompress_json_stream(self) -> None:
+        data = {"rows": [{"id": i, "tags": [], "meta": {}} for i in range(3000)]}
+        compressed = jsonbrotliminifyer.compress_json(data, 5)
+        expected = {
+            "compact": json.dumps(data, separators=(",", ":")).encode(),
+            "pretty": json.dumps(data, indent=2).encode(),
+        }
+        for layout, options in (
+            ("compact", {}),
+            ("pretty", {"pretty": True}),
+            ("compact", {"raw": True, "validate": "scan"}),
+        ):
+            target = io.BytesIO()
+            jsonbrotliminifyer.decompress_json_stream(
+                io.BytesIO(compressed), target, chunk_size=4096, **options
+            )
+            self.assertEqual(target.getvalue(), expected[layout])
+
+        # Framed, transformed and container payloads
+        payloads = [
+            jsonbrotliminifyer.compress_json(data, 5, workers=2, block_size=30000),
+            jsonbrotliminifyer.compress_json(data, 5, columnar=True),
+        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            container = os.path.join(temp_dir, "data.jbc")
+            jsonbrotliminifyer.compress_json_container(
+                data, container, block_size=30000
+            )
+            with open(container, "rb") as f:
+                payloads.append(f.read())
+            for payload in payloads:
+                output_file = os.path.join(temp_dir, "output.json")
+                jsonbrotliminifyer.decompress_json_stream(
+                    io.BytesIO(payload), output_file, chunk_size=4096
+                )
+                with open(output_file) as f:
+                    self.assertEqual(json.load(f), data)
+
+            os.remove(output_file)
+            for payload in (compressed[: len(compressed) // 2], b"not brotli"):
+                with self.assertRaises(ValueError):
+                    jsonbrotliminifyer.decompress_json_stream(
+                        io.BytesIO(payload), output_file
+                    )
+                self.assertFalse(os.path.exists(output_file))
+        with self.assertRaises(ValueError):
+            jsonbrotliminifyer.decompress_json_stream(
+                io.BytesIO(jsonbrotliminifyer.compress_json_bytes(b"[1,")),
+                io.BytesIO(),
+                raw=True,
+                validate="scan",
+            )
+        with self.assertRaises(ValueError):
+            jsonbrotliminifyer.decompress_json_stream(
+                io.BytesIO(jsonbrotliminifyer.compress_json_bytes(b"[1,")),
+                io.BytesIO(),
+                raw=True,
+                validate=True,
+            )
+        target = io.BytesIO()
+        jsonbrotliminifyer.decompress_json_stream(
+            io.BytesIO(compressed), target, validate=False
+        )
+        self.assertEqual(json.loads(target.getvalue()), data)
+        with self.assertRaises(ValueError):
+            jsonbrotliminifyer.decompress_json_stream(
+                io.BytesIO(compressed), io.BytesIO(), validate="parse"
+            )
+
+    def test_compress_parallel(self) -> None:
+        data = {"rows": [{"id": i, "name": f"row {i}"} for i in range(3000)]}
+        compressed = jsonbrotliminifyer.compress_json(
+            data, quality=5, workers=4, block_size=4096
+        )
+        self.assertTrue(compressed.startswith(b"\x11JBP"))
+        self.assertEqual(jsonbrotliminifyer.decompress_json(compressed), data)
+        self.assertEqual(
+            jsonbrotliminifyer.query_json(compressed, "/rows/2999/name"), "row 2999"
+        )
+        # Output does not depend on the number of workers
+        self.assertEqual(
+            jsonbrotliminifyer.compress_json(
+                data, quality=5, workers=2, block_size=4096
+            ),
+            compressed,
+        )
+        # Payloads that fit in one block stay a plain Brotli stream
+        small = jsonbrotliminifyer.compress_json({"a": 1}, workers=4)
+        self.assertEqual(json.loads(brotli.decompress(small)), {"a": 1})
+        auto = jsonbrotliminifyer.compress_json(
+            data, quality="auto", workers=2, block_size=4096, columnar=True
+        )
+        self.assertEqual(jsonbrotliminifyer.decompress_json(auto), data)
+
+        for truncated in (compressed[:-8], compressed[: len(compressed) // 2]):
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.decompress_json(truncated)
+        with self.assertRaises(ValueError):
+            jsonbrotliminifyer.compress_json(data, workers=0)
+        with self.assertRaises(ValueError):
+            jsonbrotliminifyer.compress_json(data, workers=2, block_size=0)
+
+    def test_compress_json_file_parallel(self) -> None:
+        data = [{"id": i, "tags": ["a", "b"], "score": i * 0.5} for i in range(2000)]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "input.json")
+            output_file = os.path.join(temp_dir, "output.br")
+            decompressed_file = os.path.join(temp_dir, "decompressed.json")
+            with open(input_file, "w") as f:
+                json.dump(data, f, indent=2)
+            for streaming in (False, True):
+                with self.subTest(streaming=streaming):
+                    jsonbrotliminifyer.compress_json_file(
+                        input_file,
+                        output_file,
+                        quality=4,
+                        streaming=streaming,
+                        workers=3,
+                        block_size=10000,
+                    )
+                    with open(output_file, "rb") as f:
+                        self.assertTrue(f.read().startswith(b"\x11JBP"))
+                    for raw, validate in ((False, "none"), (True, "scan")):
+                        jsonbrotliminifyer.decompress_json_file(
+                            output_file, decompressed_file, raw=raw, validate=validate
+                        )
+                        with open(decompressed_file) as f:
+                            self.assertEqual(json.load(f), data)
+                    self.assertEqual(
+                        jsonbrotliminifyer.query_json_file(output_file, "/1999/id"),
+                        1999,
+                    )
+            with open(input_file, "rb") as f:
+                original = f.read()
+            with open(decompressed_file, "rb") as f:
+                # The last round streamed the input bytes, indentation included
+                self.assertEqual(f.read(), original)
+
+    def test_query_json(self) -> None:
+        data = {
+            "meta": {"version": "2.0", "path/~": [1.5, None]},
+            "items": [{"id": i, "name": f"item {i}"} for i in range(20000)],
+        }
+        compressed = jsonbrotliminifyer.compress_json(data, quality=5)
+        queries = {
+            "/meta/version": "2.0",
+            "/meta/path~1~0/0": 1.5,
+            "/items/12345": {"id": 12345, "name": "item 12345"},
+            "/items/19999/name": "item 19999",
+            "": data,
+        }
+        for pointer, expected in queries.items():
+            with self.subTest(pointer=pointer):
+                self.assertEqual(
+                    jsonbrotliminifyer.query_json(compressed, pointer), expected
+                )
+        for pointer in ("/missing", "/items/20000", "/meta/version/0", "meta"):
+            with self.subTest(pointer=pointer):
+                with self.assertRaises(ValueError):
+                    jsonbrotliminifyer.query_json(compressed, pointer)
+
+        # Decompression stops once the value is complete, so the rest of the
+        # stream is never looked at
+        truncated = compressed[: len(compressed) // 2]
+        self.assertEqual(
+            jsonbrotliminifyer.query_json(truncated, "/meta/version"), "2.0"
+        )
+        with self.assertRaises(ValueError):
+            jsonbrotliminifyer.query_json(truncated, "/items/19999")
+
+        transformed = jsonbrotliminifyer.compress_json(data, columnar=True)
+        self.assertEqual(
+            jsonbrotliminifyer.query_json(transformed, "/items/7/name"), "item 7"
+        )
+        with self.assertRaises(ValueError):
+            jsonbrotliminifyer.query_json(brotli.compress(b'{"a": [1, }'), "/a")
+
+    def test_query_json_file(self) -> None:
+        data = {"records": [{"n": i} for i in range(5000)], "tail": True}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "data.br")
+            with open(path, "wb") as f:
+                f.write(jsonbrotliminifyer.compress_json(data))
+            self.assertEqual(
+                jsonbrotliminifyer.query_json_file(path, "/records/4321"), {"n": 4321}
+            )
+            self.assertIs(
+                jsonbrotliminifyer.query_json_file(path, "/tail", chunk_size=7), True
+            )
+            container = os.path.join(temp_dir, "data.jbc")
+            jsonbrotliminifyer.compress_json_container(data, container, block_size=1024)
+            self.assertEqual(
+                jsonbrotliminifyer.query_json_file(container, "/records/42/n"), 42
+            )
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.query_json_file(
+                    os.path.join(temp_dir, "missing.br"), "/tail"
+                )
+
+    def test_decompression_limits(self) -> None:
+        data = {"rows": [{"id": i, "name": "x" * 20} for i in range(5000)]}
+        size = len(json.dumps(data, separators=(",", ":")))
+        bomb = brotli.compress(b"[" + b" " * (64 << 20) + b"]", quality=1)
+        payloads = [
+            jsonbrotliminifyer.compress_json(data, 5),
+            jsonbrotliminifyer.compress_json(data, 5, workers=2, block_size=20000),
+            jsonbrotliminifyer.compress_json(data, 5, columnar=True),
+        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            container = os.path.join(temp_dir, "data.jbc")
+            jsonbrotliminifyer.compress_json_container(data, container, quality=5)
+            with open(container, "rb") as f:
+                payloads.append(f.read())
+            for payload in payloads:
+                self.assertEqual(
+                    jsonbrotliminifyer.decompress_json(
+                        payload, max_output_size=2 * size, max_ratio=1000
+                    ),
+                    data,
+                )
+                with self.assertRaises(jsonbrotliminifyer.DecompressionLimitError):
+                    jsonbrotliminifyer.decompress_json(payload, max_output_size=1000)
+                with self.assertRaises(jsonbrotliminifyer.DecompressionLimitError):
+                    jsonbrotliminifyer.decompress_json(payload, max_ratio=1.5)
+
+            # Decompression stops early instead of expanding the whole input
+            with patch("brotli.decompress", side_effect=AssertionError):
+                with self.assertRaises(
+                    jsonbrotliminifyer.DecompressionLimitError
+                ) as cm:
+                    jsonbrotliminifyer.decompress_json(bomb, max_output_size=1 << 20)
+            self.assertIn("max_output_size", str(cm.exception))
+            self.assertIsInstance(cm.exception, ValueError)
+
+            bomb_file = os.path.join(temp_dir, "bomb.br")
+            with open(bomb_file, "wb") as f:
+                f.write(bomb)
+            output_file = os.path.join(temp_dir, "bomb.json")
+            for raw in (False, True):
+                with self.assertRaises(jsonbrotliminifyer.DecompressionLimitError):
+                    jsonbrotliminifyer.decompress_json_file(
+                        bomb_file, output_file, raw=raw, max_ratio=100
+                    )
+                self.assertFalse(os.path.exists(output_file))
+            target = io.BytesIO()
+            with self.assertRaises(jsonbrotliminifyer.DecompressionLimitError):
+                jsonbrotliminifyer.decompress_json_stream(
+                    io.BytesIO(bomb), target, raw=True, max_output_size=1 << 20
+                )
+            self.assertLess(len(target.getvalue()), 1 << 20)
+
+            errors = jsonbrotliminifyer.decompress_json_files(
+                [bomb_file, container],
+                os.path.join(temp_dir, "out"),
+                max_output_size=4 * size,
+            )
+            self.assertIsInstance(errors[0], jsonbrotliminifyer.DecompressionLimitError)
+            self.assertIsNone(errors[1])
+
+        # A frame is never decompressed past its declared size
+        compressed = brotli.compress(b" " * 100000)
+        framed = (
+            b"\x11JBP\x01"
+            + struct.pack("<II", len(compressed), 10)
+            + compressed
+            + bytes(8)
+        )
+        with self.assertRaises(ValueError):
+            jsonbrotliminifyer.decompress_json(framed)
+
+        limits: List[Dict[str, Any]] = [{"max_output_size": 0}, {"max_ratio": -1}]
+        for options in limits:
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.decompress_json(payloads[0], **options)
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.decompress_json_files([], "out", **options)
+
     def test_decompress_invalid_brotli(self) -> None:
         with self.assertRaises(ValueError) as cm:
             jsonbrotliminifyer.decompress_json(b"invalid brotli data")
@@ -135,6 +766,25 @@ class TestJsonBrotliMinifyer(unittest.TestCase):
             # No temporary files should remain
             self.assertFalse(any(f.endswith(".tmp") for f in os.listdir(temp_dir)))
 
+    @patch("jsonbrotliminifyer.os.replace")
+    def test_compress_json_file_streaming_atomic_write_failure(
+        self, mock_rename: Mock
+    ) -> None:
+        mock_rename.side_effect = OSError("Rename failed")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "input.json")
+            output_file = os.path.join(temp_dir, "output.br")
+            with open(input_file, "w") as f:
+                json.dump({"test": "data"}, f)
+
+            with self.assertRaises(ValueError) as cm:
+                jsonbrotliminifyer.compress_json_file(
+                    input_file, output_file, streaming=True
+                )
+            self.assertIn("Error writing to output file", str(cm.exception))
+            self.assertFalse(os.path.exists(output_file))
+            self.assertFalse(any(f.endswith(".tmp") for f in os.listdir(temp_dir)))
+
     @patch("jsonbrotliminifyer.os.replace")
     def test_decompress_json_file_atomic_write_failure(self, mock_rename: Mock) -> None:
         """Test that if atomic rename fails, output file is not created."""
@@ -220,6 +870,154 @@ class TestJsonBrotliMinifyer(unittest.TestCase):
                     data = json.load(f)
                 self.assertEqual(data, original)
 
+    def test_json_files_process_executor(self) -> None:
+        originals = [{"file": i, "values": list(range(i * 10))} for i in range(4)]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = []
+            for i, original in enumerate(originals):
+                input_file = os.path.join(temp_dir, f"input{i}.json")
+                with open(input_file, "w") as f:
+                    json.dump(original, f)
+                input_files.append(input_file)
+            missing_file = os.path.join(temp_dir, "missing.json")
+
+            compressed_dir = os.path.join(temp_dir, "compressed")
+            results = jsonbrotliminifyer.compress_json_files(
+                input_files + [missing_file],
+                compressed_dir,
+                max_workers=2,
+                executor="process",
+            )
+            self.assertEqual(results[:-1], [None] * len(originals))
+            # Errors raised in worker processes come back as exceptions
+            self.assertIsInstance(results[-1], ValueError)
+
+            compressed_files = [
+                os.path.join(compressed_dir, f"input{i}.br")
+                for i in range(len(originals))
+            ]
+            restored_dir = os.path.join(temp_dir, "restored")
+            results = jsonbrotliminifyer.decompress_json_files(
+                compressed_files, restored_dir, max_workers=2, executor="process"
+            )
+            self.assertEqual(results, [None] * len(originals))
+            for i, original in enumerate(originals):
+                with open(os.path.join(restored_dir, f"input{i}.json")) as f:
+                    self.assertEqual(json.load(f), original)
+
+    def test_json_files_auto_executor(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = []
+            for i in range(2):
+                input_file = os.path.join(temp_dir, f"input{i}.json")
+                with open(input_file, "w") as f:
+                    json.dump({"file": i}, f)
+                input_files.append(input_file)
+
+            # Small inputs stay on threads
+            self.assertEqual(
+                jsonbrotliminifyer._resolve_executor("auto", input_files), "thread"
+            )
+            with (
+                patch("jsonbrotliminifyer.os.cpu_count", return_value=4),
+                patch("jsonbrotliminifyer.PROCESS_POOL_MIN_BYTES", 10),
+            ):
+                self.assertEqual(
+                    jsonbrotliminifyer._resolve_executor("auto", input_files),
+                    "process",
+                )
+                results = jsonbrotliminifyer.compress_json_files(
+                    input_files, os.path.join(temp_dir, "out"), executor="auto"
+                )
+            self.assertEqual(results, [None, None])
+
+    def test_json_files_invalid_executor(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(ValueError) as cm:
+                jsonbrotliminifyer.compress_json_files(
+                    [], os.path.join(temp_dir, "out"), executor="fibers"
+                )
+            self.assertIn("executor must be", str(cm.exception))
+
+    def test_compress_json_files_deadline(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = []
+            for i in range(3):
+                input_file = os.path.join(temp_dir, f"input{i}.json")
+                with open(input_file, "w") as f:
+                    json.dump({"file": i, "values": list(range(500))}, f)
+                input_files.append(input_file)
+            output_dir = os.path.join(temp_dir, "out")
+            results = jsonbrotliminifyer.compress_json_files(
+                input_files, output_dir, quality="auto", deadline=5.0
+            )
+            self.assertEqual(results, [None, None, None])
+            for i in range(3):
+                with open(os.path.join(output_dir, f"input{i}.br"), "rb") as f:
+                    decompressed = jsonbrotliminifyer.decompress_json(f.read())
+                self.assertEqual(decompressed["file"], i)
+
+            with self.assertRaises(ValueError) as cm:
+                jsonbrotliminifyer.compress_json_files(
+                    input_files, output_dir, deadline=5.0
+                )
+            self.assertIn('quality="auto"', str(cm.exception))
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.compress_json_files(
+                    input_files, output_dir, quality="auto", deadline=-1
+                )
+
+    def test_compress_json_files_incremental(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = []
+            for i in range(3):
+                input_file = os.path.join(temp_dir, f"input{i}.json")
+                with open(input_file, "w") as f:
+                    json.dump({"file": i}, f)
+                input_files.append(input_file)
+            output_dir = os.path.join(temp_dir, "out")
+            manifest = os.path.join(output_dir, jsonbrotliminifyer.MANIFEST_NAME)
+
+            def run(**kwargs: Any) -> List[str]:
+                with patch(
+                    "jsonbrotliminifyer.compress_json_file",
+                    wraps=jsonbrotliminifyer.compress_json_file,
+                ) as compress:
+                    results = jsonbrotliminifyer.compress_json_files(
+                        input_files, output_dir, incremental=True, **kwargs
+                    )
+                self.assertEqual(results, [None, None, None])
+                return sorted(
+                    os.path.basename(call.args[0]) for call in compress.call_args_list
+                )
+
+            self.assertEqual(len(run()), 3)
+            self.assertTrue(os.path.exists(manifest))
+            self.assertEqual(run(), [])
+
+            # A new mtime with the same content is only re-hashed
+            os.utime(input_files[0], ns=(1, 1))
+            self.assertEqual(run(), [])
+            self.assertEqual(run(), [])
+
+            with open(input_files[1], "w") as f:
+                json.dump({"file": 1, "changed": True}, f)
+            self.assertEqual(run(), ["input1.json"])
+            with open(os.path.join(output_dir, "input1.br"), "rb") as compressed:
+                restored = jsonbrotliminifyer.decompress_json(compressed.read())
+            self.assertTrue(restored["changed"])
+
+            os.remove(os.path.join(output_dir, "input2.br"))
+            self.assertEqual(run(), ["input2.json"])
+
+            # Different parameters produce different outputs
+            self.assertEqual(len(run(quality=5)), 3)
+            self.assertEqual(run(quality=5), [])
+
+            with open(manifest, "w") as f:
+                f.write("not json")
+            self.assertEqual(len(run(quality=5)), 3)
+
     def test_compress_json_files_duplicate_input(self) -> None:
         # Test that duplicate input paths raise error
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -250,6 +1048,196 @@ class TestJsonBrotliMinifyer(unittest.TestCase):
                 )
             self.assertIn("max_workers must be positive", str(cm.exception))
 
+    def test_iter_json_files(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = []
+            for i in range(20):
+                input_file = os.path.join(temp_dir, f"input{i}.json")
+                with open(input_file, "w") as f:
+                    json.dump({"file": i, "values": list(range(100))}, f)
+                input_files.append(input_file)
+            missing = os.path.join(temp_dir, "missing.json")
+            compressed_dir = os.path.join(temp_dir, "compressed")
+            consumed = []
+
+            def paths() -> Iterator[str]:
+                for path in input_files + [missing, input_files[0]]:
+                    consumed.append(path)
+                    yield path
+
+            results: Dict[Union[str, Path], List[Tuple[Any, ...]]] = {}
+            batch = jsonbrotliminifyer.iter_compress_json_files(
+                paths(), compressed_dir, quality=5, max_workers=2, max_in_flight=3
+            )
+            # Nothing is read until iteration starts
+            self.assertEqual(consumed, [])
+            for source, output_path, error, stats in batch:
+                self.assertLessEqual(len(consumed) - len(results), 3 + 1)
+                results.setdefault(source, []).append((output_path, error, stats))
+            self.assertEqual(len(results[input_files[0]]), 2)
+            self.assertIsInstance(results[missing][0][1], ValueError)
+            duplicate = [error for _, error, _ in results[input_files[0]] if error]
+            self.assertIn("Duplicate output path", str(duplicate[0]))
+            for input_file in input_files[1:]:
+                output_path, error, stats = results[input_file][0]
+                self.assertIsNone(error)
+                self.assertEqual(stats.input_bytes, os.path.getsize(input_file))
+                self.assertEqual(stats.output_bytes, os.path.getsize(output_path))
+                self.assertGreaterEqual(stats.seconds, 0)
+
+            output_dir = os.path.join(temp_dir, "outputs")
+            compressed = sorted(
+                os.path.join(compressed_dir, name)
+                for name in os.listdir(compressed_dir)
+            )
+            restored = list(
+                jsonbrotliminifyer.iter_decompress_json_files(
+                    iter(compressed), output_dir, executor="process", max_workers=2
+                )
+            )
+            self.assertEqual(len(restored), 20)
+            for _, output_path, error, stats in restored:
+                self.assertIsNone(error)
+                with open(output_path) as f:
+                    self.assertEqual(json.load(f)["values"], list(range(100)))
+
+    def test_iter_json_files_stop_early(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = []
+            for i in range(50):
+                input_file = os.path.join(temp_dir, f"input{i}.json")
+                with open(input_file, "w") as f:
+                    json.dump({"file": i}, f)
+                input_files.append(input_file)
+            output_dir = os.path.join(temp_dir, "outputs")
+            batch = jsonbrotliminifyer.iter_compress_json_files(
+                input_files, output_dir, max_workers=1, max_in_flight=2
+            )
+            next(batch)
+            batch.close()
+            # The finished file and at most the two in flight were written
+            self.assertLessEqual(len(os.listdir(output_dir)), 3)
+
+            for options in (
+                {"executor": "auto"},
+                {"max_in_flight": 0},
+                {"max_workers": 0},
+                {"quality": 12},
+            ):
+                with self.subTest(options=options):
+                    with self.assertRaises(ValueError):
+                        jsonbrotliminifyer.iter_compress_json_files(
+                            input_files, output_dir, **options
+                        )
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.iter_decompress_json_files(
+                    input_files[0], output_dir
+                )
+
+    def test_compress_json_files_memory_limit(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = []
+            for i, count in enumerate([10, 1000, 100, 5000, 1]):
+                input_file = os.path.join(temp_dir, f"input{i}.json")
+                with open(input_file, "w") as f:
+                    json.dump({"values": list(range(count))}, f)
+                input_files.append(input_file)
+            sizes = [os.path.getsize(path) for path in input_files]
+            output_dir = os.path.join(temp_dir, "outputs")
+            lock = threading.Lock()
+            started = []
+            active = [0, 0]
+            compress_json_file = jsonbrotliminifyer.compress_json_file
+
+            def tracked(input_file: str, output_path: str, **kwargs: Any) -> None:
+                with lock:
+                    started.append(input_file)
+                    active[0] += 1
+                    active[1] = max(active[1], active[0])
+                time.sleep(0.02)
+                try:
+                    compress_json_file(input_file, output_path, **kwargs)
+                finally:
+                    with lock:
+                        active[0] -= 1
+
+            with patch("jsonbrotliminifyer.compress_json_file", tracked):
+                # Every file is over this budget, so they run one at a time
+                stats = jsonbrotliminifyer.StageStats()
+                with self.assertLogs(level="INFO") as logs:
+                    results = jsonbrotliminifyer.compress_json_files(
+                        input_files,
+                        output_dir,
+                        quality=1,
+                        max_workers=4,
+                        memory_limit=1,
+                        stats=stats,
+                    )
+                self.assertEqual(results, [None] * 5)
+                estimates = {
+                    input_file: jsonbrotliminifyer._estimate_memory(size, 1)
+                    for input_file, size in zip(input_files, sizes)
+                }
+                self.assertEqual(stats.memory_estimates(), estimates)
+                for input_file, estimate in estimates.items():
+                    self.assertIn(
+                        f"INFO:root:Memory estimate for {input_file}: {estimate} bytes",
+                        logs.output,
+                    )
+                self.assertEqual(active[1], 1)
+                by_size = sorted(input_files, key=os.path.getsize, reverse=True)
+                self.assertEqual(started, by_size)
+
+                # Room for two files at quality 1
+                started.clear()
+                active[1] = 0
+                limit = 2 * jsonbrotliminifyer._estimate_memory(max(sizes), 1)
+                results = jsonbrotliminifyer.compress_json_files(
+                    input_files,
+                    output_dir,
+                    quality=1,
+                    max_workers=4,
+                    memory_limit=limit,
+                    incremental=True,
+                )
+                self.assertEqual(results, [None] * 5)
+                self.assertEqual(active[1], 2)
+                self.assertEqual(started, by_size)
+
+            for input_file in input_files:
+                output_file = os.path.join(
+                    output_dir, os.path.basename(input_file)[:-5] + ".br"
+                )
+                with open(output_file, "rb") as compressed:
+                    restored = jsonbrotliminifyer.decompress_json(compressed.read())
+                with open(input_file) as f:
+                    self.assertEqual(restored, json.load(f))
+
+            stats = jsonbrotliminifyer.StageStats()
+            streamed = jsonbrotliminifyer.iter_compress_json_files(
+                input_files, output_dir, quality=5, memory_limit=1 << 30, stats=stats
+            )
+            for source, _, error, file_stats in streamed:
+                self.assertIsNone(error)
+                estimate = jsonbrotliminifyer._estimate_memory(
+                    os.path.getsize(source), 5
+                )
+                self.assertEqual(file_stats.memory_estimate, estimate)
+                self.assertEqual(stats.memory_estimates()[str(source)], estimate)
+            self.assertGreater(
+                jsonbrotliminifyer._estimate_memory(1000, "auto"),
+                jsonbrotliminifyer._estimate_memory(1000, 1),
+            )
+
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.compress_json_files(
+                    input_files, output_dir, memory_limit=0
+                )
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.iter_compress_json_files(
+                    input_files, output_dir, memory_limit=-1
+                )
+
 
 class TestCli(unittest.TestCase):
     def test_compress_stdin(self) -> None:
@@ -265,6 +1253,45 @@ class TestCli(unittest.TestCase):
         decompressed = jsonbrotliminifyer.decompress_json(compressed)
         self.assertEqual(decompressed, data)
 
+    def test_compress_stdin_buffered_to_file(self) -> None:
+        # -q auto reads all of stdin before writing the output file
+        command = [sys.executable, "-m", "jsonbrotliminifyer", "compress", "-q", "auto"]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = os.path.join(temp_dir, "output.br")
+            result = subprocess.run(
+                command + ["-o", output_file],
+                input=b'{"a": [1, 2]}',
+                capture_output=True,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            with open(output_file, "rb") as f:
+                self.assertEqual(
+                    jsonbrotliminifyer.decompress_json(f.read()), {"a": [1, 2]}
+                )
+            self.assertEqual(os.listdir(temp_dir), ["output.br"])
+
+            # A directory in the way fails the final replace
+            occupied = os.path.join(temp_dir, "occupied")
+            os.mkdir(occupied)
+            result = subprocess.run(
+                command + ["-o", occupied], input=b"{}", capture_output=True
+            )
+            self.assertEqual(result.returncode, 1)
+            self.assertIn(b"Error writing to output file", result.stderr)
+            self.assertNotIn(b"Traceback", result.stderr)
+            self.assertEqual(sorted(os.listdir(temp_dir)), ["occupied", "output.br"])
+
+    def test_compress_invalid_stdin(self) -> None:
+        for text in (b'{"a": 1 2}', b"not json", b"[1, 2", b'["a" "b"]', b""):
+            with self.subTest(text=text):
+                result = subprocess.run(
+                    [sys.executable, "-m", "jsonbrotliminifyer", "compress"],
+                    input=text,
+                    capture_output=True,
+                )
+                self.assertEqual(result.returncode, 1)
+                self.assertIn(b"not valid JSON", result.stderr)
+
     def test_compress_files(self) -> None:
         data = {"file": "test"}
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -306,6 +1333,51 @@ class TestCli(unittest.TestCase):
         decompressed = json.loads(output)
         self.assertEqual(decompressed, data)
 
+        command = [sys.executable, "-m", "jsonbrotliminifyer", "decompress", "--raw"]
+        truncated = jsonbrotliminifyer.compress_json_bytes(b"[1,")
+        for validate, returncode in ((["--validate", "scan"], 1), ([], 0)):
+            result = subprocess.run(
+                command + validate, input=truncated, capture_output=True
+            )
+            self.assertEqual(result.returncode, returncode)
+
+    def test_decompress_limits(self) -> None:
+        bomb = brotli.compress(b"[" + b" " * (4 << 20) + b"]", quality=1)
+        command = [sys.executable, "-m", "jsonbrotliminifyer", "decompress"]
+        for options in (["--max-output-size", "1M"], ["--max-ratio", "1000"]):
+            result = subprocess.run(command + options, input=bomb, capture_output=True)
+            self.assertEqual(result.returncode, 1)
+            self.assertIn(b"exceeds max_", result.stderr)
+        result = subprocess.run(
+            command + ["--max-output-size", "5M"], input=bomb, capture_output=True
+        )
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(json.loads(result.stdout), [])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "bomb.br")
+            with open(input_file, "wb") as f:
+                f.write(bomb)
+            output_file = os.path.join(temp_dir, "bomb.json")
+            result = subprocess.run(
+                command + ["-i", input_file, "-o", output_file, "--max-ratio", "10"],
+                capture_output=True,
+            )
+            self.assertEqual(result.returncode, 1)
+            self.assertFalse(os.path.exists(output_file))
+            result = subprocess.run(
+                command
+                + [input_file, "--output-dir", temp_dir, "--max-output-size", "1K"],
+                capture_output=True,
+            )
+            self.assertEqual(result.returncode, 1)
+            self.assertIn(b"Decompressed 0 of 1 files", result.stdout)
+
+        result = subprocess.run(
+            command + ["--max-output-size", "lots"], input=bomb, capture_output=True
+        )
+        self.assertEqual(result.returncode, 2)
+
     def test_decompress_files(self) -> None:
         data = {"file": "decompress"}
         compressed = jsonbrotliminifyer.compress_json(data)
@@ -346,6 +1418,28 @@ class TestCli(unittest.TestCase):
         self.assertNotEqual(result.returncode, 0)
         self.assertIn("Error", result.stderr)
 
+    def test_compress_budget_needs_auto(self) -> None:
+        command = [sys.executable, "-m", "jsonbrotliminifyer", "compress"]
+        for options, message in (
+            (["--budget", "20"], "--budget requires -q auto"),
+            (["-q", "5", "--budget", "20"], "--budget requires -q auto"),
+            (["-q", "auto", "--budget", "0"], "--budget must be positive"),
+        ):
+            with self.subTest(options=options):
+                result = subprocess.run(
+                    command + options, input="{}", capture_output=True, text=True
+                )
+                self.assertEqual(result.returncode, 2)
+                self.assertIn(message, result.stderr)
+                self.assertNotIn("Traceback", result.stderr)
+        compressed = subprocess.run(
+            command + ["-q", "auto", "--budget", "20"],
+            input=b"{}",
+            capture_output=True,
+        )
+        self.assertEqual(compressed.returncode, 0, compressed.stderr)
+        self.assertEqual(jsonbrotliminifyer.decompress_json(compressed.stdout), {})
+
     def test_compress_missing_output_file(self) -> None:
         with tempfile.TemporaryDirectory() as temp_dir:
             input_file = os.path.join(temp_dir, "input.json")
@@ -366,6 +1460,157 @@ class TestCli(unittest.TestCase):
             self.assertNotEqual(result.returncode, 0)
             self.assertIn("required", result.stderr)
 
+    def test_batch(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = os.path.join(temp_dir, "source")
+            os.makedirs(os.path.join(source, "nested"))
+            documents = {
+                "a.json": {"a": 1},
+                "b.json": {"b": 2},
+                "skip.json": {"skip": True},
+                os.path.join("nested", "a.json"): {"nested": 3},
+            }
+            for name, document in documents.items():
+                with open(os.path.join(source, name), "w") as f:
+                    json.dump(document, f)
+            with open(os.path.join(source, "notes.txt"), "w") as f:
+                f.write("not json")
+            command = [sys.executable, "-m", "jsonbrotliminifyer"]
+            compressed = os.path.join(temp_dir, "compressed")
+            result = subprocess.run(
+                command
+                + [
+                    "compress",
+                    source,
+                    "--output-dir",
+                    compressed,
+                    "--recursive",
+                    "--exclude",
+                    "skip*",
+                    "--workers",
+                    "2",
+                    "-q",
+                    "5",
+                ],
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertIn("Compressed 3 of 3 files", result.stdout)
+            self.assertEqual(sorted(os.listdir(compressed)), ["a.br", "b.br", "nested"])
+            with open(os.path.join(compressed, "nested", "a.br"), "rb") as f:
+                self.assertEqual(
+                    jsonbrotliminifyer.decompress_json(f.read()), {"nested": 3}
+                )
+
+            # Inputs from a job list; a missing file fails alone
+            jobs = os.path.join(temp_dir, "jobs.txt")
+            with open(jobs, "w") as f:
+                f.write(os.path.join(compressed, "a.br") + "\n\n")
+                f.write(os.path.join(compressed, "missing.br") + "\n")
+            restored = os.path.join(temp_dir, "restored")
+            result = subprocess.run(
+                command
+                + [
+                    "decompress",
+                    os.path.join(compressed, "b.br"),
+                    "--jobs-from",
+                    jobs,
+                    "--output-dir",
+                    restored,
+                    "--executor",
+                    "process",
+                ],
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(result.returncode, 1)
+            self.assertIn("Decompressed 2 of 3 files", result.stdout)
+            self.assertIn("missing.br", result.stderr)
+            self.assertEqual(sorted(os.listdir(restored)), ["a.json", "b.json"])
+
+            # Without --recursive only the top level is taken
+            result = subprocess.run(
+                command
+                + ["decompress", compressed, "--output-dir", restored, "-o", "x"],
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(result.returncode, 1)
+            result = subprocess.run(
+                command + ["decompress", compressed, "--output-dir", restored],
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(result.returncode, 0)
+            self.assertIn("Decompressed 2 of 2 files", result.stdout)
+
+            # Options of the single-input paths are refused, not dropped
+            for options in (
+                ["compress", source, "--validate", "scan"],
+                ["decompress", compressed, "--compact"],
+                ["decompress", compressed, "--raw"],
+                ["decompress", compressed, "--validate", "scan"],
+            ):
+                with self.subTest(options=options):
+                    result = subprocess.run(
+                        command + options + ["--output-dir", restored],
+                        capture_output=True,
+                        text=True,
+                    )
+                    self.assertEqual(result.returncode, 2)
+                    self.assertIn("needs a single input", result.stderr)
+
+    def test_stream_pipeline(self) -> None:
+        data = {"rows": [{"id": i, "name": f"row {i}"} for i in range(20000)]}
+        text = json.dumps(data, indent=2).encode()
+        command = [sys.executable, "-m", "jsonbrotliminifyer"]
+        result = subprocess.run(
+            command + ["compress", "-q", "5"], input=text, capture_output=True
+        )
+        self.assertEqual(result.returncode, 0)
+        compressed = result.stdout
+        self.assertEqual(jsonbrotliminifyer.decompress_json(compressed), data)
+
+        # Output starts while the input is still arriving
+        process = subprocess.Popen(
+            command + ["decompress", "--compact"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        assert process.stdin is not None and process.stdout is not None
+        timer = threading.Timer(30, process.kill)
+        timer.start()
+        try:
+            process.stdin.write(compressed[: len(compressed) // 2])
+            process.stdin.flush()
+            self.assertEqual(process.stdout.read(9), b'{"rows":[')
+            process.stdin.write(compressed[len(compressed) // 2 :])
+            process.stdin.close()
+            rest = process.stdout.read()
+            self.assertEqual(process.wait(), 0)
+        finally:
+            timer.cancel()
+        self.assertEqual(json.loads(b'{"rows":[' + rest), data)
+
+        result = subprocess.run(
+            command + ["decompress"], input=compressed, capture_output=True
+        )
+        self.assertEqual(result.stdout.decode(), json.dumps(data, indent=2))
+
+        # Validation is optional when the input is not minified
+        for validate, returncode in (
+            (["--validate", "scan"], 1),
+            ([], 1),
+            (["--raw"], 0),
+        ):
+            result = subprocess.run(
+                command + ["compress"] + validate,
+                input=b'{"a": [1, 2}',
+                capture_output=True,
+            )
+            self.assertEqual(result.returncode, returncode)
+
     def test_help(self) -> None:
         result = subprocess.run(
             [sys.executable, "-m", "jsonbrotliminifyer", "--help"],
@@ -0,0 +1,110 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import unittest
+from typing import Any, List
+
+import brotli
+
+import jsonbrotliminifyer
+from jsonbrotliminifyer import JsonlReader, JsonlWriter
+
+
+def _records(count: int) -> List[Any]:
+    return [
+        {"id": i, "level": ["info", "warn"][i % 2], "msg": f"event {i}", "ok": None}
+        for i in range(count)
+    ]
+
+
+class TestJsonl(unittest.TestCase):
+    def test_roundtrip(self) -> None:
+        records = _records(2000) + [[1, 2], "text\nwith newline", 3.5, None, {}]
+        for flush_bytes in (None, 64, jsonbrotliminifyer.DEFAULT_FLUSH_BYTES):
+            with self.subTest(flush_bytes=flush_bytes):
+                buffer = io.BytesIO()
+                with JsonlWriter(buffer, quality=5, flush_bytes=flush_bytes) as writer:
+                    self.assertEqual(writer.write_many(records), len(records))
+                self.assertFalse(buffer.closed)
+                data = buffer.getvalue()
+                lines = brotli.decompress(data).decode().splitlines()
+                self.assertEqual([json.loads(line) for line in lines], records)
+                for chunk_size in (1, 7, 4096):
+                    reader = JsonlReader(io.BytesIO(data), chunk_size=chunk_size)
+                    self.assertEqual(list(reader), records)
+                    self.assertEqual(reader.records, len(records))
+
+    def test_paths(self) -> None:
+        records = _records(100)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "events.jsonl.br")
+            with JsonlWriter(path) as writer:
+                for record in records:
+                    writer.write(record)
+            with JsonlReader(path) as reader:
+                self.assertEqual(list(reader), records)
+            with self.assertRaises(ValueError):
+                JsonlReader(os.path.join(temp_dir, "missing.br"))
+
+    def test_flush_points_make_records_readable(self) -> None:
+        buffer = io.BytesIO()
+        writer = JsonlWriter(buffer, flush_bytes=None)
+        writer.write_many(_records(50))
+        writer.flush()
+        flushed = buffer.getvalue()
+        writer.write_many(_records(10))
+        writer.close()
+
+        # The stream is unfinished, but everything before the flush point decodes
+        read: List[Any] = []
+        with self.assertRaises(ValueError):
+            for record in JsonlReader(io.BytesIO(flushed)):
+                read.append(record)
+        self.assertEqual(read, _records(50))
+        self.assertEqual(
+            list(JsonlReader(io.BytesIO(buffer.getvalue()))),
+            _records(50) + _records(10),
+        )
+
+    def test_socket(self) -> None:
+        records = _records(300)
+        left, right = socket.socketpair()
+        with left, right:
+            with left.makefile("wb") as stream:
+                with JsonlWriter(stream, quality=5) as writer:
+                    writer.write_many(records)
+            left.shutdown(socket.SHUT_WR)
+            self.assertEqual(list(JsonlReader(right)), records)
+
+    def test_plain_brotli_jsonl(self) -> None:
+        text = '{"a": 1}\n\n{"a": 2}\r\n  \n{"a": 3}'
+        data = brotli.compress(text.encode())
+        self.assertEqual(
+            list(JsonlReader(io.BytesIO(data))), [{"a": i} for i in (1, 2, 3)]
+        )
+
+    def test_invalid(self) -> None:
+        data = brotli.compress(b'{"a": 1}\n{"a": \n')
+        with self.assertRaises(ValueError) as cm:
+            list(JsonlReader(io.BytesIO(data)))
+        self.assertIn("line 2", str(cm.exception))
+        with self.assertRaises(ValueError):
+            list(JsonlReader(io.BytesIO(b"not brotli at all")))
+        with self.assertRaises(ValueError):
+            JsonlReader(object())
+        with self.assertRaises(ValueError):
+            JsonlWriter(io.BytesIO(), flush_bytes=0)
+        with self.assertRaises(ValueError):
+            JsonlWriter(io.BytesIO(), quality=12)
+        with self.assertRaises(ValueError):
+            JsonlWriter(io.BytesIO(), quality="auto")  # type: ignore[arg-type]
+        writer = JsonlWriter(io.BytesIO())
+        writer.close()
+        with self.assertRaises(ValueError):
+            writer.write({})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,284 @@
+import json
+import random
+import unittest
+
+from typing import Any, Iterator, List, Optional
+
+from jsonbrotliminifyer._pointer import format_pointer
+from jsonbrotliminifyer._scanner import (
+    JsonCursor,
+    JsonReformatter,
+    JsonScanner,
+    JsonTokenizer,
+    JsonValidator,
+    find_value,
+)
+
+
+def _validate(text: str, chunk_size: int) -> None:
+    validator = JsonValidator()
+    for i in range(0, len(text), chunk_size):
+        validator.feed(text[i : i + chunk_size])
+    validator.close()
+
+
+class TestJsonValidator(unittest.TestCase):
+    def test_valid_documents(self) -> None:
+        documents = [
+            json.dumps({"a": [1, -2.5e-3, True, None, 'x"y\u00e9'], "b": {}}),
+            json.dumps([{"nested": [[], {}]}], indent=2),
+            json.dumps({"nan": float("nan"), "inf": float("-inf")}),
+            "12345678901234567890",
+            '  "just a string"  ',
+        ]
+        for text in documents:
+            for chunk_size in (1, 2, 3, 7, len(text)):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    _validate(text, chunk_size)
+
+    def test_invalid_documents(self) -> None:
+        documents = [
+            "",
+            "{",
+            '{"a"}',
+            "[1,]",
+            "[1 2]",
+            '{"a": 1,}',
+            "tru",
+            "01",
+            "1.",
+            "[1]]",
+            "{}{}",
+            '"\\x"',
+            '"unterminated',
+            "{1: 2}",
+            "[truex]",
+            '["\n"]',
+            '["a\tb"]',
+        ]
+        for text in documents:
+            for chunk_size in (1, 2, max(len(text), 1)):
+                with self.subTest(text=text, chunk_size=chunk_size):
+                    with self.assertRaises(ValueError):
+                        _validate(text, chunk_size)
+
+    def test_tokens_split_across_chunks(self) -> None:
+        tokenizer = JsonTokenizer()
+        tokens = []
+        for piece in ["[1", "2.", "5e", '3, "a', 'b", tr', "ue]"]:
+            tokens.extend(tokenizer.feed(piece))
+        tokens.extend(tokenizer.feed("", final=True))
+        self.assertEqual(tokens, ["[", "12.5e3", ",", '"ab"', ",", "true", "]"])
+
+    def test_long_whitespace_run(self) -> None:
+        # Trailing whitespace is skipped in one pass, not rescanned per character
+        tokenizer = JsonTokenizer()
+        self.assertEqual(tokenizer.feed("[1, " + " " * (4 << 20)), ["[", "1", ","])
+        self.assertEqual(tokenizer.feed(" \n" * 1000), [])
+        self.assertEqual(tokenizer.feed('"a  " ]', final=True), ['"a  "', "]"])
+
+    def test_agrees_with_json_module(self) -> None:
+        alphabet = '[]{},:" 0123456789.-eEtruefalsnl\\ua\n\t\x01'
+        base = '{"a": [1, 2.5e-3, "x\\"y\\u00e9", true, null, {"b": {}}], "c": []}'
+        rng = random.Random(2)
+        for _ in range(2000):
+            text = list(base)
+            for _ in range(rng.randint(1, 3)):
+                text.insert(rng.randrange(len(text)), rng.choice(alphabet))
+                del text[rng.randrange(len(text))]
+            data = "".join(text)
+            try:
+                json.loads(data)
+                valid = True
+            except ValueError:
+                valid = False
+            # Random chunk boundaries, so a token may be split anywhere
+            cuts = sorted(
+                rng.sample(range(1, len(data)), rng.randint(0, len(data) // 2))
+            )
+            chunks = [data[i:j] for i, j in zip([0] + cuts, cuts + [len(data)])]
+            with self.subTest(data=data, chunks=chunks):
+                validator = JsonValidator()
+                if valid:
+                    for chunk in chunks:
+                        validator.feed(chunk)
+                    validator.close()
+                else:
+                    with self.assertRaises(ValueError):
+                        for chunk in chunks:
+                            validator.feed(chunk)
+                        validator.close()
+
+
+class TestJsonReformatter(unittest.TestCase):
+    def test_matches_json_module(self) -> None:
+        documents = [
+            {"a": [1, 2.5, {"b": [], "c": {}, "d": "x, y: [z]"}], "e": None},
+            [[[]], [{}], "", -0.0, 1e100, True],
+            {"": {"nested": {"deeper": [1, [2, [3]]]}}},
+            "string",
+            [],
+        ]
+        for document in documents:
+            for indent in (None, 2, 4):
+                separators = (",", ":") if indent is None else None
+                expected = json.dumps(document, indent=indent, separators=separators)
+                source = json.dumps(document, indent=3)
+                for chunk_size in (1, 7, len(source)):
+                    tokenizer = JsonTokenizer()
+                    reformatter = JsonReformatter(indent)
+                    out = []
+                    for i in range(0, len(source), chunk_size):
+                        tokens = tokenizer.feed(source[i : i + chunk_size])
+                        out.append(reformatter.format(tokens))
+                    tokens = tokenizer.feed("", final=True)
+                    out.append(reformatter.format(tokens, final=True))
+                    self.assertEqual("".join(out), expected)
+
+
+def _scan(data: bytes, chunk_size: int) -> None:
+    scanner = JsonScanner()
+    for i in range(0, len(data), chunk_size):
+        scanner.feed(data[i : i + chunk_size])
+    scanner.close()
+
+
+class TestJsonScanner(unittest.TestCase):
+    def test_valid_documents(self) -> None:
+        documents = [
+            json.dumps({"a": [1, -2.5e-3, True, None, 'x"y\u00e9\\'], "b": {}}),
+            json.dumps([{"nested": [[], {}]}], indent=2),
+            json.dumps({"nan": float("nan"), "inf": float("-inf")}),
+            json.dumps({"é": "\t\u2028", "k": [10, 0.05, 1e100]}, ensure_ascii=False),
+            "12345678901234567890",
+            '  "just a string"  ',
+            '["\\\\", "\\"\\\\", "\\u00e9"]',
+            "[" * 500 + "]" * 500,
+        ]
+        for text in documents:
+            data = text.encode("utf-8")
+            for chunk_size in (1, 2, 3, 7, len(data)):
+                with self.subTest(text=text[:40], chunk_size=chunk_size):
+                    _scan(data, chunk_size)
+
+    def test_invalid_documents(self) -> None:
+        documents = [
+            b"",
+            b"{",
+            b'{"a"}',
+            b"[1,]",
+            b"[1 2]",
+            b'{"a": 1,}',
+            b"tru",
+            b"01",
+            b"-01",
+            b"1.",
+            b"[1]]",
+            b"{}{}",
+            b'"\\x"',
+            b'"unterminated',
+            b"{1: 2}",
+            b"[truex]",
+            b'fal"x"e',
+            b'["\\u00e", "b"]',
+            b'["\\u12\\t34"]',
+            b'["\\u1\\n\\/23"]',
+            b'["a\tb"]',
+            b"[\x01]",
+            b'["\xff"]',
+            b'[\\"a"]',
+            b'{"a" "b"}',
+            b"[:]",
+        ]
+        for data in documents:
+            for chunk_size in (1, 2, max(len(data), 1)):
+                with self.subTest(data=data, chunk_size=chunk_size):
+                    with self.assertRaises(ValueError):
+                        _scan(data, chunk_size)
+
+    def test_agrees_with_json_module(self) -> None:
+        alphabet = '[]{},:" 0123456789.-eEtruefalsnl\\ua'
+        base = '{"a": [1, 2.5e-3, "x\\"y\\u00e9", true, null, {"b": {}}], "c": []}'
+        rng = random.Random(1)
+        for _ in range(2000):
+            text = list(base)
+            for _ in range(rng.randint(1, 3)):
+                text.insert(rng.randrange(len(text)), rng.choice(alphabet))
+                del text[rng.randrange(len(text))]
+            data = "".join(text).encode("utf-8")
+            try:
+                json.loads(data)
+                valid = True
+            except ValueError:
+                valid = False
+            for chunk_size in (3, len(data)):
+                with self.subTest(data=data, chunk_size=chunk_size):
+                    if valid:
+                        _scan(data, chunk_size)
+                    else:
+                        with self.assertRaises(ValueError):
+                            _scan(data, chunk_size)
+
+
+def _find(text: str, path: List[str], chunk_size: int) -> Optional[Any]:
+    data = text.encode("utf-8")
+    blocks = (data[i : i + chunk_size] for i in range(0, len(data), chunk_size))
+    found = find_value(JsonCursor(blocks), path)
+    return None if found is None else json.loads(found)
+
+
+def _pointers(value: Any, path: List[str]) -> Iterator[List[str]]:
+    yield path
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from _pointers(item, path + [key])
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            yield from _pointers(item, path + [str(index)])
+
+
+class TestFindValue(unittest.TestCase):
+    def test_every_pointer(self) -> None:
+        document = {
+            "meta": {"version": "3.1", "tags": ["a", "b,c", "[{"]},
+            "tricky": ['x"]}', "\\", '\\"', "caf\u00e9 \u2603", "a/b~c"],
+            "items": [{"id": i, "v": [i, {"w": None}], "s": "]" * i} for i in range(6)],
+            "empty": [[], {}, ""],
+            "a/b~c": {"": -1.5e-3},
+        }
+        text = json.dumps(document, indent=1, ensure_ascii=False)
+        for chunk_size in (1, 2, 5, 64, len(text)):
+            for path in _pointers(document, []):
+                expected: Any = document
+                for token in path:
+                    expected = expected[int(token) if type(expected) is list else token]
+                with self.subTest(pointer=format_pointer(path), chunk_size=chunk_size):
+                    self.assertEqual(_find(text, path, chunk_size), expected)
+
+    def test_missing(self) -> None:
+        text = '{"a": [1, {"b": 2}], "c": "d"}'
+        for path in (
+            ["x"],
+            ["a", "2"],
+            ["a", "1", "c"],
+            ["c", "0"],
+            ["a", "1", "b", "0"],
+        ):
+            with self.subTest(path=path):
+                self.assertIsNone(_find(text, path, 3))
+        with self.assertRaises(ValueError):
+            _find(text, ["a", "-1"], 3)
+
+    def test_long_skips(self) -> None:
+        # Values larger than the skip window, and strings spanning windows
+        items = [{"id": i, "text": '"\\' * (i % 50) + "x" * 9000} for i in range(30)]
+        text = json.dumps({"items": items, "last": [list(range(3000)), "end"]})
+        for chunk_size in (1000, 65536):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(_find(text, ["items", "27"], chunk_size), items[27])
+                self.assertEqual(_find(text, ["last", "1"], chunk_size), "end")
+                self.assertIsNone(_find(text, ["items", "30"], chunk_size))
+
+
+if __name__ == "__main__":
+    unittest.main()
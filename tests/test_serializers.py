@@ -0,0 +1,148 @@
+import dataclasses
+import datetime
+import enum
+import importlib.util
+import json
+import math
+import pickle
+import unittest
+
+import brotli
+
+import jsonbrotliminifyer
+from jsonbrotliminifyer.serializers import OrjsonSerializer, Serializer, get_serializer
+
+
+@dataclasses.dataclass
+class _Point:
+    x: int
+    y: int
+
+
+class _Flag(enum.IntEnum):
+    ON = 1
+
+
+class _Name(str):
+    pass
+
+
+class TestSerializers(unittest.TestCase):
+    def test_compact_output(self) -> None:
+        data = {"key": "value", "list": [1, 2, {"nested": "é"}]}
+        compressed = jsonbrotliminifyer.compress_json(data, serializer="json")
+        self.assertEqual(
+            brotli.decompress(compressed),
+            '{"key":"value","list":[1,2,{"nested":"é"}]}'.encode("utf-8"),
+        )
+
+    def test_backends_round_trip(self) -> None:
+        data = {
+            "str": "text ☃ \ud800",
+            "int": -42,
+            "big": 2**70,
+            "float": 0.1,
+            "bool": [True, False, None],
+            "nested": {"list": [[], {}]},
+        }
+        for name in jsonbrotliminifyer.available_serializers():
+            with self.subTest(serializer=name):
+                compressed = jsonbrotliminifyer.compress_json(data, serializer=name)
+                # Payloads from every backend decode with any other backend
+                for reader in ("json", name):
+                    self.assertEqual(
+                        jsonbrotliminifyer.decompress_json(
+                            compressed, serializer=reader
+                        ),
+                        data,
+                    )
+
+    def test_non_finite_floats_and_unsupported_types(self) -> None:
+        data = {
+            "nan": float("nan"),
+            "inf": [float("inf"), float("-inf")],
+            "x": 1.5,
+            "rows": [{"a": None, "b": [1, (2.5, float("nan"))]}],
+        }
+        for name in ("auto", *jsonbrotliminifyer.available_serializers()):
+            with self.subTest(serializer=name):
+                compressed = jsonbrotliminifyer.compress_json(data, serializer=name)
+                result = jsonbrotliminifyer.decompress_json(compressed)
+                self.assertTrue(math.isnan(result["nan"]))
+                self.assertEqual(result["inf"], [float("inf"), float("-inf")])
+                self.assertEqual(result["x"], 1.5)
+                self.assertIsNone(result["rows"][0]["a"])
+                self.assertTrue(math.isnan(result["rows"][0]["b"][1][1]))
+                for value in (
+                    datetime.datetime(2024, 1, 1),
+                    _Point(1, 2),
+                    {1j},
+                ):
+                    with self.assertRaises(TypeError):
+                        jsonbrotliminifyer.compress_json([value], serializer=name)
+
+    @unittest.skipIf(importlib.util.find_spec("orjson") is None, "needs orjson")
+    def test_orjson_subclasses(self) -> None:
+        data = {"flag": _Flag.ON, "name": _Name("x"), "none": None}
+        compressed = jsonbrotliminifyer.compress_json(data, serializer="orjson")
+        self.assertEqual(
+            brotli.decompress(compressed), b'{"flag":1,"name":"x","none":null}'
+        )
+
+    @unittest.skipIf(importlib.util.find_spec("orjson") is None, "needs orjson")
+    def test_orjson_writes_none(self) -> None:
+        # Only non-finite floats send a document to the stdlib, not null itself
+        serializer = OrjsonSerializer()
+        data = [{"id": i, "value": None, "score": i / 2} for i in range(10)]
+        self.assertEqual(
+            serializer._dumps(data), json.dumps(data).replace(" ", "").encode()
+        )
+        for value in (float("nan"), float("inf"), [[{"a": (float("-inf"),)}]]):
+            with self.assertRaises(ValueError):
+                serializer._dumps([None, value])
+
+    def test_stdlib_payload_with_big_int_and_nan(self) -> None:
+        payload = b'{"big": 123456789012345678901234567890, "nan": NaN}'
+        for name in jsonbrotliminifyer.available_serializers():
+            with self.subTest(serializer=name):
+                result = get_serializer(name).loads(payload)
+                self.assertEqual(result["big"], 123456789012345678901234567890)
+                self.assertNotEqual(result["nan"], result["nan"])
+
+    def test_invalid_json_raises_value_error(self) -> None:
+        for name in jsonbrotliminifyer.available_serializers():
+            with self.subTest(serializer=name):
+                with self.assertRaises(ValueError):
+                    get_serializer(name).loads(b'{"a": ')
+
+    def test_pretty_output(self) -> None:
+        data = {"a": [1, 2]}
+        for name in jsonbrotliminifyer.available_serializers():
+            with self.subTest(serializer=name):
+                pretty = get_serializer(name).dumps(data, pretty=True)
+                self.assertEqual(pretty.decode("utf-8"), json.dumps(data, indent=2))
+
+    def test_unknown_serializer(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            jsonbrotliminifyer.compress_json({}, serializer="yaml")
+        self.assertIn("Unknown serializer", str(cm.exception))
+
+    @unittest.skipIf(
+        importlib.util.find_spec("ujson") is not None, "ujson is installed"
+    )
+    def test_missing_backend(self) -> None:
+        with self.assertRaises(ValueError) as cm:
+            get_serializer("ujson")
+        self.assertIn("not installed", str(cm.exception))
+
+    def test_auto_and_instances(self) -> None:
+        auto = get_serializer("auto")
+        self.assertIn(auto.name, jsonbrotliminifyer.available_serializers())
+        custom = Serializer()
+        self.assertIs(get_serializer(custom), custom)
+        # Instances can be sent to process pool workers
+        self.assertEqual(pickle.loads(pickle.dumps(auto)).name, auto.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
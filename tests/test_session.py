@@ -0,0 +1,156 @@
+import concurrent.futures
+import json
+import os
+import tempfile
+import unittest
+from typing import List
+
+import brotli
+
+import jsonbrotliminifyer
+from jsonbrotliminifyer import BrotliJsonSession
+
+
+def _write_inputs(temp_dir: str, count: int) -> List[str]:
+    input_files = []
+    for i in range(count):
+        path = os.path.join(temp_dir, f"input{i}.json")
+        with open(path, "w") as f:
+            json.dump({"file": i, "values": list(range(100))}, f)
+        input_files.append(path)
+    return input_files
+
+
+class TestSession(unittest.TestCase):
+    def test_defaults_and_overrides(self) -> None:
+        data = {"values": list(range(1000))}
+        with BrotliJsonSession(quality=1, serializer="json") as session:
+            compressed = session.compress_json(data)
+            self.assertEqual(compressed, jsonbrotliminifyer.compress_json(data, 1))
+            self.assertEqual(session.decompress_json(compressed), data)
+            self.assertEqual(
+                session.compress_json(data, quality=11),
+                jsonbrotliminifyer.compress_json(data, 11),
+            )
+            raw = json.dumps(data).encode()
+            compressed = session.compress_json_bytes(raw, validate="scan")
+            self.assertEqual(brotli.decompress(compressed), raw)
+            with self.assertRaises(ValueError):
+                session.compress_json_bytes(b"{", validate="scan")
+
+        # A numeric quality per call drops the session's time budget
+        with BrotliJsonSession(quality="auto", budget_ms_per_mb=20) as session:
+            self.assertEqual(
+                session.compress_json(data, quality=5),
+                jsonbrotliminifyer.compress_json(data, 5),
+            )
+            with tempfile.TemporaryDirectory() as temp_dir:
+                input_file = os.path.join(temp_dir, "data.json")
+                with open(input_file, "w") as f:
+                    json.dump(data, f)
+                output_file = os.path.join(temp_dir, "data.json.br")
+                session.compress_json_file(input_file, output_file, quality=5)
+                with open(output_file, "rb") as f:
+                    self.assertEqual(jsonbrotliminifyer.decompress_json(f.read()), data)
+            self.assertEqual(session.decompress_json(session.compress_json(data)), data)
+
+        with BrotliJsonSession(max_output_size=100) as session:
+            compressed = session.compress_json(data)
+            with self.assertRaises(jsonbrotliminifyer.DecompressionLimitError):
+                session.decompress_json(compressed)
+            self.assertEqual(
+                session.decompress_json(compressed, max_output_size=None), data
+            )
+
+    def test_files_reuse_pool(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = _write_inputs(temp_dir, 4)
+            missing = os.path.join(temp_dir, "missing.json")
+            compressed_dir = os.path.join(temp_dir, "compressed")
+            output_dir = os.path.join(temp_dir, "output")
+            with BrotliJsonSession(max_workers=2, quality=5) as session:
+                pool = session._pool
+                for _ in range(3):
+                    results = session.compress_json_files(
+                        input_files + [missing], compressed_dir
+                    )
+                    self.assertEqual(results[:4], [None] * 4)
+                    self.assertIsInstance(results[4], ValueError)
+                compressed = [
+                    os.path.join(compressed_dir, f"input{i}.br") for i in range(4)
+                ]
+                self.assertEqual(
+                    session.decompress_json_files(compressed, output_dir), [None] * 4
+                )
+                streamed = session.iter_compress_json_files(
+                    iter(input_files), compressed_dir, quality=1
+                )
+                self.assertEqual([error for _, _, error, _ in streamed], [None] * 4)
+                self.assertIs(session._pool, pool)
+
+                single = os.path.join(temp_dir, "single.br")
+                session.compress_json_file(input_files[0], single, streaming=True)
+                restored = os.path.join(temp_dir, "single.json")
+                session.decompress_json_file(single, restored)
+                with open(restored) as f:
+                    self.assertEqual(json.load(f)["file"], 0)
+            with open(os.path.join(output_dir, "input3.json")) as f:
+                self.assertEqual(json.load(f)["values"], list(range(100)))
+
+            with self.assertRaises(ValueError):
+                session.compress_json_files(input_files, compressed_dir)
+            with self.assertRaises(ValueError):
+                session.compress_json({})
+            session.close()
+
+    def test_process_pool(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = _write_inputs(temp_dir, 3)
+            compressed_dir = os.path.join(temp_dir, "compressed")
+            with BrotliJsonSession(executor="process", max_workers=2) as session:
+                for _ in range(2):
+                    self.assertEqual(
+                        session.compress_json_files(
+                            input_files, compressed_dir, quality=3
+                        ),
+                        [None] * 3,
+                    )
+            with open(os.path.join(compressed_dir, "input2.br"), "rb") as f:
+                self.assertEqual(
+                    jsonbrotliminifyer.decompress_json(f.read())["file"], 2
+                )
+
+    def test_caller_executor(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = _write_inputs(temp_dir, 3)
+            output_dir = os.path.join(temp_dir, "compressed")
+            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+                for incremental in (False, True):
+                    results = jsonbrotliminifyer.compress_json_files(
+                        input_files,
+                        output_dir,
+                        quality=3,
+                        executor=pool,
+                        incremental=incremental,
+                    )
+                    self.assertEqual(results, [None] * 3)
+                # The pool is left running for the caller
+                self.assertEqual(pool.submit(sum, [1, 2]).result(), 3)
+
+    def test_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            BrotliJsonSession(executor="auto")
+        with self.assertRaises(ValueError):
+            BrotliJsonSession(max_workers=0)
+        with self.assertRaises(ValueError):
+            BrotliJsonSession(quality=12)
+        with self.assertRaises(ValueError):
+            BrotliJsonSession(serializer="missing")
+        with self.assertRaises(ValueError):
+            BrotliJsonSession(max_output_size=0)
+        with self.assertRaises(ValueError):
+            jsonbrotliminifyer.compress_json_files([], ".", executor="fibers")
+
+
+if __name__ == "__main__":
+    unittest.main()
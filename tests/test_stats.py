@@ -0,0 +1,182 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from typing import List, Tuple
+
+import jsonbrotliminifyer
+from jsonbrotliminifyer import StageStats
+
+
+def _write_inputs(temp_dir: str, count: int) -> List[str]:
+    input_files = []
+    for i in range(count):
+        path = os.path.join(temp_dir, f"input{i}.json")
+        with open(path, "w") as f:
+            json.dump({"file": i, "values": list(range(500))}, f)
+        input_files.append(path)
+    return input_files
+
+
+class TestStageStats(unittest.TestCase):
+    def test_file_round_trip(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (input_file,) = _write_inputs(temp_dir, 1)
+            compressed = os.path.join(temp_dir, "data.br")
+            restored = os.path.join(temp_dir, "data.json")
+            stats = StageStats()
+            jsonbrotliminifyer.compress_json_file(
+                input_file, compressed, 5, stats=stats
+            )
+            stages = stats.stages()
+            self.assertEqual(
+                list(stages),
+                ["read", "parse", "serialize", "compress", "write", "replace"],
+            )
+            size = os.path.getsize(input_file)
+            self.assertEqual(stages["read"].bytes_in, size)
+            self.assertEqual(stages["compress"].bytes_out, os.path.getsize(compressed))
+            self.assertEqual(stages["compress"].bytes_in, stages["serialize"].bytes_out)
+            self.assertTrue(all(totals.calls == 1 for totals in stages.values()))
+            self.assertGreater(stats.summary()["ratio"], 1)
+
+            stats.reset()
+            jsonbrotliminifyer.decompress_json_file(compressed, restored, stats=stats)
+            stages = stats.stages()
+            self.assertEqual(list(stages)[:3], ["read", "decompress", "parse"])
+            self.assertEqual(stages["decompress"].bytes_in, os.path.getsize(compressed))
+            self.assertIn("decompress", stats.format())
+
+            stats.reset()
+            jsonbrotliminifyer.compress_json_file(
+                input_file, compressed, raw=True, validate="scan", stats=stats
+            )
+            self.assertEqual(
+                list(stats.stages()),
+                ["read", "validate", "compress", "write", "replace"],
+            )
+            stats.reset()
+            jsonbrotliminifyer.compress_json_file(
+                input_file, compressed, streaming=True, stats=stats
+            )
+            self.assertEqual(stats.stages()["compress"].bytes_in, size)
+
+    def test_memory_estimates(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = _write_inputs(temp_dir, 2)
+            output_dir = os.path.join(temp_dir, "out")
+            stats = StageStats()
+            results = jsonbrotliminifyer.compress_json_files(
+                input_files, output_dir, 5, memory_limit=1 << 30, stats=stats
+            )
+            self.assertEqual(results, [None, None])
+            estimates = stats.memory_estimates()
+            self.assertEqual(sorted(estimates), sorted(input_files))
+            self.assertTrue(all(estimate > 0 for estimate in estimates.values()))
+            stats.reset()
+            self.assertEqual(stats.memory_estimates(), {})
+
+    def test_hooks(self) -> None:
+        seen: List[Tuple[str, float, int, int]] = []
+
+        def hook(stage: str, seconds: float, bytes_in: int, bytes_out: int) -> None:
+            seen.append((stage, seconds, bytes_in, bytes_out))
+
+        stats = StageStats()
+        stats.add_hook(hook)
+        compressed = jsonbrotliminifyer.compress_json({"a": 1}, stats=stats)
+        self.assertEqual([record[0] for record in seen], ["serialize", "compress"])
+        self.assertEqual(seen[1][3], len(compressed))
+        stats.remove_hook(hook)
+        jsonbrotliminifyer.decompress_json(compressed, stats=stats)
+        self.assertEqual(len(seen), 2)
+        self.assertEqual(stats.stages()["serialize"].calls, 1)
+        with self.assertRaises(ValueError):
+            stats.remove_hook(hook)
+
+    def test_batch(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_files = _write_inputs(temp_dir, 6)
+            output_dir = os.path.join(temp_dir, "compressed")
+            for executor in ("thread", "process"):
+                seen: List[str] = []
+                stats = StageStats()
+                stats.add_hook(lambda stage, *_, seen=seen: seen.append(stage))
+                results = jsonbrotliminifyer.compress_json_files(
+                    input_files,
+                    output_dir,
+                    quality=3,
+                    max_workers=2,
+                    executor=executor,
+                    stats=stats,
+                )
+                self.assertEqual(results, [None] * 6)
+                self.assertEqual(stats.stages()["compress"].calls, 6)
+                self.assertEqual(seen.count("read"), 6)
+                self.assertEqual((stats.files, stats.batches), (6, 1))
+                summary = stats.summary()
+                self.assertEqual(
+                    summary["input_bytes"],
+                    sum(os.path.getsize(path) for path in input_files),
+                )
+                self.assertIsNotNone(summary["mib_per_s"])
+                utilization = summary["utilization"]
+                self.assertTrue(1 <= len(utilization) <= 2)
+                self.assertTrue(all(0 < share <= 1.5 for share in utilization.values()))
+
+            # Stats never reach the incremental manifest
+            stats = StageStats()
+            for _ in range(2):
+                results = jsonbrotliminifyer.compress_json_files(
+                    input_files, output_dir, quality=3, incremental=True, stats=stats
+                )
+                self.assertEqual(results, [None] * 6)
+            self.assertEqual(stats.stages()["compress"].calls, 6)
+            # The second run finds every output up to date and runs no task
+            self.assertEqual((stats.files, stats.batches), (6, 2))
+
+            stats = StageStats()
+            compressed = [os.path.join(output_dir, f"input{i}.br") for i in range(6)]
+            streamed = jsonbrotliminifyer.iter_decompress_json_files(
+                compressed, os.path.join(temp_dir, "restored"), stats=stats
+            )
+            for _ in streamed:
+                pass
+            self.assertEqual(stats.stages()["decompress"].calls, 6)
+            self.assertEqual(stats.files, 6)
+
+    def test_session_default(self) -> None:
+        stats = StageStats()
+        with jsonbrotliminifyer.BrotliJsonSession(quality=1, stats=stats) as session:
+            session.decompress_json(session.compress_json([1, 2, 3]))
+        self.assertEqual(
+            list(stats.stages()), ["serialize", "compress", "decompress", "parse"]
+        )
+
+    def test_cli(self) -> None:
+        data = {"values": list(range(100))}
+        result = subprocess.run(
+            [sys.executable, "-m", "jsonbrotliminifyer", "compress", "--stats"],
+            input=json.dumps(data).encode(),
+            capture_output=True,
+        )
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(jsonbrotliminifyer.decompress_json(result.stdout), data)
+        report = result.stderr.decode()
+        for stage in ("read", "parse", "serialize", "compress", "write", "ratio"):
+            self.assertIn(stage, report)
+
+        result = subprocess.run(
+            [sys.executable, "-m", "jsonbrotliminifyer", "decompress", "--stats"],
+            input=result.stdout,
+            capture_output=True,
+        )
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(json.loads(result.stdout), data)
+        self.assertIn("decompress", result.stderr.decode())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+import collections
+import os
+import json
+import math
+import random
+import struct
+import tempfile
+import unittest
+from typing import Any, List
+
+import brotli
+
+import jsonbrotliminifyer
+from jsonbrotliminifyer import _transforms
+
+
+def _roundtrip(obj: Any) -> Any:
+    return jsonbrotliminifyer.decompress_json(
+        jsonbrotliminifyer.compress_json(obj, columnar=True)
+    )
+
+
+class TestColumnar(unittest.TestCase):
+    def test_records_roundtrip(self) -> None:
+        rows = [{"id": i, "name": f"row{i}", "ok": i % 2 == 0} for i in range(50)]
+        documents = [
+            rows,
+            {"data": rows, "meta": {"count": 50}},
+            # Nested record lists inside a column
+            [{"id": i, "children": rows[:20]} for i in range(20)],
+            # A column that is itself a list of records
+            [{"id": i, "owner": {"name": f"n{i}", "tier": 1}} for i in range(20)],
+            rows[:3],
+            [],
+            [{}] * 20,
+            [1, "a", None, {"x": 1}],
+            {"scalar": 1.5},
+            "text",
+        ]
+        for document in documents:
+            with self.subTest(document=str(document)[:40]):
+                decoded = _roundtrip(document)
+                self.assertEqual(decoded, document)
+                self.assertEqual(
+                    json.dumps(decoded), json.dumps(document), "key order changed"
+                )
+
+    def test_records_stored_as_columns(self) -> None:
+        rows = [{"id": i, "name": f"row{i}"} for i in range(20)]
+        payload = brotli.decompress(
+            jsonbrotliminifyer.compress_json(rows, columnar=True)
+        )
+        self.assertTrue(payload.startswith(_transforms.ENVELOPE_MAGIC))
+        # Each key is written once
+        self.assertEqual(payload.count(b'"name"'), 1)
+
+    def test_key_order_and_shape_mismatch(self) -> None:
+        rows = [{"a": 1, "b": 2}, {"b": 3, "a": 4}, {"a": 5, "b": 6}, {"a": 7}]
+        decoded = _roundtrip(rows)
+        self.assertEqual(decoded, rows)
+        self.assertEqual([list(row) for row in decoded], [list(row) for row in rows])
+
+    def test_marker_keys_are_escaped(self) -> None:
+        documents = [
+            {"\x00c": [["a"], [1]]},
+            [{"\x00c": i, "\x00\x00": "x"} for i in range(20)],
+            {"\x00": {"\x00n": 1}},
+        ]
+        for document in documents:
+            with self.subTest(document=document):
+                self.assertEqual(_roundtrip(document), document)
+
+    def test_container_subclasses(self) -> None:
+        # Subclasses serialize like dicts and lists, so their keys need escaping too
+        Pair = collections.namedtuple("Pair", "key value")
+        documents = [
+            [collections.OrderedDict([("\x00c", [["a"], [1]])])],
+            {"a": collections.OrderedDict([("\x00n", 1)])},
+            [collections.OrderedDict([("a", i), ("\x00c", i)]) for i in range(20)],
+            [Pair("\x00c", {"\x00n": i}) for i in range(20)],
+        ]
+        for document in documents:
+            for pack_numbers in (False, True):
+                with self.subTest(document=document, pack_numbers=pack_numbers):
+                    plain = jsonbrotliminifyer.decompress_json(
+                        jsonbrotliminifyer.compress_json(document)
+                    )
+                    compressed = jsonbrotliminifyer.compress_json(
+                        document, columnar=True, pack_numbers=pack_numbers
+                    )
+                    decoded = jsonbrotliminifyer.decompress_json(compressed)
+                    self.assertEqual(decoded, plain)
+
+    def test_matches_plain_json_semantics(self) -> None:
+        # Non-string keys and tuples come back the same way as without the transform
+        documents = [
+            [{1: "a", 2: "b"} for _ in range(20)],
+            [(1, 2), (3, 4)],
+            [{"t": (i, i)} for i in range(20)],
+        ]
+        for document in documents:
+            with self.subTest(document=document):
+                plain = jsonbrotliminifyer.decompress_json(
+                    jsonbrotliminifyer.compress_json(document)
+                )
+                self.assertEqual(_roundtrip(document), plain)
+
+    def test_invalid_envelope(self) -> None:
+        for payload in (
+            _transforms.ENVELOPE_MAGIC,
+            _transforms.ENVELOPE_MAGIC + b"\x80[]",
+            _transforms.wrap(b'{"\\u0000c":5}', _transforms.FLAG_COLUMNAR),
+        ):
+            with self.subTest(payload=payload):
+                with self.assertRaises(ValueError):
+                    jsonbrotliminifyer.decompress_json(brotli.compress(payload))
+
+    def test_files(self) -> None:
+        rows = [{"id": i, "value": i * 0.5} for i in range(100)]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = os.path.join(temp_dir, "input.json")
+            compressed_file = os.path.join(temp_dir, "compressed.br")
+            output_file = os.path.join(temp_dir, "output.json")
+            with open(input_file, "w") as f:
+                json.dump(rows, f)
+            jsonbrotliminifyer.compress_json_file(
+                input_file, compressed_file, columnar=True
+            )
+            for raw in (False, True):
+                with self.subTest(raw=raw):
+                    jsonbrotliminifyer.decompress_json_file(
+                        compressed_file, output_file, raw=raw, chunk_size=2
+                    )
+                    with open(output_file) as f:
+                        self.assertEqual(json.load(f), rows)
+
+            with self.assertRaises(ValueError):
+                jsonbrotliminifyer.compress_json_file(
+                    input_file, compressed_file, streaming=True, columnar=True
+                )
+
+
+def _bits(values: List[float]) -> bytes:
+    return struct.pack(f"<{len(values)}d", *values)
+
+
+class TestPackNumbers(unittest.TestCase):
+    def roundtrip(self, obj: Any, serializer: str = "auto") -> Any:
+        compressed = jsonbrotliminifyer.compress_json(
+            obj, serializer=serializer, pack_numbers=True
+        )
+        return jsonbrotliminifyer.decompress_json(compressed, serializer=serializer)
+
+    def test_int_arrays(self) -> None:
+        rng = random.Random(1)
+        arrays = [
+            list(range(100)),
+            [rng.randint(-100, 100) for _ in range(100)],
+            [rng.randint(-(2**40), 2**40) for _ in range(100)],
+            # Timestamps are stored as small deltas
+            [1700000000000 + i * 1000 + rng.randint(-5, 5) for i in range(100)],
+            [-(2**63), 2**63 - 1] * 50,
+            # Beyond 64 bits: left in the JSON text
+            [2**64 + i for i in range(100)],
+            [-(2**70)] + list(range(99)),
+        ]
+        for values in arrays:
+            with self.subTest(values=values[:3]):
+                decoded = self.roundtrip({"values": values})["values"]
+                self.assertEqual(decoded, values)
+                self.assertTrue(all(type(v) is int for v in decoded))
+
+    def test_float_arrays(self) -> None:
+        rng = random.Random(2)
+        arrays = [
+            [round(rng.uniform(-50, 50), 2) for _ in range(100)],
+            [rng.random() for _ in range(100)],
+            [float(i) for i in range(100)],
+            [0.1 * i for i in range(100)],
+            [1e300, -1e300, 5e-324, 0.0, -0.0] * 20,
+            [math.nan, math.inf, -math.inf, -0.0, 1.5] * 20,
+            [2.5e20 + i for i in range(100)],
+            # Scaling overflows to infinity, on the prefix or only further on
+            [1e308, 0.5] * 40,
+            [0.5] * 64 + [1e308] * 10,
+        ]
+        for values in arrays:
+            for serializer in jsonbrotliminifyer.available_serializers():
+                with self.subTest(values=values[:3], serializer=serializer):
+                    decoded = self.roundtrip(values, serializer)
+                    self.assertEqual(_bits(decoded), _bits(values))
+                    self.assertTrue(all(type(v) is float for v in decoded))
+
+    def test_unpacked_lists_keep_types(self) -> None:
+        documents = [
+            [1, 2.0] * 50,
+            [True, False] * 50,
+            list(range(10)),
+            (1.5,) * 100,
+            [[i, i + 0.5] for i in range(100)],
+        ]
+        for document in documents:
+            with self.subTest(document=str(document)[:30]):
+                plain = jsonbrotliminifyer.decompress_json(
+                    jsonbrotliminifyer.compress_json(document)
+                )
+                decoded = self.roundtrip(document)
+                self.assertEqual(decoded, plain)
+                self.assertEqual(json.dumps(decoded), json.dumps(plain))
+
+    def test_with_columnar(self) -> None:
+        rows = [
+            {"t": 1700000000 + i, "temp": round(20 + i / 100, 2), "id": f"s{i % 3}"}
+            for i in range(200)
+        ]
+        document = {"rows": rows, "\x00n": [1, 2]}
+        compressed = jsonbrotliminifyer.compress_json(
+            document, columnar=True, pack_numbers=True
+        )
+        self.assertEqual(jsonbrotliminifyer.decompress_json(compressed), document)
+        self.assertLess(
+            len(compressed),
+            len(jsonbrotliminifyer.compress_json(document, columnar=True)),
+        )
+
+    def test_invalid_packed_data(self) -> None:
+        flags = _transforms.FLAG_PACKED
+        payloads = [
+            # JSON length beyond the payload
+            _transforms.ENVELOPE_MAGIC + bytes((flags,)) + b"\xff" * 8,
+            # Array beyond the binary section
+            _transforms.wrap(b'{"\\u0000n":["i",8,0,4,null,-1]}', flags, b"\x00" * 8),
+            # Unknown kind and width
+            _transforms.wrap(b'{"\\u0000n":["x",8,0,1,null,-1]}', flags, b"\x00" * 8),
+            _transforms.wrap(b'{"\\u0000n":["i",3,0,1,null,-1]}', flags, b"\x00" * 8),
+            _transforms.wrap(b'{"\\u0000n":5}', flags),
+        ]
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                with self.assertRaises(ValueError):
+                    jsonbrotliminifyer.decompress_json(brotli.compress(payload))
+
+
+if __name__ == "__main__":
+    unittest.main()